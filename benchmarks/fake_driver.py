@@ -0,0 +1,461 @@
+"""
+Driver DB-API falso con la interfaz de psycopg2 que usa la aplicación.
+
+install() registra módulos psycopg2, psycopg2.extensions, psycopg2.extras y
+psycopg2.sql en sys.modules antes de importar src, de modo que el código
+real (pool, DatabaseConnection, QueryStream, TreeViewManager...) corre sin
+servidor. Cada ida y vuelta duerme `latency` segundos y las consultas de
+catálogo devuelven un catálogo sintético de N esquemas x M tablas x K
+columnas; cualquier otro SELECT devuelve `result_rows` filas generadas.
+Cada consulta que llega como texto paga además `plan_latency` (análisis y
+plan); un EXECUTE de una sentencia preparada con PREPARE no.
+"""
+import re
+import sys
+import threading
+import time
+import types
+
+
+class FakeConfig:
+
+    def __init__(self, schemas=5, tables=50, columns=10, row_count=10000,
+                 views=5, indexes=10, functions=5, latency=0.002, plan_latency=0.0,
+                 connect_latency=None, result_rows=100000, result_columns=8):
+        self.schemas = schemas
+        self.tables = tables
+        self.columns = columns
+        self.row_count = row_count
+        self.views = views
+        self.indexes = indexes
+        self.functions = functions
+        self.latency = latency
+        self.plan_latency = plan_latency
+        self.connect_latency = latency * 3 if connect_latency is None else connect_latency
+        self.result_rows = result_rows
+        self.result_columns = result_columns
+
+    def schema_names(self):
+        return [f"schema_{i:03d}" for i in range(self.schemas)]
+
+    def table_names(self):
+        return [f"table_{i:04d}" for i in range(self.tables)]
+
+
+class FakeStats:
+
+    def __init__(self):
+        self.connects = 0
+        self.round_trips = 0
+        self.rows_sent = 0
+        self.plans = 0
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for key, value in counts.items():
+                setattr(self, key, getattr(self, key) + value)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "round_trips": self.round_trips,
+                "rows_sent": self.rows_sent,
+                "plans": self.plans,
+            }
+
+
+config = FakeConfig()
+stats = FakeStats()
+
+
+# --- psycopg2.extensions -------------------------------------------------
+
+class Error(Exception):
+
+    def __init__(self, message="", pgcode=None):
+        super().__init__(message)
+        self.pgcode = pgcode
+
+
+class QueryCanceledError(Error):
+    pass
+
+
+TRANSACTION_STATUS_IDLE = 0
+TRANSACTION_STATUS_INTRANS = 2
+
+
+# --- psycopg2.sql --------------------------------------------------------
+
+class Composable:
+
+    def as_string(self, context=None):
+        raise NotImplementedError
+
+    def __add__(self, other):
+        return Composed([self, other])
+
+
+class Composed(Composable):
+
+    def __init__(self, parts):
+        self.parts = list(parts)
+
+    def as_string(self, context=None):
+        return "".join(part.as_string(context) for part in self.parts)
+
+    def join(self, joiner):
+        return SQL(joiner).join(self.parts)
+
+
+class SQL(Composable):
+
+    def __init__(self, string):
+        self.string = string
+
+    def as_string(self, context=None):
+        return self.string
+
+    def format(self, *args, **kwargs):
+        parts = []
+        args = iter(args)
+        for literal, field in re.findall(r"((?:[^{]|\{\{)*)(\{\w*\})?", self.string):
+            if literal:
+                parts.append(SQL(literal.replace("{{", "{").replace("}}", "}")))
+            if field:
+                name = field[1:-1]
+                parts.append(kwargs[name] if name and not name.isdigit() else next(args))
+        return Composed(parts)
+
+    def join(self, seq):
+        parts = []
+        for i, item in enumerate(seq):
+            if i:
+                parts.append(self)
+            parts.append(item)
+        return Composed(parts)
+
+
+class Identifier(Composable):
+
+    def __init__(self, *strings):
+        self.strings = strings
+
+    def as_string(self, context=None):
+        return ".".join('"' + s.replace('"', '""') + '"' for s in self.strings)
+
+
+class Literal(Composable):
+
+    def __init__(self, wrapped):
+        self.wrapped = wrapped
+
+    def as_string(self, context=None):
+        return _quote(self.wrapped)
+
+
+class Placeholder(Composable):
+
+    def __init__(self, name=None):
+        self.name = name
+
+    def as_string(self, context=None):
+        return f"%({self.name})s" if self.name else "%s"
+
+
+def _quote(value):
+    if value is None:
+        return "NULL"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+# --- psycopg2.extras -----------------------------------------------------
+
+class RealDictCursor:
+    """Marcador: con este cursor_factory las filas se devuelven como dict."""
+
+
+# --- conexión y cursor ---------------------------------------------------
+
+def _round_trip():
+    stats.add(round_trips=1)
+    if config.latency:
+        time.sleep(config.latency)
+
+
+def _plan():
+    stats.add(plans=1)
+    if config.plan_latency:
+        time.sleep(config.plan_latency)
+
+
+def _catalog_filter(params):
+    if isinstance(params, dict):
+        schema = params.get("schema")
+    else:
+        # EXECUTE de una sentencia preparada: el esquema es el primer parámetro.
+        schema = params[0] if params else None
+    return [schema] if schema else config.schema_names()
+
+
+def _columns_rows(params):
+    rows = []
+    for schema in _catalog_filter(params):
+        for table in config.table_names():
+            for c in range(config.columns):
+                rows.append((schema, table, f"column_{c:03d}", "integer" if c == 0 else "text", c != 0))
+    return ["schema_name", "table_name", "column_name", "data_type", "is_nullable"], rows
+
+
+def _objects_rows(params):
+    rows = []
+    for schema in _catalog_filter(params):
+        for kind, count, prefix in (
+            ("functions", config.functions, "function"),
+            ("indexes", config.indexes, "index"),
+            ("views", config.views, "view"),
+        ):
+            rows.extend((kind, schema, f"{prefix}_{i:04d}") for i in range(count))
+    return ["kind", "schema_name", "name"], rows
+
+
+def _estimate_rows(params):
+    rows = [
+        (schema, table, config.row_count)
+        for schema in _catalog_filter(params)
+        for table in config.table_names()
+    ]
+    return ["schema_name", "table_name", "estimate"], rows
+
+
+def _table_columns_rows(params):
+    rows = [(f"column_{c:03d}", "integer" if c == 0 else "text", c != 0) for c in range(config.columns)]
+    return ["column_name", "data_type", "is_nullable"], rows
+
+
+def _table_key_rows(params):
+    return ["constraint_type", "constraint_name", "column_name", "is_nullable"], [
+        ("PRIMARY KEY", "pk", "column_000", "NO")
+    ]
+
+
+def _generic_rows(query, params):
+    """Resultado sintético; respeta LIMIT/OFFSET (también como parámetros)."""
+    total = config.result_rows
+    start = 0
+    limit = re.search(r"\bLIMIT\s+(\d+|%s)", query, re.IGNORECASE)
+    if limit:
+        values = list(params) if isinstance(params, (list, tuple)) else []
+        if limit.group(1) == "%s" and values:
+            offset_param = re.search(r"\bOFFSET\s+%s", query, re.IGNORECASE)
+            if offset_param and len(values) >= 2:
+                start = int(values[-1])
+                total = min(total - start, int(values[-2]))
+            else:
+                total = min(total, int(values[-1]))
+                if re.search(r"\)\s*>\s*\(%s", query) and len(values) >= 2:
+                    # Keyset: la página empieza tras la última clave leída.
+                    start = int(values[0]) + 1
+                    total = min(total, config.result_rows - start)
+        elif limit.group(1).isdigit():
+            total = min(total, int(limit.group(1)))
+    key_columns = re.findall(r'AS\s+"(__dbadmin_key_\d+)"', query)
+    columns = key_columns + [f"column_{c:03d}" for c in range(config.result_columns)]
+
+    def generate():
+        for i in range(start, start + max(total, 0)):
+            yield tuple([i] * len(key_columns) + [i] + [f"value {i}-{c}" for c in range(1, config.result_columns)])
+    return columns, generate()
+
+
+_ROUTES = (
+    (re.compile(r"version\(\)", re.I), lambda q, p: (["version"], [("PostgreSQL 16.0 (fake driver)",)])),
+    (re.compile(r"'views' AS kind", re.I), lambda q, p: _objects_rows(p)),
+    (re.compile(r"reltuples|table_row_statistics", re.I), lambda q, p: _estimate_rows(p)),
+    (re.compile(r"attname.*c\.relname = (?:%\(table\)s|\$\d)", re.I | re.S), lambda q, p: _table_columns_rows(p)),
+    (re.compile(r"table_constraints", re.I), lambda q, p: _table_key_rows(p)),
+    (re.compile(r"pg_attribute.*relkind IN", re.I | re.S), lambda q, p: _columns_rows(p)),
+    (re.compile(r"FROM pg_catalog\.pg_namespace n\s+WHERE", re.I), lambda q, p: (
+        ["schema_name"], [(schema,) for schema in config.schema_names()]
+    )),
+)
+
+
+class FakeCursor:
+
+    def __init__(self, conn, name=None, cursor_factory=None):
+        self.connection = conn
+        self.name = name
+        self.as_dict = cursor_factory is RealDictCursor
+        self.itersize = 2000
+        self.description = None
+        self.rowcount = -1
+        self._rows = None
+        self._columns = None
+        self.closed = False
+
+    def execute(self, query, params=None):
+        if isinstance(query, Composable):
+            query = query.as_string(self.connection)
+        self.connection._begin()
+        _round_trip()
+        self.description = None
+        self._rows = None
+        stripped = query.strip()
+        prepare = re.match(r"PREPARE\s+(\w+)(?:\s*\([^)]*\))?\s+AS\s+(.*)", stripped, re.IGNORECASE | re.DOTALL)
+        if prepare:
+            self.connection._prepare(*prepare.groups())
+            self.rowcount = 0
+            return
+        execute = re.match(r"EXECUTE\s+(\w+)", stripped, re.IGNORECASE)
+        if execute:
+            stripped = self.connection._prepared_body(execute.group(1))
+        else:
+            _plan()
+        if not re.match(r"(?:SELECT|WITH|VALUES|TABLE|SHOW|EXPLAIN)\b", stripped, re.IGNORECASE):
+            self.rowcount = 0
+            return
+        for pattern, route in _ROUTES:
+            if pattern.search(stripped):
+                columns, rows = route(stripped, params)
+                break
+        else:
+            columns, rows = _generic_rows(stripped, params)
+        self._columns = columns
+        self.description = [(name, None, None, None, None, None, None) for name in columns]
+        self._rows = iter(rows)
+        if not self.name:
+            # Un cursor de cliente recibe todo el resultado en el execute.
+            self._rows = iter(list(self._rows))
+
+    def _take(self, size=None):
+        if self._rows is None:
+            raise Error("no results to fetch")
+        if self.name:
+            # Cada página de un cursor de servidor es otra ida y vuelta.
+            _round_trip()
+        rows = []
+        for row in self._rows:
+            rows.append(dict(zip(self._columns, row)) if self.as_dict else row)
+            if size is not None and len(rows) >= size:
+                break
+        stats.add(rows_sent=len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._take()
+        self.rowcount = len(rows)
+        return rows
+
+    def fetchmany(self, size=None):
+        return self._take(size or self.itersize)
+
+    def fetchone(self):
+        rows = self._take(1)
+        return rows[0] if rows else None
+
+    def mogrify(self, query, params=None):
+        if params:
+            if isinstance(params, dict):
+                query = query % {k: _quote(v) for k, v in params.items()}
+            else:
+                query = query % tuple(_quote(v) for v in params)
+        return query.encode("utf-8")
+
+    def copy_expert(self, statement, file, size=8192):
+        _round_trip()
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+
+    encoding = "UTF8"
+
+    def __init__(self, **params):
+        self.params = params
+        self.closed = 0
+        self.autocommit = False
+        self._status = TRANSACTION_STATUS_IDLE
+        self._prepared = {}
+        stats.add(connects=1)
+        if config.connect_latency:
+            time.sleep(config.connect_latency)
+
+    def _begin(self):
+        if not self.autocommit:
+            self._status = TRANSACTION_STATUS_INTRANS
+
+    def _prepare(self, name, body):
+        if name in self._prepared:
+            raise Error(f'prepared statement "{name}" already exists', pgcode="42P05")
+        _plan()
+        self._prepared[name] = body.strip()
+
+    def _prepared_body(self, name):
+        if name not in self._prepared:
+            raise Error(f'prepared statement "{name}" does not exist', pgcode="26000")
+        return self._prepared[name]
+
+    def cursor(self, name=None, cursor_factory=None):
+        return FakeCursor(self, name=name, cursor_factory=cursor_factory)
+
+    def get_transaction_status(self):
+        return self._status
+
+    def commit(self):
+        if self._status != TRANSACTION_STATUS_IDLE:
+            _round_trip()
+        self._status = TRANSACTION_STATUS_IDLE
+
+    def rollback(self):
+        if self._status != TRANSACTION_STATUS_IDLE:
+            _round_trip()
+        self._status = TRANSACTION_STATUS_IDLE
+
+    def cancel(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+
+def connect(**params):
+    return FakeConnection(**params)
+
+
+def install():
+    """Registra el driver falso como psycopg2 (antes de importar src)."""
+    if "src.utils.connection" in sys.modules:
+        raise RuntimeError("install() debe llamarse antes de importar src")
+
+    extensions = types.ModuleType("psycopg2.extensions")
+    extensions.QueryCanceledError = QueryCanceledError
+    extensions.TRANSACTION_STATUS_IDLE = TRANSACTION_STATUS_IDLE
+    extensions.TRANSACTION_STATUS_INTRANS = TRANSACTION_STATUS_INTRANS
+
+    extras = types.ModuleType("psycopg2.extras")
+    extras.RealDictCursor = RealDictCursor
+
+    sql = types.ModuleType("psycopg2.sql")
+    for name in ("Composable", "Composed", "SQL", "Identifier", "Literal", "Placeholder"):
+        setattr(sql, name, globals()[name])
+
+    psycopg2 = types.ModuleType("psycopg2")
+    psycopg2.connect = connect
+    psycopg2.Error = Error
+    psycopg2.extensions = extensions
+    psycopg2.extras = extras
+    psycopg2.sql = sql
+
+    sys.modules.update({
+        "psycopg2": psycopg2,
+        "psycopg2.extensions": extensions,
+        "psycopg2.extras": extras,
+        "psycopg2.sql": sql,
+    })
@@ -0,0 +1,513 @@
+"""
+Benchmarks de DBAdmin sobre el driver falso de benchmarks/fake_driver.py.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --schemas 20 --tables 500 --latency 0.01
+    python -m benchmarks.run --compare benchmarks/results/anterior.json
+    python -m benchmarks.run --only tree,stream --tk
+    python -m benchmarks.run --only search --tables 250    # ~100.000 objetos
+
+Mide el arranque de ConnectionManager, la construcción del árbol de
+TreeViewManager, las consultas de catálogo repetidas (sentencias
+preparadas), la lectura de resultados con QueryStream, la paginación de
+tablas, el pintado de resultados y el índice de búsqueda del navegador,
+con el pico de memoria de cada uno
+(tracemalloc). El informe se guarda en JSON para compararlo con otra
+ejecución. No son tests: no comprueban nada, sólo miden.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from benchmarks import fake_driver
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(PROJECT_ROOT, "benchmarks", "results")
+BENCHMARKS = ("manager", "tree", "catalog", "stream", "paginator", "render", "search")
+
+
+class HeadlessTreeview:
+    """Sustituto en memoria de ttk.Treeview para medir sin pantalla."""
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+        self._children = {"": []}
+        self._parent = {}
+        self._items = {}
+
+    def bind(self, *args, **kwargs):
+        pass
+
+    def insert(self, parent, index, text="", open=False, **kwargs):
+        item_id = f"I{next(self._ids):06d}"
+        self._items[item_id] = {"text": text, "open": open}
+        self._children[item_id] = []
+        if index == "end":
+            self._children[parent].append(item_id)
+        else:
+            self._children[parent].insert(index, item_id)
+        self._parent[item_id] = parent
+        return item_id
+
+    def move(self, item_id, parent, index):
+        self._children[self._parent[item_id]].remove(item_id)
+        self._children[parent].insert(index, item_id)
+        self._parent[item_id] = parent
+
+    def item(self, item_id, option=None, **kwargs):
+        if kwargs:
+            self._items[item_id].update(kwargs)
+            return None
+        return self._items[item_id] if option is None else self._items[item_id][option]
+
+    def exists(self, item_id):
+        return item_id in self._items
+
+    def get_children(self, item_id=""):
+        return tuple(self._children.get(item_id, ()))
+
+    def delete(self, *item_ids):
+        for item_id in item_ids:
+            if item_id not in self._items:
+                continue
+            self.delete(*self._children[item_id])
+            del self._children[item_id]
+            self._children[self._parent.pop(item_id)].remove(item_id)
+            del self._items[item_id]
+
+    def focus(self, item_id=None):
+        return ""
+
+    def see(self, item_id):
+        pass
+
+    def selection_set(self, *item_ids):
+        pass
+
+    def selection(self):
+        return ()
+
+    def __len__(self):
+        return len(self._items)
+
+
+def _pump(executor, root=None, timeout=600):
+    """Entrega los callbacks del executor hasta que no quedan tareas."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        executor._poll()
+        if root is not None:
+            root.update()
+        if not executor.running_tasks() and executor._events.empty():
+            return
+        time.sleep(0.001)
+    raise TimeoutError("Las tareas del executor no terminaron")
+
+
+def _measure(fn):
+    """Ejecuta fn() midiendo tiempo, pico de memoria e idas y vueltas al servidor."""
+    before = fake_driver.stats.snapshot()
+    tracemalloc.start()
+    started = time.perf_counter()
+    metrics = fn() or {}
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    after = fake_driver.stats.snapshot()
+    metrics.update({
+        "seconds": seconds,
+        "peak_kb": peak / 1024,
+        "round_trips": after["round_trips"] - before["round_trips"],
+        "connects": after["connects"] - before["connects"],
+        "plans": after["plans"] - before["plans"],
+    })
+    return metrics
+
+
+def _saved_connections(count):
+    return [
+        {
+            "name": f"bench_{i:02d}",
+            "dbname": "bench",
+            "user": "bench",
+            "password": "bench",
+            "host": f"cluster-{i:02d}.invalid",
+            "port": 26257,
+            "sslmode": "disable",
+        }
+        for i in range(count)
+    ]
+
+
+def bench_manager(context):
+    from src.db import manager
+
+    connections = _saved_connections(context["connections"])
+    manager.load_connections_from_json = lambda: connections
+    result = {}
+
+    def startup():
+        context["manager"] = manager.ConnectionManager()
+        return {"connections": len(context["manager"].connections)}
+
+    result["startup"] = _measure(startup)
+    result["warm_up"] = _measure(lambda: {"statuses": len(context["manager"].warm_up())})
+    return result
+
+
+def bench_tree(context):
+    from src.ui import tree_view
+    from src.ui.tree_view import TreeViewManager
+    from src.utils.executor import executor
+
+    root = context.get("root")
+    if root is not None:
+        from tkinter import ttk
+        tree = ttk.Treeview(root)
+    else:
+        tree = HeadlessTreeview()
+    tree_manager = TreeViewManager(tree, lambda *a: None, lambda *a: None)
+    connections = context["manager"].connections
+
+    def open_all(node_type):
+        for item_id, node_info in list(tree_manager.node_map.items()):
+            if node_info.get("type") == node_type:
+                tree.item(item_id, open=True)
+                tree_manager.open_node(item_id)
+        _pump(executor, root)
+
+    def build():
+        for name, db in connections.items():
+            tree_manager.add_connection(name, db, expand=True)
+        _pump(executor, root)
+        open_all("schema")
+        open_all("tables_folder")
+        return {"items": len(tree_manager.node_map)}
+
+    def reopen():
+        tree_manager.clear()
+        for db in connections.values():
+            db.metadata.clear()
+            db.row_counts.reset_estimates()
+        return build()
+
+    def refresh():
+        # refresh_tree recorre conn_manager: que use las conexiones del benchmark.
+        tree_view.conn_manager = context["manager"]
+        tree_manager.refresh_tree()
+        _pump(executor, root)
+        return {"items": len(tree_manager.node_map), "errors": len(tree_manager.refresh_errors)}
+
+    def refresh_changed():
+        # Una tabla más por esquema: el refresco sólo inserta esas.
+        fake_driver.config.tables += 1
+        try:
+            return refresh()
+        finally:
+            fake_driver.config.tables -= 1
+
+    return {
+        "build": _measure(build),
+        "rebuild": _measure(reopen),
+        "refresh": _measure(refresh),
+        "refresh_changed": _measure(refresh_changed),
+    }
+
+
+def bench_catalog(context):
+    db = next(iter(context["manager"].connections.values()))
+    schema = fake_driver.config.schema_names()[0]
+    tables = fake_driver.config.table_names()
+
+    def lookups():
+        # Sin caché de metadatos: cada búsqueda llega al servidor.
+        for table in tables:
+            db.metadata.clear()
+            db.get_table_columns(table, schema)
+            db.get_table_key(table, schema)
+        return {"lookups": len(tables) * 2}
+
+    db.statements.clear()
+    metrics = _measure(lookups)
+    for name in ("table_columns", "table_key"):
+        stats = db.statements.stats().get(name, {})
+        metrics[f"{name}_hits"] = stats.get("hits", 0)
+        metrics[f"{name}_misses"] = stats.get("misses", 0)
+        metrics[f"{name}_plain"] = stats.get("plain", 0)
+    return {"lookups": metrics}
+
+
+def bench_search(context):
+    from src.ui import tree_view
+    from src.ui.tree_view import TreeViewManager
+    from src.utils.executor import executor
+    from src.utils.search_index import search_index
+
+    tree_view.conn_manager = context["manager"]
+    tree_manager = TreeViewManager(HeadlessTreeview(), lambda *a: None, lambda *a: None)
+    tables = fake_driver.config.table_names()
+    queries = ["t", "ta", "tab", tables[-1], tables[len(tables) // 2][-3:], "col", "cl05", "idx_00", "zzz"]
+    found = []
+
+    def index():
+        tree_manager.index_catalogs()
+        _pump(executor)
+        return {"objects": len(search_index), "names": search_index.name_count}
+
+    def search():
+        # Como al escribir: una búsqueda por tecla de cada consulta.
+        slowest = 0.0
+        typed = 0
+        for query in queries:
+            for end in range(1, len(query) + 1):
+                started = time.perf_counter()
+                results = search_index.search(query[:end])
+                slowest = max(slowest, time.perf_counter() - started)
+                typed += 1
+            found.append(results)
+        return {"queries": typed, "slowest_ms": round(slowest * 1000, 2)}
+
+    def reveal():
+        revealed = sum(tree_manager.reveal(results[0][0]) for results in found if results)
+        return {"revealed": revealed}
+
+    def update():
+        # Una tabla más por esquema: sólo se indexan sus nombres.
+        fake_driver.config.tables += 1
+        try:
+            tree_manager.refresh_tree()
+            _pump(executor)
+        finally:
+            fake_driver.config.tables -= 1
+        return {"objects": len(search_index)}
+
+    return {
+        "index": _measure(index),
+        "search": _measure(search),
+        "reveal": _measure(reveal),
+        "update": _measure(update),
+    }
+
+
+def bench_stream(context):
+    db = next(iter(context["manager"].connections.values()))
+
+    def fetch():
+        stream = db.open_stream("SELECT * FROM bench_big")
+        rows = 0
+        while not stream.exhausted:
+            rows += len(stream.fetch_page())
+        return {"rows": rows}
+
+    metrics = _measure(fetch)
+    metrics["rows_per_second"] = metrics["rows"] / metrics["seconds"]
+    return {"fetch": metrics}
+
+
+def bench_paginator(context):
+    from src.utils.pagination import TablePaginator
+
+    db = next(iter(context["manager"].connections.values()))
+    pages = context["pages"]
+
+    def paginate(key_columns):
+        paginator = TablePaginator(db, "schema_000", "table_0000", key_columns, page_size=100)
+        paginator.first_page()
+        for _ in range(pages - 1):
+            paginator.next_page()
+        result = {"pages": paginator.page_number}
+        if not key_columns and pages > 1:
+            # "Anterior" por OFFSET debe dar la página en orden ascendente.
+            ids = [row["column_000"] for row in paginator.prev_page()]
+            expected = list(range((pages - 2) * 100, (pages - 1) * 100))
+            if ids != expected:
+                raise AssertionError(f"Página anterior desordenada: {ids[:3]}... en vez de {expected[:3]}...")
+        return result
+
+    return {
+        "keyset": _measure(lambda: paginate(["column_000"])),
+        "offset": _measure(lambda: paginate(None)),
+    }
+
+
+def bench_render(context):
+    from src.ui.result_grid import ListRowSource
+
+    config = fake_driver.config
+    columns = [f"column_{c:03d}" for c in range(config.result_columns)]
+    rows = [
+        {col: (i if c == 0 else f"value {i}-{c}") for c, col in enumerate(columns)}
+        for i in range(context["render_rows"])
+    ]
+    root = context.get("root")
+    visible = 40
+
+    def render():
+        source = ListRowSource(columns)
+        for start in range(0, len(rows), 2000):
+            source.extend(rows[start:start + 2000])
+        if root is not None:
+            from src.ui.result_grid import ResultGrid
+            grid = ResultGrid(root)
+            grid.pack()
+            grid.set_source(source)
+            for _ in range(0, len(source), visible):
+                grid._scroll_by(visible)
+                root.update_idletasks()
+            grid.destroy()
+        else:
+            # Lo que pide la grilla al desplazarse: una ventana de filas visibles.
+            for top in range(0, len(source), visible):
+                source.rows(top, top + visible)
+        return {"rows": len(source)}
+
+    metrics = _measure(render)
+    metrics["rows_per_second"] = metrics["rows"] / metrics["seconds"]
+    return {"scroll": metrics}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _print_report(report, baseline=None):
+    print(f"\nDBAdmin benchmarks · {report['meta']['revision'] or '?'} · {report['meta']['created_at']}")
+    print(f"{'benchmark':<22}{'segundos':>11}{'pico KB':>12}{'idas/vueltas':>14}{'Δ tiempo':>11}  detalles")
+    for name, cases in report["results"].items():
+        for case, metrics in cases.items():
+            label = f"{name}.{case}"
+            delta = ""
+            if baseline:
+                previous = baseline.get("results", {}).get(name, {}).get(case)
+                if previous and previous.get("seconds"):
+                    delta = f"{(metrics['seconds'] / previous['seconds'] - 1) * 100:+.1f}%"
+            details = ", ".join(
+                f"{key}={value:,.0f}" if isinstance(value, (int, float)) else f"{key}={value}"
+                for key, value in metrics.items()
+                if key not in ("seconds", "peak_kb", "round_trips", "connects")
+            )
+            print(
+                f"{label:<22}{metrics['seconds']:>11.3f}{metrics['peak_kb']:>12,.0f}"
+                f"{metrics['round_trips']:>14,}{delta:>11}  {details}"
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de DBAdmin con un driver psycopg2 simulado")
+    parser.add_argument("--connections", type=int, default=8, help="conexiones guardadas")
+    parser.add_argument("--schemas", type=int, default=5)
+    parser.add_argument("--tables", type=int, default=50, help="tablas por esquema")
+    parser.add_argument("--columns", type=int, default=10, help="columnas por tabla")
+    parser.add_argument("--row-count", type=int, default=10000, help="filas estimadas por tabla")
+    parser.add_argument("--latency", type=float, default=0.002, help="segundos por ida y vuelta")
+    parser.add_argument("--plan-latency", type=float, default=0.0,
+                        help="segundos de análisis y plan por consulta no preparada")
+    parser.add_argument("--result-rows", type=int, default=100000)
+    parser.add_argument("--result-columns", type=int, default=8)
+    parser.add_argument("--render-rows", type=int, default=100000)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--only", help=f"lista separada por comas de: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--tk", action="store_true", help="usar widgets Tk reales (requiere pantalla)")
+    parser.add_argument("--output", help="fichero JSON del informe (por defecto benchmarks/results/<fecha>.json)")
+    parser.add_argument("--compare", help="informe JSON anterior con el que comparar")
+    args = parser.parse_args(argv)
+
+    selected = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"benchmarks desconocidos: {', '.join(sorted(unknown))}")
+
+    fake_driver.install()
+    fake_driver.config = fake_driver.FakeConfig(
+        schemas=args.schemas,
+        tables=args.tables,
+        columns=args.columns,
+        row_count=args.row_count,
+        latency=args.latency,
+        plan_latency=args.plan_latency,
+        result_rows=args.result_rows,
+        result_columns=args.result_columns,
+    )
+    os.environ["DBADMIN_HISTORY"] = "0"
+    os.environ["DBADMIN_WARM_UP"] = "0"
+    sys.path.insert(0, PROJECT_ROOT)
+    # Que el singleton conn_manager no lea connections.json.
+    import src.utils.json
+    src.utils.json.load_connections_from_json = lambda: []
+
+    context = {
+        "connections": args.connections,
+        "pages": args.pages,
+        "render_rows": args.render_rows,
+    }
+    if args.tk:
+        import customtkinter as ctk
+        context["root"] = ctk.CTk()
+        context["root"].withdraw()
+
+    runners = {
+        "manager": bench_manager,
+        "tree": bench_tree,
+        "catalog": bench_catalog,
+        "stream": bench_stream,
+        "paginator": bench_paginator,
+        "render": bench_render,
+        "search": bench_search,
+    }
+    results = {}
+    # Todos menos render necesitan las conexiones del benchmark de arranque.
+    if "manager" not in selected and set(selected) - {"render"}:
+        bench_manager(context)
+    for name in BENCHMARKS:
+        if name in selected:
+            results[name] = runners[name](context)
+
+    report = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "tk": bool(args.tk),
+            "config": vars(fake_driver.config),
+            "connections": args.connections,
+        },
+        "results": results,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    _print_report(report, baseline)
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nInforme guardado en {output}")
+
+    from src.utils.executor import executor
+    if "manager" in context:
+        for db in context["manager"].connections.values():
+            db.close()
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,17 @@
+import sys
+
+if len(sys.argv) > 1:
+    # Modo línea de comandos: no carga la interfaz gráfica.
+    from src.cli import main
+    sys.exit(main())
+
+from src.utils import startup
+
+import customtkinter
+startup.mark("importar customtkinter")
 
 from src.ui.main_window import MainWindow
+startup.mark("importar ventana principal")
 
 app = MainWindow()
 app.run()
@@ -0,0 +1,282 @@
+"""
+Modo línea de comandos (sin interfaz gráfica).
+
+    python main.py connections
+    python main.py query -c produccion "SELECT * FROM pedidos" --format jsonl -o pedidos.jsonl
+    python main.py script -c produccion migracion.sql --continue-on-error
+    python main.py export -c produccion --table public.pedidos -o pedidos.csv.gz
+
+No importa customtkinter ni nada de src.ui, y sólo conecta a la conexión
+guardada que se indica, en el primer uso. Los resultados se escriben según
+llegan del cursor de servidor; el resumen de tiempos va a stderr para no
+mezclarse con los datos.
+"""
+import argparse
+import csv
+import json
+import re
+import sys
+import time
+
+
+FORMATS = ("csv", "tsv", "json", "jsonl")
+
+
+def _log(message):
+    print(message, file=sys.stderr)
+
+
+def _json_default(value):
+    return str(value)
+
+
+class _RowWriter:
+    """Escribe filas (dicts del cursor) en csv/tsv/json/jsonl a medida que llegan."""
+
+    def __init__(self, out, fmt):
+        self.out = out
+        self.fmt = fmt
+        self.columns = None
+        self._csv = None
+        self._rows = 0
+
+    def write(self, columns, rows):
+        if self.columns is None:
+            self.columns = columns
+            if self.fmt in ("csv", "tsv"):
+                self._csv = csv.writer(self.out, delimiter="\t" if self.fmt == "tsv" else ",", lineterminator="\n")
+                self._csv.writerow(columns)
+            elif self.fmt == "json":
+                self.out.write("[")
+        for row in rows:
+            if self._csv:
+                self._csv.writerow([row[col] for col in columns])
+            else:
+                text = json.dumps(row, default=_json_default, ensure_ascii=False)
+                if self.fmt == "json":
+                    self.out.write(("," if self._rows else "") + "\n" + text)
+                else:
+                    self.out.write(text + "\n")
+            self._rows += 1
+
+    def close(self):
+        if self.fmt == "json":
+            if self.columns is None:
+                self.out.write("[")
+            self.out.write("\n]\n")
+        self.out.flush()
+
+
+def _get_connection(name):
+    from src.db.manager import conn_manager
+
+    if name is None:
+        db = conn_manager.get_active_connection()
+        if db is None:
+            raise SystemExit("No hay conexiones guardadas; crea una desde la aplicación gráfica")
+        return db
+    db = conn_manager.connections.get(name)
+    if db is None:
+        available = ", ".join(conn_manager.list_connections()) or "ninguna"
+        raise SystemExit(f"No existe la conexión '{name}' (disponibles: {available})")
+    return db
+
+
+def _connect(db):
+    started = time.perf_counter()
+    db.ensure_connected()
+    return time.perf_counter() - started
+
+
+def _read_sql(args):
+    if args.sql == "-":
+        return sys.stdin.read()
+    return args.sql
+
+
+def cmd_connections(args):
+    from src.db.manager import conn_manager
+
+    for name, db in conn_manager.connections.items():
+        active = "*" if name == conn_manager.active_connection else " "
+        print(f"{active} {name}\t{db.user}@{db.host}:{db.port}/{db.dbname}")
+    return 0
+
+
+def _write_rows(args, pages):
+    """pages produce tuplas (columnas, filas); escribe en args.output o stdout."""
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    writer = _RowWriter(out, args.format)
+    rows = 0
+    try:
+        for columns, page in pages:
+            writer.write(columns, page)
+            rows += len(page)
+    finally:
+        writer.close()
+        if args.output:
+            out.close()
+    return rows
+
+
+def cmd_query(args):
+    from src.utils.stream import is_streamable
+
+    db = _get_connection(args.connection)
+    query = _read_sql(args).strip()
+    connect_seconds = _connect(db)
+    started = time.perf_counter()
+
+    if not is_streamable(query):
+        success, result = db.execute_query_dict(query, timeout=args.timeout) if re.search(
+            r"\bRETURNING\b", query, re.IGNORECASE
+        ) else db.execute_query(query, timeout=args.timeout)
+        if not success:
+            _log(result)
+            return 1
+        rows = None
+        if isinstance(result, list):
+            columns = list(result[0].keys()) if result else []
+            rows = _write_rows(args, [(columns, result)])
+        elif not args.quiet:
+            _log(result)
+        _report(args, connect_seconds, time.perf_counter() - started, rows)
+        return 0
+
+    stream = db.open_stream(query, timeout=args.timeout, itersize=args.fetch_size)
+
+    def pages():
+        while not stream.exhausted:
+            page = stream.fetch_page()
+            yield stream.columns or [], page
+
+    try:
+        rows = _write_rows(args, pages())
+    finally:
+        stream.close()
+    _report(args, connect_seconds, time.perf_counter() - started, rows)
+    return 0
+
+
+def cmd_script(args):
+    from src.utils.sql_script import run_script, describe_script
+
+    db = _get_connection(args.connection)
+    connect_seconds = _connect(db)
+
+    def on_statement(entry):
+        if entry["error"]:
+            _log(f"línea {entry['line']}: {entry['error']}")
+        elif args.verbose and not entry["skipped"]:
+            _log(f"{entry['seconds']:8.3f} s  línea {entry['line']}: {entry['sql']}")
+
+    summary = run_script(
+        db,
+        args.path,
+        batch_size=args.batch_size,
+        stop_on_error=not args.continue_on_error,
+        timeout=args.timeout,
+        encoding=args.encoding,
+        on_statement=on_statement
+    )
+    _log(describe_script(summary))
+    if not args.quiet:
+        _log(f"Conexión: {connect_seconds * 1000:,.0f} ms")
+    return 1 if summary["failed"] else 0
+
+
+def cmd_export(args):
+    from src.utils.export import export_query, export_table, describe_export
+
+    db = _get_connection(args.connection)
+    connect_seconds = _connect(db)
+    if args.table:
+        schema, _, table = args.table.rpartition(".")
+        result = export_table(db, schema or "public", table, args.output, fmt=args.format)
+    else:
+        result = export_query(db, _read_sql(args), args.output, fmt=args.format)
+    if not args.quiet:
+        _log(describe_export(result))
+        _log(f"Conexión: {connect_seconds * 1000:,.0f} ms")
+    return 0
+
+
+def _report(args, connect_seconds, seconds, rows):
+    if args.quiet:
+        return
+    from src.utils.perf import perf
+
+    text = f"Conexión {connect_seconds * 1000:,.0f} ms · consulta {seconds * 1000:,.0f} ms"
+    if rows is not None:
+        text += f" · {rows:,} filas ({rows / max(seconds, 0.001):,.0f} filas/s)"
+    breakdown = perf.breakdown()
+    parts = [
+        f"{category} {breakdown[category]['total_ms']:,.0f} ms"
+        for category in ("server", "fetch")
+        if category in breakdown
+    ]
+    if parts:
+        text += f" [{', '.join(parts)}]"
+    _log(text)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="dbadmin",
+        description="DBAdmin en modo línea de comandos (sin interfaz gráfica)"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-c", "--connection", help="nombre de la conexión guardada (por defecto la primera)")
+    common.add_argument("--timeout", type=float, help="statement_timeout en segundos")
+    common.add_argument("-q", "--quiet", action="store_true", help="no mostrar el resumen de tiempos")
+
+    subparsers.add_parser("connections", help="lista las conexiones guardadas")
+
+    query = subparsers.add_parser("query", parents=[common], help="ejecuta una consulta y escribe el resultado")
+    query.add_argument("sql", help="consulta SQL ('-' para leerla de stdin)")
+    query.add_argument("-f", "--format", choices=FORMATS, default="csv")
+    query.add_argument("-o", "--output", help="fichero de salida (por defecto stdout)")
+    query.add_argument("--fetch-size", type=int, help="filas por página del cursor de servidor")
+
+    script = subparsers.add_parser("script", parents=[common], help="ejecuta un fichero .sql en streaming")
+    script.add_argument("path")
+    script.add_argument("--batch-size", type=int, default=100, help="sentencias por transacción (0 = todo)")
+    script.add_argument("--continue-on-error", action="store_true")
+    script.add_argument("--encoding", default="utf-8")
+    script.add_argument("-v", "--verbose", action="store_true", help="muestra cada sentencia y su duración")
+
+    export = subparsers.add_parser("export", parents=[common], help="exporta con COPY a csv/tsv/jsonl (.gz)")
+    source = export.add_mutually_exclusive_group(required=True)
+    source.add_argument("sql", nargs="?", help="consulta SQL ('-' para leerla de stdin)")
+    source.add_argument("--table", help="tabla a exportar (esquema.tabla)")
+    export.add_argument("-o", "--output", required=True)
+    export.add_argument("-f", "--format", choices=("csv", "tsv", "jsonl"))
+
+    return parser
+
+
+COMMANDS = {
+    "connections": cmd_connections,
+    "query": cmd_query,
+    "script": cmd_script,
+    "export": cmd_export,
+}
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return COMMANDS[args.command](args)
+    except KeyboardInterrupt:
+        _log("Cancelado")
+        return 130
+    except BrokenPipeError:
+        return 0
+    except Exception as e:
+        _log(f"Error: {e}")
+        return 1
+    finally:
+        from src.utils.query_history import query_history
+        query_history.flush()
@@ -1,14 +1,42 @@
-from src.utils.connection import DatabaseConnection
-from src.utils.json import export_connection_to_json, load_connections_from_json
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.connection import DatabaseConnection, STATUS_PENDING, STATUS_ERROR
+from src.utils.json import export_connection_to_json, load_connections_from_json, CONNECTION_SETTINGS
 import json
 import os
+import threading
 
 
 class ConnectionManager:
     def __init__(self):
-        self.connections = {}
-        self.active_connection = None
-        self._load_saved_connections()
+        self._connections = None
+        self._active_connection = None
+        # add_connection corre en un worker mientras el hilo de Tk recorre
+        # las conexiones: el dict sólo se toca con este lock.
+        self._lock = threading.RLock()
+        self.connect_timeout = int(os.environ.get("DBADMIN_CONNECT_TIMEOUT", "5"))
+        self.warm_up_on_start = os.environ.get("DBADMIN_WARM_UP", "1") != "0"
+    
+    @property
+    def connections(self):
+        """
+        Copia de las conexiones (nombre -> DatabaseConnection), segura de
+        recorrer aunque otro hilo añada o quite conexiones. Las guardadas
+        se leen en el primer acceso, no al importar.
+        """
+        with self._lock:
+            if self._connections is None:
+                self._connections = {}
+                self._load_saved_connections()
+            return dict(self._connections)
+    
+    @property
+    def active_connection(self):
+        self.connections  # la activa por defecto es la primera guardada
+        return self._active_connection
+    
+    @active_connection.setter
+    def active_connection(self, name):
+        self._active_connection = name
     
     def _load_saved_connections(self):
         try:
@@ -26,24 +54,55 @@ class ConnectionManager:
                         "port": conn_data.get("port", 5432),
                         "sslmode": conn_data.get("sslmode", "require")
                     }
-                    db = DatabaseConnection(**db_params)
+                    for key in CONNECTION_SETTINGS:
+                        if key in conn_data:
+                            db_params[key] = conn_data[key]
+                    db = DatabaseConnection(**db_params, connect_timeout=self.connect_timeout, lazy=True)
                     db.name = conn_name
-                    self.connections[conn_name] = db
-                    if self.active_connection is None:
-                        self.active_connection = conn_name
+                    self._connections[conn_name] = db
+                    if self._active_connection is None:
+                        self._active_connection = conn_name
                     
                 except Exception as e:
-                    print(f"⚠️ No se pudo conectar a {conn_name}: {str(e)}")
+                    print(f"⚠️ No se pudo cargar {conn_name}: {str(e)}")
                     continue
         
         except Exception as e:
             print(f"Error al cargar conexiones guardadas: {e}")
     
+    def warm_up(self, on_status=None, max_workers=8):
+        """
+        Conecta en paralelo las conexiones guardadas que aún no lo están.
+        on_status(nombre, db) se llama desde los hilos de conexión cada vez
+        que una termina (con éxito o con error).
+        """
+        pending = [
+            (name, db) for name, db in self.connections.items()
+            if db.status in (STATUS_PENDING, STATUS_ERROR)
+        ]
+        if not pending:
+            return {}
+        
+        def connect(item):
+            name, db = item
+            try:
+                db.ensure_connected()
+            except Exception as e:
+                print(f"⚠️ No se pudo conectar a {name}: {str(e)}")
+            if on_status:
+                on_status(name, db)
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as pool:
+            list(pool.map(connect, pending))
+        return {name: db.status for name, db in pending}
+    
     def add_connection(self, name, db_params):
         try:
-            db = DatabaseConnection(**db_params)
-            self.connections[name] = db
-            self.active_connection = name
+            db = DatabaseConnection(**db_params, connect_timeout=self.connect_timeout)
+            self.connections  # que las guardadas estén cargadas antes de añadir
+            with self._lock:
+                self._connections[name] = db
+                self.active_connection = name
             
             db.name = name
             success, msg = export_connection_to_json(db)
@@ -67,18 +126,22 @@ class ConnectionManager:
         return list(self.connections.keys())
     
     def remove_connection(self, name):
-        if name in self.connections:
-            self.connections[name].close()
-            del self.connections[name]
-            if self.active_connection == name:
-                self.active_connection = None
-            return True
-        return False
+        self.connections
+        with self._lock:
+            db = self._connections.pop(name, None)
+            if db is None:
+                return False
+            if self._active_connection == name:
+                self._active_connection = None
+        db.close()
+        return True
     
     def close_all(self):
-        for db in self.connections.values():
+        with self._lock:
+            connections = self._connections or {}
+            self._connections = {}
+            self._active_connection = None
+        for db in connections.values():
             db.close()
-        self.connections.clear()
-        self.active_connection = None
 
 conn_manager = ConnectionManager()
@@ -1,9 +1,26 @@
 """
 Diálogos y ventanas modales de la aplicación.
 """
+import os
+import queue
+import time
 import customtkinter as ctk
 from tkinter import messagebox, ttk, filedialog
 from src.db.manager import conn_manager
+from src.utils.executor import executor
+from src.utils.perf import timed, RENDER
+from src.ui.result_grid import ResultGrid, ListRowSource
+from src.utils.result_cache import result_cache, is_cacheable
+from src.utils.stream import is_streamable
+from src.utils.export import export_query, describe_export, EXPORT_FILETYPES
+from src.utils.importer import (
+    import_csv, describe_import, read_header, default_mapping, validate_mapping,
+    delimiter_for_path, DEFAULT_BATCH_SIZE
+)
+from src.utils.sql_script import run_script, describe_script
+from src.utils.explain import explain
+from src.utils.query_history import query_history
+from src.ui.plan_view import PlanView
 
 
 DATA_TYPES = [
@@ -27,6 +44,31 @@ DATA_TYPES = [
 ]
 
 
+def _load_schemas_async(window, combo):
+    """Rellena un combo de esquemas sin bloquear la apertura del diálogo."""
+    db = conn_manager.get_active_connection()
+    if not db:
+        return
+    
+    def fill(result):
+        success, schemas = result
+        if not success or not schemas or not window.winfo_exists():
+            return
+        current = combo.get()
+        combo.configure(values=schemas)
+        combo.set(current if current in schemas else schemas[0])
+    
+    executor.submit(db.get_schemas, on_success=fill, description="Cargando esquemas")
+
+
+def _format_age(seconds):
+    if seconds < 60:
+        return f"{int(seconds)} s"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} min"
+    return f"{int(seconds // 3600)} h {int(seconds % 3600 // 60)} min"
+
+
 class ConnectionDialog:
     
     def __init__(self, parent, on_success_callback):
@@ -62,6 +104,10 @@ class ConnectionDialog:
             entry.insert(0, defaults[label])
             self.fields[label] = entry
         
+        ctk.CTkLabel(scroll, text="statement_timeout (s, opcional)", font=("Arial", 10)).pack(anchor="w", padx=10)
+        self.fields["statement_timeout"] = ctk.CTkEntry(scroll)
+        self.fields["statement_timeout"].pack(fill="x", padx=10, pady=5)
+        
         ctk.CTkLabel(scroll, text="Nombre conexión", font=("Arial", 10)).pack(anchor="w", padx=10, pady=(15, 0))
         self.conn_name = ctk.CTkEntry(scroll)
         self.conn_name.pack(fill="x", padx=10, pady=5)
@@ -70,12 +116,13 @@ class ConnectionDialog:
         button_frame = ctk.CTkFrame(scroll)
         button_frame.pack(fill="x", padx=10, pady=15)
         
-        ctk.CTkButton(
+        self.connect_button = ctk.CTkButton(
             button_frame,
             text="✅ Conectar",
             command=self._connect,
             font=("Arial", 11)
-        ).pack(side="left", padx=5)
+        )
+        self.connect_button.pack(side="left", padx=5)
         
         ctk.CTkButton(
             button_frame,
@@ -94,28 +141,50 @@ class ConnectionDialog:
                 "port": int(self.fields["port"].get()),
                 "sslmode": self.fields["sslmode"].get()
             }
+            statement_timeout = self.fields["statement_timeout"].get().strip()
+            if statement_timeout:
+                db_params["statement_timeout"] = float(statement_timeout)
             
             conn_name = self.conn_name.get() or f"{db_params['user']}@{db_params['host']}"
 
-            success, msg = conn_manager.add_connection(conn_name, db_params)
-            
-            if success:
-                messagebox.showinfo("Éxito", msg)
-                self.window.destroy()
-                if self.on_success:
-                    self.on_success(conn_name)
-            else:
-                messagebox.showerror("Error", msg)
+            self.connect_button.configure(state="disabled", text="⏳ Conectando...")
+            executor.submit(
+                conn_manager.add_connection,
+                conn_name,
+                db_params,
+                on_success=lambda result: self._on_connect_result(conn_name, *result),
+                on_error=lambda e: self._on_connect_result(conn_name, False, str(e)),
+                description=f"Conectando a {conn_name}"
+            )
         
         except Exception as e:
             messagebox.showerror("Error", str(e))
+    
+    def _on_connect_result(self, conn_name, success, msg):
+        if not self.window.winfo_exists():
+            return
+        self.connect_button.configure(state="normal", text="✅ Conectar")
+        
+        if success:
+            messagebox.showinfo("Éxito", msg)
+            self.window.destroy()
+            if self.on_success:
+                self.on_success(conn_name)
+        else:
+            messagebox.showerror("Error", msg)
 
 
 class SQLEditorDialog:
     
+    MAX_EDITOR_FILE_SIZE = 5 * 1024 * 1024
+    
     def __init__(self, parent):
         self.parent = parent
         self.window = None
+        self._task = None
+        self._stream = None
+        self._rows = None
+        self._cache_key = None
         self._create_dialog()
     
     def _create_dialog(self):
@@ -123,6 +192,7 @@ class SQLEditorDialog:
         self.window.title("SQL Editor")
         self.window.geometry("1000x700")
         self.window.grab_set()
+        self.window.protocol("WM_DELETE_WINDOW", self._on_close)
         ctk.CTkLabel(
             self.window,
             text="Escribir consulta SQL:",
@@ -134,11 +204,54 @@ class SQLEditorDialog:
         button_frame = ctk.CTkFrame(self.window)
         button_frame.pack(fill="x", padx=10, pady=5)
         
-        ctk.CTkButton(
+        self.execute_button = ctk.CTkButton(
             button_frame,
             text="▶ Ejecutar (Ctrl+Enter)",
             command=self._execute,
             font=("Arial", 11)
+        )
+        self.execute_button.pack(side="left", padx=5)
+        
+        self.explain_button = ctk.CTkButton(
+            button_frame,
+            text="🔍 Explain",
+            command=self._explain,
+            font=("Arial", 11)
+        )
+        self.explain_button.pack(side="left", padx=5)
+        
+        self.analyze_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            button_frame,
+            text="ANALYZE",
+            variable=self.analyze_var,
+            font=("Arial", 11)
+        ).pack(side="left", padx=5)
+        
+        self.more_button = ctk.CTkButton(
+            button_frame,
+            text="⬇ Más filas",
+            command=self._fetch_more,
+            font=("Arial", 11),
+            state="disabled"
+        )
+        self.more_button.pack(side="left", padx=5)
+        
+        self.stop_button = ctk.CTkButton(
+            button_frame,
+            text="⏹ Detener",
+            command=self._stop,
+            font=("Arial", 11),
+            fg_color="#8B0000",
+            state="disabled"
+        )
+        self.stop_button.pack(side="left", padx=5)
+        
+        ctk.CTkButton(
+            button_frame,
+            text="📤 Exportar",
+            command=self._export,
+            font=("Arial", 11)
         ).pack(side="left", padx=5)
         
         ctk.CTkButton(
@@ -155,12 +268,42 @@ class SQLEditorDialog:
             font=("Arial", 11)
         ).pack(side="left", padx=5)
         
+        ctk.CTkButton(
+            button_frame,
+            text="📜 Ejecutar script",
+            command=lambda: ScriptRunnerDialog(self.window),
+            font=("Arial", 11)
+        ).pack(side="left", padx=5)
+        
         ctk.CTkButton(
             button_frame,
             text="💾 Guardar .sql",
             command=self._save_sql_file,
             font=("Arial", 11)
         ).pack(side="left", padx=5)
+        
+        ctk.CTkButton(
+            button_frame,
+            text="🕘 Historial",
+            command=lambda: QueryHistoryDialog(self.window, on_select_sql=self._load_sql),
+            font=("Arial", 11)
+        ).pack(side="left", padx=5)
+        
+        self.cache_var = ctk.BooleanVar(value=result_cache.enabled)
+        ctk.CTkCheckBox(
+            button_frame,
+            text="⚡ Caché de resultados",
+            variable=self.cache_var,
+            command=lambda: setattr(result_cache, "enabled", self.cache_var.get()),
+            font=("Arial", 11)
+        ).pack(side="right", padx=5)
+        
+        db = conn_manager.get_active_connection()
+        self.timeout_entry = ctk.CTkEntry(button_frame, width=60, placeholder_text="—")
+        self.timeout_entry.pack(side="right", padx=(0, 5))
+        if db and db.statement_timeout:
+            self.timeout_entry.insert(0, str(db.statement_timeout))
+        ctk.CTkLabel(button_frame, text="Timeout (s):", font=("Arial", 10)).pack(side="right")
 
         ctk.CTkLabel(
             self.window,
@@ -174,73 +317,330 @@ class SQLEditorDialog:
         table_frame = ctk.CTkFrame(self.notebook)
         self.notebook.add(table_frame, text="📊 Tabla")
         
-        self.result_table = ttk.Treeview(table_frame, height=15)
-        self.result_table.pack(fill="both", expand=True, padx=5, pady=5)
+        self.result_grid = ResultGrid(table_frame, on_near_end=self._on_grid_near_end)
+        self.result_grid.pack(fill="both", expand=True, padx=5, pady=5)
        
         msg_frame = ctk.CTkFrame(self.notebook)
         self.notebook.add(msg_frame, text="📝 Mensajes")
         
         self.result_box = ctk.CTkTextbox(msg_frame, height=150)
         self.result_box.pack(fill="both", expand=True, padx=5, pady=5)
+        
+        plan_frame = ctk.CTkFrame(self.notebook)
+        self.notebook.add(plan_frame, text="🌳 Plan")
+        
+        self.plan_view = PlanView(plan_frame)
+        self.plan_view.pack(fill="both", expand=True)
 
         self.editor.bind("<Control-Return>", lambda e: self._execute())
     
-    def _execute(self):
+    def _read_request(self):
+        """Consulta, conexión activa y timeout del editor, o None si falta algo."""
         query = self.editor.get("1.0", "end").strip()
         if not query:
             messagebox.showwarning("Advertencia", "Escribe una consulta SQL")
+            return None
+        
+        db = conn_manager.get_active_connection()
+        if not db:
+            messagebox.showerror("Error", "No hay conexión activa")
+            return None
+        
+        timeout = self.timeout_entry.get().strip()
+        try:
+            timeout = float(timeout) if timeout else None
+            if timeout is not None and timeout <= 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "El timeout debe ser un número positivo de segundos")
+            return None
+        return query, db, timeout
+    
+    def _execute(self):
+        if self._task:
+            return
+        
+        request = self._read_request()
+        if not request:
             return
+        query, db, timeout = request
+        
+        streamable = is_streamable(query)
+        self._close_stream()
+        self._clear_result_table()
+        
+        self._cache_key = None
+        if streamable and result_cache.enabled and is_cacheable(query):
+            self._cache_key = result_cache.key(db, query)
+            cached = result_cache.get(self._cache_key)
+            if cached:
+                self._show_cached(cached)
+                return
+        
+        self.result_box.delete("1.0", "end")
+        self.result_box.insert("end", "⏳ Ejecutando consulta...")
+        self.execute_button.configure(state="disabled")
         
+        if streamable:
+            self._start_task(
+                self._open_stream,
+                db,
+                query,
+                timeout,
+                on_success=self._show_first_page,
+                on_error=lambda e: self._show_result(False, str(e)),
+                on_discard=lambda result: executor.submit(result[0].close),
+                description="Ejecutando consulta del editor SQL"
+            )
+            return
+        
+        self._start_task(
+            self._execute_statement,
+            db,
+            query,
+            timeout,
+            on_success=lambda result: self._show_result(*result),
+            on_error=lambda e: self._show_result(False, str(e)),
+            description="Ejecutando consulta del editor SQL"
+        )
+    
+    def _explain(self):
+        """
+        Muestra el plan de la consulta. Con ANALYZE la consulta se ejecuta
+        (dentro de una transacción que se deshace) para obtener tiempos reales.
+        """
+        if self._task:
+            return
+        request = self._read_request()
+        if not request:
+            return
+        query, db, timeout = request
+        analyze = self.analyze_var.get()
+        
+        self.execute_button.configure(state="disabled")
+        self.explain_button.configure(state="disabled")
+        self.result_box.delete("1.0", "end")
+        self.result_box.insert("end", "⏳ Ejecutando EXPLAIN ANALYZE..." if analyze else "⏳ Obteniendo plan...")
+        self._start_task(
+            explain,
+            db,
+            query,
+            analyze,
+            timeout,
+            on_success=self._show_plan,
+            on_error=lambda e: self._show_result(False, str(e)),
+            description="Obteniendo plan de ejecución"
+        )
+    
+    @timed("editor.render_plan", RENDER)
+    def _show_plan(self, plan):
+        self._finish_task()
+        if not self.window.winfo_exists():
+            return
+        self.execute_button.configure(state="normal")
+        self.explain_button.configure(state="normal")
+        self.plan_view.show(plan)
+        
+        hot = [node for node in plan.nodes() if node.hot]
+        self.result_box.delete("1.0", "end")
+        self.result_box.insert("end", f"✅ Plan con {len(plan.nodes())} operadores\n")
+        for node in hot:
+            self.result_box.insert("end", f"🔥 {node.operator} {node.detail}\n")
+        for node in plan.nodes():
+            if node.misestimated:
+                self.result_box.insert(
+                    "end",
+                    f"⚠️ {node.operator}: {node.actual_rows:,.0f} filas reales frente a "
+                    f"{node.estimated_rows:,.0f} estimadas (¿ANALYZE de la tabla?)\n"
+                )
+            if node.full_scan:
+                self.result_box.insert("end", f"🐢 {node.operator} {node.detail}\n")
+        self.result_box.insert("end", "\n" + plan.raw)
+        self.notebook.select(2)
+    
+    def _load_sql(self, sql):
+        self.editor.delete("1.0", "end")
+        self.editor.insert("1.0", sql)
+    
+    def _export(self):
+        """Exporta el resultado completo de la consulta a un fichero con COPY."""
+        if self._task:
+            return
+        query = self.editor.get("1.0", "end").strip()
+        if not query:
+            messagebox.showwarning("Advertencia", "Escribe una consulta SQL")
+            return
         db = conn_manager.get_active_connection()
         if not db:
             messagebox.showerror("Error", "No hay conexión activa")
             return
+        path = filedialog.asksaveasfilename(
+            parent=self.window,
+            defaultextension=".csv",
+            filetypes=EXPORT_FILETYPES
+        )
+        if not path:
+            return
         
-        try:
-            is_select = query.upper().strip().startswith("SELECT")
-            self._clear_result_table()
-            if is_select:
-                success, result = db.execute_query_dict(query)
-                
-                if success and result:
-                    columns = list(result[0].keys())
-                    
-                    self.result_table['columns'] = columns
-                    self.result_table.column("#0", width=0, stretch=False)
-                    
-                    for col in columns:
-                        self.result_table.column(col, anchor="w", width=100)
-                        self.result_table.heading(col, text=col)
-                    for idx, row in enumerate(result[:1000]):
-                        values = [str(row.get(col, "")) for col in columns]
-                        self.result_table.insert("", "end", text=str(idx + 1), values=values)
-
-                    self.result_box.delete("1.0", "end")
-                    self.result_box.insert("end", f"✅ Resultados obtenidos: {len(result)} filas")
-                    if len(result) > 1000:
-                        self.result_box.insert("end", f"\n⚠️ Mostrando 1000 filas de {len(result)}")
-
-                    self.notebook.select(0)
-                else:
-                    self.result_box.delete("1.0", "end")
-                    self.result_box.insert("end", "Sin resultados")
-                    self.notebook.select(1)
-            else:
-                success, result = db.execute_query(query)
-                
-                self.result_box.delete("1.0", "end")
-                
-                if success:
-                    self.result_box.insert("end", f"✅ {result}")
-                else:
-                    self.result_box.insert("end", f"❌ Error: {result}")
-
-                self.notebook.select(1)
+        self.execute_button.configure(state="disabled")
+        self.result_box.delete("1.0", "end")
+        self.result_box.insert("end", "⏳ Exportando...")
+        self.notebook.select(1)
+        self._start_task(
+            export_query,
+            db,
+            query,
+            path,
+            on_success=lambda result: self._show_result(True, describe_export(result)),
+            on_error=lambda e: self._show_result(False, str(e)),
+            on_progress=self._on_export_progress,
+            description="Exportando resultado del editor SQL"
+        )
+    
+    def _on_export_progress(self, task):
+        if self.window.winfo_exists():
+            self.result_box.delete("1.0", "end")
+            self.result_box.insert("end", f"⏳ Exportando... {task.message}")
+    
+    def _start_task(self, fn, *args, **kwargs):
+        self._task = executor.submit(fn, *args, **kwargs)
+        self.stop_button.configure(state="normal")
+    
+    def _finish_task(self):
+        self._task = None
+        if self.window.winfo_exists():
+            self.stop_button.configure(state="disabled")
+    
+    def _stop(self):
+        """Cancela la sentencia en curso en el servidor; la conexión vuelve limpia al pool."""
+        if not self._task:
+            return
+        self._task.cancel()
+        self._finish_task()
+        self._close_stream()
+        self.execute_button.configure(state="normal")
+        self.explain_button.configure(state="normal")
+        self.result_box.delete("1.0", "end")
+        self.result_box.insert("end", "⏹ Consulta cancelada")
+        if not self._rows:
+            self.notebook.select(1)
+    
+    @staticmethod
+    def _execute_statement(db, query, timeout=None):
+        """Se ejecuta en un worker; si la sentencia era DDL, invalida el metadato cacheado."""
+        success, result = db.execute_query(query, timeout=timeout)
+        if success:
+            db.invalidate_for_statement(query)
+        return success, result
+    
+    @staticmethod
+    def _open_stream(db, query, timeout=None):
+        """Se ejecuta en un worker: abre el cursor y trae la primera página."""
+        stream = db.open_stream(query, timeout=timeout)
+        return stream, stream.fetch_page()
+    
+    def _show_first_page(self, result):
+        stream, rows = result
+        self._finish_task()
+        if not self.window.winfo_exists():
+            executor.submit(stream.close)
+            return
+        self.execute_button.configure(state="normal")
         
-        except Exception as e:
+        if not rows:
+            stream.close()
             self.result_box.delete("1.0", "end")
-            self.result_box.insert("end", f"❌ Error: {str(e)}")
+            self.result_box.insert("end", "Sin resultados")
             self.notebook.select(1)
+            return
+        
+        self._stream = stream
+        self._rows = ListRowSource(stream.columns)
+        self.result_grid.set_source(self._rows)
+        
+        self._append_rows(rows)
+        self.notebook.select(0)
+    
+    def _fetch_more(self):
+        stream = self._stream
+        if self._task or not stream or stream.exhausted:
+            return
+        self.more_button.configure(state="disabled")
+        self._start_task(
+            stream.fetch_page,
+            on_success=self._on_more_rows,
+            on_error=lambda e: self._show_result(False, str(e)),
+            description="Leyendo más filas"
+        )
+    
+    def _on_more_rows(self, rows):
+        self._finish_task()
+        if self.window.winfo_exists():
+            self._append_rows(rows)
+    
+    @timed("editor.render_rows", RENDER)
+    def _append_rows(self, rows):
+        stream = self._stream
+        self._rows.extend(rows)
+        self.result_grid.refresh()
+        
+        self.result_box.delete("1.0", "end")
+        if stream.total is not None:
+            self.result_box.insert("end", f"✅ Resultados obtenidos: {stream.total} filas")
+            self.more_button.configure(state="disabled")
+            if self._cache_key:
+                key, source = self._cache_key, self._rows
+                executor.submit(
+                    lambda: result_cache.put(key, source.columns, source.rows(0, len(source))),
+                    description="Guardando resultado en caché"
+                )
+        else:
+            self.result_box.insert("end", f"✅ Filas cargadas: {stream.fetched} (hay más filas; desplázate o pulsa \"Más filas\")")
+            self.more_button.configure(state="normal")
+    
+    @timed("editor.render_cached", RENDER)
+    def _show_cached(self, cached):
+        self._rows = ListRowSource(cached.columns, cached.rows)
+        self.result_grid.set_source(self._rows)
+        self.result_box.delete("1.0", "end")
+        self.result_box.insert(
+            "end",
+            f"⚡ {len(cached.rows)} filas desde la caché (obtenidas hace {_format_age(cached.age)}). "
+            "Desmarca \"Caché de resultados\" para volver a consultar el servidor."
+        )
+        self.notebook.select(0)
+    
+    def _on_grid_near_end(self):
+        if self._stream and not self._stream.exhausted:
+            self._fetch_more()
+    
+    def _close_stream(self):
+        if self._stream:
+            executor.submit(self._stream.close, description="Cerrando cursor")
+            self._stream = None
+        self.more_button.configure(state="disabled")
+    
+    def _show_result(self, success, result):
+        self._finish_task()
+        if not self.window.winfo_exists():
+            return
+        self.execute_button.configure(state="normal")
+        self.explain_button.configure(state="normal")
+        self.result_box.delete("1.0", "end")
+        
+        if success:
+            self.result_box.insert("end", f"✅ {result}")
+        else:
+            self.result_box.insert("end", f"❌ Error: {result}")
+
+        self.notebook.select(1)
+    
+    def _on_close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        self._close_stream()
+        self.window.destroy()
     
     def _import_sql_file(self):
         try:
@@ -252,6 +652,15 @@ class SQLEditorDialog:
             
             if not file_path:
                 return
+            if os.path.getsize(file_path) > self.MAX_EDITOR_FILE_SIZE:
+                if messagebox.askyesno(
+                    "Archivo grande",
+                    "El archivo es demasiado grande para el editor.\n"
+                    "¿Ejecutarlo directamente con el ejecutor de scripts?",
+                    parent=self.window
+                ):
+                    ScriptRunnerDialog(self.window, file_path)
+                return
             with open(file_path, "r", encoding="utf-8") as f:
                 content = f.read()
 
@@ -288,10 +697,8 @@ class SQLEditorDialog:
             messagebox.showerror("Error", f"No se pudo guardar el archivo: {str(e)}")
     
     def _clear_result_table(self):
-        for item in self.result_table.get_children():
-            self.result_table.delete(item)
-        
-        self.result_table['columns'] = ()
+        self._rows = None
+        self.result_grid.clear()
 
 
 class CreateTableDialog:
@@ -321,12 +728,7 @@ class CreateTableDialog:
             font=("Arial", 11, "bold")
         ).pack(anchor="w", pady=(0, 5))
         
-        db = conn_manager.get_active_connection()
         schemas = ["public"] 
-        if db:
-            success, result = db.get_schemas()
-            if success and result:
-                schemas = result
         
         self.schema_var = ctk.CTkComboBox(
             main_scroll,
@@ -335,7 +737,8 @@ class CreateTableDialog:
             font=("Arial", 11)
         )
         self.schema_var.pack(fill="x", pady=(0, 15))
-        self.schema_var.set(schemas[0] if schemas else "public")
+        self.schema_var.set(schemas[0])
+        _load_schemas_async(self.window, self.schema_var)
         
         ctk.CTkLabel(
             main_scroll,
@@ -527,19 +930,26 @@ class CreateTableDialog:
             messagebox.showerror("Error", "No hay conexión activa")
             return
         
-        try:
-            success, result = db.execute_query(sql)
-            
-            if success:
-                messagebox.showinfo("Éxito", f"Tabla '{table_name}' creada en schema '{schema_name}'")
-                self.window.destroy()
-                if self.on_success:
-                    self.on_success()
-            else:
-                messagebox.showerror("Error", f"No se pudo crear la tabla:\n{result}")
-        
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo crear la tabla:\n{str(e)}")
+        executor.submit(
+            db.execute_query,
+            sql,
+            on_success=lambda result: self._on_create_result(db, schema_name, table_name, *result),
+            on_error=lambda e: self._on_create_result(db, schema_name, table_name, False, str(e)),
+            description=f"Creando tabla {full_table_name}"
+        )
+    
+    def _on_create_result(self, db, schema_name, table_name, success, result):
+        if success:
+            db.invalidate_metadata(schema_name or "public", table_name.lower())
+        if not self.window.winfo_exists():
+            return
+        if success:
+            messagebox.showinfo("Éxito", f"Tabla '{table_name}' creada en schema '{schema_name}'")
+            self.window.destroy()
+            if self.on_success:
+                self.on_success()
+        else:
+            messagebox.showerror("Error", f"No se pudo crear la tabla:\n{result}")
 
 class CreateViewDialog:
 
@@ -562,18 +972,14 @@ class CreateViewDialog:
         main.pack(fill="both", expand=True, padx=10, pady=10)
         ctk.CTkLabel(main, text="Schema:", font=("Arial", 11, "bold")).pack(anchor="w")
 
-        db = conn_manager.get_active_connection()
         schemas = ["public"]
-        if db:
-            success, result = db.get_schemas()
-            if success and result:
-                schemas = result
 
         self.schema_var = ctk.CTkComboBox(
             main, values=schemas, state="readonly"
         )
         self.schema_var.pack(fill="x", pady=(0, 15))
         self.schema_var.set(schemas[0])
+        _load_schemas_async(self.window, self.schema_var)
         ctk.CTkLabel(
             main, text="Nombre de la vista:", font=("Arial", 11, "bold")
         ).pack(anchor="w")
@@ -632,8 +1038,19 @@ class CreateViewDialog:
             messagebox.showerror("Error", "No hay conexión activa")
             return
 
-        success, result = db.execute_query(sql)
+        executor.submit(
+            db.execute_query,
+            sql,
+            on_success=lambda result: self._on_create_result(db, schema, view_name, *result),
+            on_error=lambda e: self._on_create_result(db, schema, view_name, False, str(e)),
+            description=f"Creando vista {full_name}"
+        )
 
+    def _on_create_result(self, db, schema, view_name, success, result):
+        if success:
+            db.invalidate_metadata(schema, view_name.lower())
+        if not self.window.winfo_exists():
+            return
         if success:
             messagebox.showinfo(
                 "Éxito", f"Vista '{view_name}' creada en schema '{schema}'"
@@ -645,3 +1062,613 @@ class CreateViewDialog:
             messagebox.showerror(
                 "Error", f"No se pudo crear la vista:\n{result}"
             )
+
+
+class ImportDialog:
+    """Carga un CSV/TSV en una tabla con COPY FROM STDIN."""
+
+    IGNORE = "(ignorar)"
+    DELIMITERS = {",": ",", ";": ";", "Tabulador": "\t", "|": "|"}
+
+    def __init__(self, parent, db, schema_name, table_name, on_success_callback=None):
+        self.parent = parent
+        self.db = db
+        self.schema_name = schema_name
+        self.table_name = table_name
+        self.on_success = on_success_callback
+        self.window = None
+        self.table_columns = []
+        self.source_columns = []
+        self.mapping_vars = {}
+        self._task = None
+
+        self._create_dialog()
+        executor.submit(
+            db.get_table_columns,
+            table_name,
+            schema_name,
+            on_success=lambda result: self._on_columns(*result),
+            on_error=lambda e: self._on_columns(False, str(e)),
+            description=f"Leyendo columnas de {schema_name}.{table_name}"
+        )
+
+    def _create_dialog(self):
+        self.window = ctk.CTkToplevel(self.parent)
+        self.window.title(f"Importar en {self.schema_name}.{self.table_name}")
+        self.window.geometry("600x650")
+        self.window.grab_set()
+        self.window.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        main = ctk.CTkFrame(self.window)
+        main.pack(fill="both", expand=True, padx=10, pady=10)
+
+        ctk.CTkLabel(main, text="Archivo CSV/TSV:", font=("Arial", 11, "bold")).pack(anchor="w")
+        file_frame = ctk.CTkFrame(main)
+        file_frame.pack(fill="x", pady=(0, 10))
+        self.path_entry = ctk.CTkEntry(file_frame)
+        self.path_entry.pack(side="left", fill="x", expand=True, padx=(0, 5))
+        ctk.CTkButton(
+            file_frame, text="📂 Elegir...", command=self._choose_file, width=100
+        ).pack(side="left")
+
+        options = ctk.CTkFrame(main)
+        options.pack(fill="x", pady=(0, 10))
+        ctk.CTkLabel(options, text="Separador:", font=("Arial", 10)).pack(side="left", padx=(5, 2))
+        self.delimiter_var = ctk.CTkComboBox(
+            options, values=list(self.DELIMITERS), width=110, state="readonly",
+            command=lambda _: self._load_header()
+        )
+        self.delimiter_var.set(",")
+        self.delimiter_var.pack(side="left", padx=5)
+
+        self.header_var = ctk.BooleanVar(value=True)
+        ctk.CTkCheckBox(
+            options, text="Primera fila es cabecera", variable=self.header_var,
+            command=self._load_header, font=("Arial", 10)
+        ).pack(side="left", padx=10)
+
+        ctk.CTkLabel(options, text="Lote:", font=("Arial", 10)).pack(side="left", padx=(10, 2))
+        self.batch_entry = ctk.CTkEntry(options, width=80)
+        self.batch_entry.insert(0, str(DEFAULT_BATCH_SIZE))
+        self.batch_entry.pack(side="left", padx=5)
+
+        ctk.CTkLabel(main, text="Columnas (tabla ← archivo):", font=("Arial", 11, "bold")).pack(anchor="w")
+        self.mapping_frame = ctk.CTkScrollableFrame(main, height=300)
+        self.mapping_frame.pack(fill="both", expand=True, pady=(0, 10))
+        ctk.CTkLabel(self.mapping_frame, text="⏳ Cargando columnas...").pack(anchor="w")
+
+        self.progress_label = ctk.CTkLabel(main, text="", font=("Arial", 11), justify="left")
+        self.progress_label.pack(anchor="w", pady=(0, 10))
+
+        btns = ctk.CTkFrame(main)
+        btns.pack(fill="x")
+        self.import_button = ctk.CTkButton(btns, text="📥 Importar", command=self._import)
+        self.import_button.pack(side="left", expand=True, padx=5)
+        self.cancel_button = ctk.CTkButton(btns, text="❌ Cancelar", command=self._on_close)
+        self.cancel_button.pack(side="left", expand=True, padx=5)
+
+    def _on_columns(self, success, result):
+        if not self.window.winfo_exists():
+            return
+        if not success:
+            messagebox.showerror("Error", f"No se pudieron leer las columnas:\n{result}")
+            return
+        self.table_columns = result
+        self._build_mapping()
+
+    def _choose_file(self):
+        path = filedialog.askopenfilename(
+            parent=self.window,
+            filetypes=[("CSV", "*.csv"), ("TSV", "*.tsv"), ("Todos los archivos", "*.*")]
+        )
+        if not path:
+            return
+        self.path_entry.delete(0, "end")
+        self.path_entry.insert(0, path)
+        self.delimiter_var.set(next(k for k, v in self.DELIMITERS.items() if v == delimiter_for_path(path)))
+        self._load_header()
+
+    def _load_header(self):
+        path = self.path_entry.get().strip()
+        if not path:
+            return
+        try:
+            first_row = read_header(path, self.DELIMITERS[self.delimiter_var.get()])
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo leer el archivo:\n{e}")
+            return
+        if self.header_var.get():
+            self.source_columns = first_row
+        else:
+            self.source_columns = [f"Columna {i + 1}" for i in range(len(first_row))]
+        self._build_mapping()
+
+    def _build_mapping(self):
+        for widget in self.mapping_frame.winfo_children():
+            widget.destroy()
+        self.mapping_vars = {}
+        options = [self.IGNORE] + [f"{i + 1}: {name}" for i, name in enumerate(self.source_columns)]
+        defaults = default_mapping(
+            self.source_columns if self.header_var.get() else [],
+            [col["column_name"] for col in self.table_columns]
+        )
+
+        for col in self.table_columns:
+            row = ctk.CTkFrame(self.mapping_frame)
+            row.pack(fill="x", pady=2)
+            required = "" if col["is_nullable"] else " *"
+            ctk.CTkLabel(
+                row, text=f"{col['column_name']} ({col['data_type']}){required}",
+                width=250, anchor="w", font=("Arial", 10)
+            ).pack(side="left", padx=5)
+            combo = ctk.CTkComboBox(row, values=options, state="readonly", width=250)
+            index = defaults.get(col["column_name"])
+            combo.set(options[index + 1] if index is not None else self.IGNORE)
+            combo.pack(side="left", padx=5)
+            self.mapping_vars[col["column_name"]] = combo
+
+    def _current_mapping(self):
+        mapping = {}
+        for column, combo in self.mapping_vars.items():
+            choice = combo.get()
+            if choice != self.IGNORE:
+                mapping[column] = int(choice.split(":", 1)[0]) - 1
+        return mapping
+
+    def _import(self):
+        if self._task:
+            return
+        path = self.path_entry.get().strip()
+        if not path:
+            messagebox.showerror("Error", "Elige un archivo")
+            return
+        try:
+            batch_size = int(self.batch_entry.get())
+            if batch_size < 1:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "El tamaño de lote debe ser un entero positivo")
+            return
+
+        mapping = self._current_mapping()
+        errors, unmapped_required = validate_mapping(mapping, self.table_columns, len(self.source_columns))
+        if errors:
+            messagebox.showerror("Error", "\n".join(errors))
+            return
+        if unmapped_required and not messagebox.askyesno(
+            "Columnas NOT NULL sin asociar",
+            f"{', '.join(unmapped_required)} no admiten nulos y no tienen columna asociada.\n"
+            "Sólo se podrán cargar si tienen valor por defecto. ¿Continuar?"
+        ):
+            return
+
+        self.import_button.configure(state="disabled")
+        self.progress_label.configure(text="⏳ Importando...")
+        self._task = executor.submit(
+            import_csv,
+            self.db,
+            self.schema_name,
+            self.table_name,
+            path,
+            mapping,
+            delimiter=self.DELIMITERS[self.delimiter_var.get()],
+            header=self.header_var.get(),
+            batch_size=batch_size,
+            on_progress=self._on_progress,
+            on_success=self._on_import_done,
+            on_error=self._on_import_error,
+            description=f"Importando en {self.schema_name}.{self.table_name}"
+        )
+
+    def _on_progress(self, task):
+        if not self.window.winfo_exists():
+            return
+        percent = f" ({task.fraction:.0%})" if task.fraction is not None else ""
+        self.progress_label.configure(text=f"⏳ {task.message}{percent}")
+
+    def _on_import_done(self, result):
+        self._task = None
+        if not self.window.winfo_exists():
+            return
+        self.import_button.configure(state="normal")
+        summary = describe_import(result)
+        self.progress_label.configure(text=f"✅ {summary}")
+        messagebox.showinfo("Importación", summary)
+        if self.on_success:
+            self.on_success()
+
+    def _on_import_error(self, error):
+        self._task = None
+        if not self.window.winfo_exists():
+            return
+        self.import_button.configure(state="normal")
+        self.progress_label.configure(text=f"❌ Error: {error}")
+
+    def _on_close(self):
+        if self._task:
+            if not messagebox.askyesno(
+                "Importación en curso",
+                "¿Cancelar la importación? Los lotes ya confirmados se mantienen."
+            ):
+                return
+            self._task.cancel()
+            self._task = None
+        self.window.destroy()
+
+
+class ScriptRunnerDialog:
+    """Ejecuta un fichero .sql en streaming, sin cargarlo en el editor."""
+
+    LOG_LIMIT = 2000
+
+    def __init__(self, parent, path=None):
+        self.parent = parent
+        self.window = None
+        self._task = None
+        self._db = None
+        self._log = queue.Queue()
+        self._log_lines = 0
+        self._create_dialog()
+        if path:
+            self.path_entry.insert(0, path)
+
+    def _create_dialog(self):
+        self.window = ctk.CTkToplevel(self.parent)
+        self.window.title("Ejecutar script SQL")
+        self.window.geometry("800x600")
+        self.window.grab_set()
+        self.window.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        main = ctk.CTkFrame(self.window)
+        main.pack(fill="both", expand=True, padx=10, pady=10)
+
+        ctk.CTkLabel(main, text="Archivo .sql:", font=("Arial", 11, "bold")).pack(anchor="w")
+        file_frame = ctk.CTkFrame(main)
+        file_frame.pack(fill="x", pady=(0, 10))
+        self.path_entry = ctk.CTkEntry(file_frame)
+        self.path_entry.pack(side="left", fill="x", expand=True, padx=(0, 5))
+        ctk.CTkButton(file_frame, text="📂 Elegir...", command=self._choose_file, width=100).pack(side="left")
+
+        options = ctk.CTkFrame(main)
+        options.pack(fill="x", pady=(0, 10))
+        ctk.CTkLabel(options, text="Sentencias por transacción (0 = todo):", font=("Arial", 10)).pack(side="left", padx=5)
+        self.batch_entry = ctk.CTkEntry(options, width=70)
+        self.batch_entry.insert(0, "100")
+        self.batch_entry.pack(side="left", padx=5)
+        ctk.CTkLabel(options, text="Timeout (s):", font=("Arial", 10)).pack(side="left", padx=(10, 2))
+        self.timeout_entry = ctk.CTkEntry(options, width=60, placeholder_text="—")
+        self.timeout_entry.pack(side="left", padx=5)
+        self.continue_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            options, text="Continuar si hay errores", variable=self.continue_var, font=("Arial", 10)
+        ).pack(side="left", padx=10)
+
+        self.progress_bar = ctk.CTkProgressBar(main)
+        self.progress_bar.pack(fill="x", pady=(0, 5))
+        self.progress_bar.set(0)
+        self.progress_label = ctk.CTkLabel(main, text="", font=("Arial", 11))
+        self.progress_label.pack(anchor="w")
+
+        self.log_box = ctk.CTkTextbox(main, font=("Courier", 11))
+        self.log_box.pack(fill="both", expand=True, pady=(5, 10))
+
+        btns = ctk.CTkFrame(main)
+        btns.pack(fill="x")
+        self.run_button = ctk.CTkButton(btns, text="▶ Ejecutar script", command=self._run)
+        self.run_button.pack(side="left", expand=True, padx=5)
+        self.stop_button = ctk.CTkButton(
+            btns, text="⏹ Detener", command=self._stop, fg_color="#8B0000", state="disabled"
+        )
+        self.stop_button.pack(side="left", expand=True, padx=5)
+
+    def _choose_file(self):
+        path = filedialog.askopenfilename(
+            parent=self.window,
+            filetypes=[("SQL Files", "*.sql"), ("All Files", "*.*")]
+        )
+        if path:
+            self.path_entry.delete(0, "end")
+            self.path_entry.insert(0, path)
+
+    def _run(self):
+        if self._task:
+            return
+        path = self.path_entry.get().strip()
+        if not path or not os.path.isfile(path):
+            messagebox.showerror("Error", "Elige un archivo .sql existente")
+            return
+        db = conn_manager.get_active_connection()
+        if not db:
+            messagebox.showerror("Error", "No hay conexión activa")
+            return
+        try:
+            batch_size = int(self.batch_entry.get())
+            timeout = self.timeout_entry.get().strip()
+            timeout = float(timeout) if timeout else db.statement_timeout
+            if batch_size < 0 or (timeout is not None and timeout <= 0):
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "Lote y timeout deben ser números positivos")
+            return
+
+        self.log_box.delete("1.0", "end")
+        self._log_lines = 0
+        self.progress_bar.set(0)
+        self.progress_label.configure(text="⏳ Ejecutando...")
+        self.run_button.configure(state="disabled")
+        self.stop_button.configure(state="normal")
+        self._db = db
+        self._task = executor.submit(
+            run_script,
+            db,
+            path,
+            batch_size=batch_size,
+            stop_on_error=not self.continue_var.get(),
+            timeout=timeout,
+            on_statement=self._log.put,
+            on_progress=self._on_progress,
+            on_success=self._on_done,
+            on_error=self._on_error,
+            description=f"Ejecutando {os.path.basename(path)}"
+        )
+
+    def _drain_log(self):
+        lines = []
+        while True:
+            try:
+                entry = self._log.get_nowait()
+            except queue.Empty:
+                break
+            if self._log_lines >= self.LOG_LIMIT and not entry["error"]:
+                continue
+            self._log_lines += 1
+            if entry["skipped"]:
+                status = "  omitida "
+            elif entry["error"]:
+                status = "❌ error   "
+            else:
+                status = f"{entry['seconds']:8.3f} s"
+            line = f"{status}  línea {entry['line']}: {entry['sql']}"
+            if entry["error"]:
+                line += f"\n           {entry['error']}"
+            lines.append(line)
+        if lines:
+            self.log_box.insert("end", "\n".join(lines) + "\n")
+            self.log_box.see("end")
+
+    def _on_progress(self, task):
+        if not self.window.winfo_exists():
+            return
+        self._drain_log()
+        if task.fraction is not None:
+            self.progress_bar.set(task.fraction)
+        self.progress_label.configure(text=f"⏳ {task.message}")
+
+    def _finish(self):
+        self._task = None
+        self.run_button.configure(state="normal")
+        self.stop_button.configure(state="disabled")
+        self._drain_log()
+
+    def _on_done(self, summary):
+        if not self.window.winfo_exists():
+            return
+        self._finish()
+        self.progress_bar.set(1)
+        icon = "⚠️" if summary["failed"] else "✅"
+        self.progress_label.configure(text=f"{icon} {describe_script(summary).splitlines()[0]}")
+        self.log_box.insert("end", "\n" + describe_script(summary) + "\n")
+        self.log_box.see("end")
+
+    def _on_error(self, error):
+        if not self.window.winfo_exists():
+            return
+        self._finish()
+        self.progress_label.configure(text=f"❌ Error: {error}")
+
+    def _stop(self):
+        if not self._task:
+            return
+        self._task.cancel()
+        self._finish()
+        self.progress_label.configure(text="⏹ Script detenido; se deshizo el lote en curso")
+
+    def _on_close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        self.window.destroy()
+
+
+def _format_seconds(seconds):
+    if seconds is None:
+        return "—"
+    if seconds < 1:
+        return f"{seconds * 1000:,.1f} ms"
+    return f"{seconds:,.2f} s"
+
+
+class QueryHistoryDialog:
+    """Latencias p50/p95/máx por huella de consulta, leídas del historial SQLite."""
+
+    ALL_CONNECTIONS = "Todas las conexiones"
+    PERIODS = {
+        "Siempre": None,
+        "Última hora": 3600,
+        "Últimas 24 h": 86400,
+        "Últimos 7 días": 7 * 86400,
+    }
+
+    def __init__(self, parent, on_select_sql=None):
+        self.parent = parent
+        self.on_select_sql = on_select_sql
+        self.window = None
+        self._stats = {}
+        self._recent = {}
+        self._create_dialog()
+        self._reload()
+
+    def _create_dialog(self):
+        self.window = ctk.CTkToplevel(self.parent)
+        self.window.title("Historial de consultas")
+        self.window.geometry("1000x650")
+        self.window.grab_set()
+
+        filters = ctk.CTkFrame(self.window)
+        filters.pack(fill="x", padx=10, pady=(10, 5))
+        self.connection_combo = ctk.CTkComboBox(
+            filters, values=[self.ALL_CONNECTIONS], width=220, command=lambda _: self._reload()
+        )
+        self.connection_combo.set(self.ALL_CONNECTIONS)
+        self.connection_combo.pack(side="left", padx=5)
+        self.period_combo = ctk.CTkComboBox(
+            filters, values=list(self.PERIODS), width=150, command=lambda _: self._reload()
+        )
+        self.period_combo.set("Últimas 24 h")
+        self.period_combo.pack(side="left", padx=5)
+        ctk.CTkButton(filters, text="🔄 Actualizar", command=self._reload, width=110).pack(side="left", padx=5)
+        ctk.CTkButton(
+            filters, text="🗑 Vaciar", command=self._clear, width=90, fg_color="#8B0000"
+        ).pack(side="right", padx=5)
+        self.status_label = ctk.CTkLabel(filters, text="", font=("Arial", 10))
+        self.status_label.pack(side="left", padx=10)
+
+        stats_frame = ctk.CTkFrame(self.window)
+        stats_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        self.stats_tree = ttk.Treeview(
+            stats_frame,
+            columns=("count", "errors", "p50", "p95", "max", "last", "sql"),
+            show="headings",
+            selectmode="browse"
+        )
+        for col, title, width, anchor in (
+            ("count", "Ejecuciones", 90, "e"),
+            ("errors", "Errores", 70, "e"),
+            ("p50", "p50", 90, "e"),
+            ("p95", "p95", 90, "e"),
+            ("max", "Máx", 90, "e"),
+            ("last", "Última", 130, "w"),
+            ("sql", "Consulta", 420, "w"),
+        ):
+            self.stats_tree.heading(col, text=title)
+            self.stats_tree.column(col, width=width, anchor=anchor, stretch=(col == "sql"))
+        scrollbar = ttk.Scrollbar(stats_frame, orient="vertical", command=self.stats_tree.yview)
+        self.stats_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        self.stats_tree.pack(fill="both", expand=True)
+        self.stats_tree.bind("<<TreeviewSelect>>", self._on_select_fingerprint)
+
+        ctk.CTkLabel(
+            self.window,
+            text="Ejecuciones recientes (doble clic para llevar la consulta al editor):",
+            font=("Arial", 11, "bold")
+        ).pack(padx=10, anchor="w")
+        recent_frame = ctk.CTkFrame(self.window)
+        recent_frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self.recent_tree = ttk.Treeview(
+            recent_frame,
+            columns=("when", "connection", "seconds", "rows", "status", "sql"),
+            show="headings",
+            selectmode="browse"
+        )
+        for col, title, width, anchor in (
+            ("when", "Fecha", 130, "w"),
+            ("connection", "Conexión", 140, "w"),
+            ("seconds", "Duración", 90, "e"),
+            ("rows", "Filas", 80, "e"),
+            ("status", "Estado", 80, "w"),
+            ("sql", "SQL", 420, "w"),
+        ):
+            self.recent_tree.heading(col, text=title)
+            self.recent_tree.column(col, width=width, anchor=anchor, stretch=(col == "sql"))
+        self.recent_tree.pack(fill="both", expand=True)
+        self.recent_tree.bind("<Double-1>", self._on_recent_double_click)
+
+    def _filters(self):
+        connection = self.connection_combo.get()
+        period = self.PERIODS.get(self.period_combo.get())
+        return (
+            None if connection == self.ALL_CONNECTIONS else connection,
+            time.time() - period if period else None
+        )
+
+    def _reload(self):
+        connection, since = self._filters()
+        self.status_label.configure(text="⏳ Cargando...")
+
+        def load():
+            return query_history.connections(), query_history.stats(connection=connection, since=since)
+
+        executor.submit(
+            load,
+            on_success=self._show_stats,
+            on_error=lambda e: self.status_label.configure(text=f"❌ Error: {e}"),
+            description="Leyendo historial de consultas"
+        )
+
+    def _show_stats(self, result):
+        if not self.window.winfo_exists():
+            return
+        connections, stats = result
+        self.connection_combo.configure(values=[self.ALL_CONNECTIONS] + connections)
+        self.stats_tree.delete(*self.stats_tree.get_children())
+        self.recent_tree.delete(*self.recent_tree.get_children())
+        self._stats = {}
+        for entry in stats:
+            item = self.stats_tree.insert("", "end", values=(
+                f"{entry['count']:,}",
+                f"{entry['errors']:,}",
+                _format_seconds(entry["p50"]),
+                _format_seconds(entry["p95"]),
+                _format_seconds(entry["max"]),
+                time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["last_run"])),
+                " ".join(entry["sql"].split())[:300],
+            ))
+            self._stats[item] = entry
+        total = sum(entry["count"] for entry in stats)
+        self.status_label.configure(text=f"{len(stats):,} consultas distintas · {total:,} ejecuciones")
+
+    def _on_select_fingerprint(self, event=None):
+        selection = self.stats_tree.selection()
+        if not selection or selection[0] not in self._stats:
+            return
+        fingerprint = self._stats[selection[0]]["fingerprint"]
+        connection, _ = self._filters()
+        executor.submit(
+            query_history.recent,
+            fingerprint=fingerprint,
+            connection=connection,
+            on_success=self._show_recent,
+            description="Leyendo ejecuciones recientes"
+        )
+
+    def _show_recent(self, runs):
+        if not self.window.winfo_exists():
+            return
+        self.recent_tree.delete(*self.recent_tree.get_children())
+        self._recent = {}
+        for run in runs:
+            item = self.recent_tree.insert("", "end", values=(
+                time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run["executed_at"])),
+                run["connection"],
+                _format_seconds(run["seconds"]),
+                "—" if run["rows"] is None else f"{run['rows']:,}",
+                run["status"] if not run["error"] else f"{run['status']}: {run['error']}",
+                " ".join(run["sql"].split())[:300],
+            ))
+            self._recent[item] = run
+
+    def _on_recent_double_click(self, event=None):
+        selection = self.recent_tree.selection()
+        if selection and selection[0] in self._recent and self.on_select_sql:
+            self.on_select_sql(self._recent[selection[0]]["sql"])
+            self.window.destroy()
+
+    def _clear(self):
+        if not messagebox.askyesno("Historial", "¿Borrar todo el historial de consultas?"):
+            return
+        executor.submit(
+            query_history.clear,
+            on_success=lambda _: self._reload(),
+            description="Vaciando historial de consultas"
+        )
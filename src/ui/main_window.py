@@ -1,8 +1,14 @@
 import customtkinter as ctk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from src.db.manager import conn_manager
-from src.ui.dialogs import ConnectionDialog, SQLEditorDialog, CreateTableDialog, CreateViewDialog
-from src.ui.tree_view import TreeViewManager
+from src.ui.tree_view import TreeViewManager, CONNECTION_STATUS_ICONS
+from src.ui.result_grid import ResultGrid, ListRowSource
+from src.ui.perf_panel import PerformancePanel
+from src.ui.search_panel import SearchPanel
+from src.utils.executor import executor, current_task
+from src.utils.perf import timed, UI, RENDER
+from src.utils.pagination import TablePaginator
+from src.utils import startup
 
 
 class MainWindow:
@@ -11,20 +17,27 @@ class MainWindow:
         self.root.title("DBAdmin - DBeaver Style")
         self.root.geometry("1080x600")
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        executor.attach(self.root)
         
         self.selected_table = None
         self.tree_manager = None
+        self._count_task = None
+        self._info_task = None
+        self._data_task = None
+        self._dropdown_names = {}
+        self._paginator = None
+        self._prefetch_task = None
         
         self._create_ui()
+        startup.mark("crear ventana")
     
     def _create_ui(self):
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("blue")
         self._create_top_bar()
+        self._create_status_bar()
 
         self._create_main_content()
-
-        self._load_saved_connections_to_tree()
     
     def _create_top_bar(self):
         top_bar = ctk.CTkFrame(self.root, height=50)
@@ -74,6 +87,40 @@ class MainWindow:
             font=("Arial", 12)
         ).pack(side="left", padx=5)
     
+    def _create_status_bar(self):
+        status_bar = ctk.CTkFrame(self.root, height=30)
+        status_bar.pack(side="bottom", fill="x", padx=10, pady=(0, 10))
+        
+        self.status_label = ctk.CTkLabel(status_bar, text="✅ Listo", font=("Arial", 11))
+        self.status_label.pack(side="left", padx=10)
+        
+        self.cancel_tasks_button = ctk.CTkButton(
+            status_bar,
+            text="⏹ Cancelar tareas",
+            command=executor.cancel_all,
+            font=("Arial", 11),
+            width=140,
+            state="disabled"
+        )
+        self.cancel_tasks_button.pack(side="right", padx=5, pady=3)
+        
+        executor.add_listener(self._on_tasks_changed)
+    
+    def _on_tasks_changed(self, tasks):
+        if not tasks:
+            self.status_label.configure(text="✅ Listo")
+            self.cancel_tasks_button.configure(state="disabled")
+            return
+        
+        task = tasks[0]
+        text = f"⏳ {len(tasks)} tarea(s) en curso: {task.description}"
+        if task.message:
+            text += f" — {task.message}"
+        if task.fraction is not None:
+            text += f" ({task.fraction:.0%})"
+        self.status_label.configure(text=text)
+        self.cancel_tasks_button.configure(state="normal")
+    
     def _create_main_content(self):
         main_frame = ctk.CTkFrame(self.root)
         main_frame.pack(fill="both", expand=True, padx=10, pady=10)
@@ -96,9 +143,14 @@ class MainWindow:
         self.tree_manager = TreeViewManager(
             self.tree,
             self._on_tree_select,
-            self._on_table_selected
+            self._on_table_selected,
+            on_export_request=self._export_table,
+            on_import_request=self._open_import_dialog
         )
         
+        self.search_panel = SearchPanel(left_panel, self.tree_manager, fg_color="transparent")
+        self.search_panel.pack(fill="x", before=tree_frame)
+        
         right_panel = ctk.CTkFrame(main_frame)
         right_panel.pack(side="right", fill="both", expand=True)
         
@@ -108,11 +160,22 @@ class MainWindow:
         self._create_info_tab()
        
         self._create_data_tab()
+        
+        self._create_performance_tab()
     
     def _create_info_tab(self):
         info_frame = ctk.CTkFrame(self.notebook)
         self.notebook.add(info_frame, text="📋 Información")
         
+        self.count_button = ctk.CTkButton(
+            info_frame,
+            text="🔢 Contar filas (exacto)",
+            command=self._toggle_exact_count,
+            font=("Arial", 11),
+            state="disabled"
+        )
+        self.count_button.pack(padx=20, pady=(10, 0), anchor="nw")
+        
         self.info_label = ctk.CTkLabel(
             info_frame,
             text="Selecciona una tabla para ver detalles",
@@ -125,23 +188,98 @@ class MainWindow:
         data_frame = ctk.CTkFrame(self.notebook)
         self.notebook.add(data_frame, text="📊 Datos")
         
-        self.data_tree = ttk.Treeview(data_frame)
-        self.data_tree.pack(fill="both", expand=True, padx=5, pady=5)
+        nav_bar = ctk.CTkFrame(data_frame)
+        nav_bar.pack(fill="x", padx=5, pady=(5, 0))
+        
+        self.prev_page_button = ctk.CTkButton(
+            nav_bar,
+            text="◀ Anterior",
+            command=lambda: self._change_page(forward=False),
+            font=("Arial", 11),
+            width=100,
+            state="disabled"
+        )
+        self.prev_page_button.pack(side="left", padx=5)
+        
+        self.next_page_button = ctk.CTkButton(
+            nav_bar,
+            text="Siguiente ▶",
+            command=lambda: self._change_page(forward=True),
+            font=("Arial", 11),
+            width=100,
+            state="disabled"
+        )
+        self.next_page_button.pack(side="left", padx=5)
+        
+        self.page_label = ctk.CTkLabel(nav_bar, text="", font=("Arial", 11))
+        self.page_label.pack(side="left", padx=10)
+        
+        self.data_grid = ResultGrid(data_frame, column_width=120)
+        self.data_grid.pack(fill="both", expand=True, padx=5, pady=5)
+    
+    def _create_performance_tab(self):
+        self.performance_panel = PerformancePanel(self.notebook)
+        self.notebook.add(self.performance_panel, text="⏱ Rendimiento")
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+    
+    def _on_tab_changed(self, event=None):
+        if self.notebook.select() == str(self.performance_panel):
+            self.performance_panel.refresh()
     
     def _open_connection_dialog(self):
+        from src.ui.dialogs import ConnectionDialog
         ConnectionDialog(self.root, self._on_connection_added)
     
+    def _on_first_paint(self):
+        """
+        La ventana ya está en pantalla: ahora se leen las conexiones guardadas
+        y se conectan en segundo plano.
+        """
+        startup.mark("primer pintado")
+        self._load_saved_connections_to_tree()
+        startup.mark("cargar conexiones guardadas")
+        if not (conn_manager.connections and conn_manager.warm_up_on_start):
+            startup.finish()
+    
     def _load_saved_connections_to_tree(self):
-        connections = conn_manager.list_connections()
+        connections = conn_manager.connections
         
         if connections:
             self._update_connection_dropdown()
-            for conn_name in connections:
-                db = conn_manager.connections[conn_name]
+            for conn_name, db in connections.items():
                 self.tree_manager.add_connection(conn_name, db)
+            if conn_manager.warm_up_on_start:
+                self._warm_up_connections()
         else:
             self._update_connection_dropdown()
     
+    def _warm_up_connections(self):
+        def run():
+            task = current_task()
+            return conn_manager.warm_up(
+                on_status=lambda name, db: task.report(f"{name}: {db.status}")
+            )
+        
+        executor.submit(
+            run,
+            on_progress=lambda task: self._on_connection_status_changed(),
+            on_success=lambda statuses: self._on_warm_up_done(),
+            on_error=lambda e: startup.finish(),
+            description="Conectando conexiones guardadas"
+        )
+    
+    def _on_warm_up_done(self):
+        self._on_connection_status_changed()
+        startup.mark("conectar conexiones guardadas")
+        startup.finish()
+        # Con las conexiones ya abiertas, los esquemas se traen en segundo
+        # plano para que expandir una conexión no espere al servidor.
+        self.tree_manager.preload_connections()
+    
+    def _on_connection_status_changed(self):
+        self._update_connection_dropdown()
+        self.tree_manager.update_connection_status()
+    
     def _open_sql_editor(self):
         if not conn_manager.get_active_connection():
             messagebox.showwarning(
@@ -150,6 +288,7 @@ class MainWindow:
             )
             return
         
+        from src.ui.dialogs import SQLEditorDialog
         SQLEditorDialog(self.root)
     
     def _open_create_table_dialog(self):
@@ -160,6 +299,7 @@ class MainWindow:
             )
             return
         
+        from src.ui.dialogs import CreateTableDialog
         CreateTableDialog(self.root, self._refresh_tree)
 
     def _open_create_view_dialog(self):
@@ -170,6 +310,7 @@ class MainWindow:
             )
            return
        
+       from src.ui.dialogs import CreateViewDialog
        CreateViewDialog(self.root, self._refresh_tree)
     
     def _on_connection_added(self, conn_name):
@@ -179,42 +320,100 @@ class MainWindow:
         self.tree_manager.add_connection(conn_name, db)
     
     def _update_connection_dropdown(self):
-        connections = conn_manager.list_connections()
+        connections = conn_manager.connections
         if connections:
-            self.conn_dropdown.configure(values=connections)
-            self.conn_dropdown.set(conn_manager.active_connection or connections[0])
+            labels = {}
+            for name, db in connections.items():
+                labels[f"{name}{CONNECTION_STATUS_ICONS.get(db.status, '')}"] = name
+            self._dropdown_names = labels
+            
+            active = conn_manager.active_connection
+            if active not in connections:
+                active = next(iter(connections))
+            self.conn_dropdown.configure(values=list(labels))
+            self.conn_dropdown.set(next(label for label, name in labels.items() if name == active))
         else:
+            self._dropdown_names = {}
             self.conn_dropdown.configure(values=["Sin conexiones"])
             self.conn_dropdown.set("Sin conexiones")
     
     def _on_connection_selected(self, choice):
         if choice != "Sin conexiones":
-            conn_manager.set_active_connection(choice)
+            conn_manager.set_active_connection(self._dropdown_names.get(choice, choice))
     
     def _refresh_tree(self):
-        self.tree_manager.refresh_tree()
+        self.tree_manager.refresh_tree(on_done=lambda summary: self._on_connection_status_changed())
     
-    def _on_tree_select(self, node_type, name, db):
+    def _on_tree_select(self, node_type, name, db, schema="public"):
         if node_type == "table":
-            self._show_table_info(name, db)
-        elif node_type == "view":
-            success,ddl = db.get_view_ddl(name)
-            self._show_ddl(name, ddl)
-        elif node_type == "function":
-            success,ddl = db.get_function_ddl(name)
-            self._show_ddl(name, ddl)
-            self._clear_data_tab()
-        elif node_type == "index":
-            success,ddl = db.get_index_ddl(name)
-            self._show_ddl(name, ddl)
+            self._show_table_info(name, db, schema)
+            return
+        
+        self.selected_table = None
+        if not self._count_task:
+            self.count_button.configure(state="disabled")
+        
+        ddl_getters = {
+            "view": "get_view_ddl",
+            "function": "get_function_ddl",
+            "index": "get_index_ddl",
+        }
+        getter = ddl_getters.get(node_type)
+        if getter and db:
+            self.info_label.configure(text=f"⏳ Cargando {name}...")
+            self._info_task = self._replace_task(
+                self._info_task,
+                getattr(db, getter),
+                name,
+                schema,
+                on_success=lambda result: self._show_ddl(name, result[1]),
+                on_error=self._show_info_error,
+                description=f"Obteniendo DDL de {name}"
+            )
+            if node_type != "view":
+                self._clear_data_tab()
+        elif node_type == "connection" and db:
+            self._show_connection_info(name, db)
             self._clear_data_tab()
         else:
             self.info_label.configure(text=f"ℹ️ {name}")
             self._clear_data_tab()
+    
+    def _show_connection_info(self, name, db):
+        stats = db.pool_stats()
+        info_text = f"📦 Conexión: {name}\n"
+        info_text += f"🖥️ {db.user}@{db.host}:{db.port}/{db.dbname}\n"
+        info_text += f"⏱ statement_timeout: {f'{db.statement_timeout} s' if db.statement_timeout else 'sin límite'}\n"
+        info_text += "=" * 60 + "\n\n"
+        info_text += "Pool de conexiones:\n"
+        info_text += "-" * 60 + "\n"
+        if stats:
+            info_text += f"En uso: {stats['in_use']}  Libres: {stats['idle']}  "
+            info_text += f"(mín. {stats['min_size']}, máx. {stats['max_size']})\n"
+            info_text += f"Creadas: {stats['created']}  Cerradas: {stats['closed']}  "
+            info_text += f"Expulsadas por inactividad: {stats['evicted']}\n"
+            info_text += f"Checkouts: {stats['checkouts']}  Esperas: {stats['waits']}  "
+            info_text += f"Timeouts: {stats['timeouts']}"
+        else:
+            info_text += "Sin pool activo"
+        
+        cache = db.metadata.stats()
+        info_text += "\n\nCaché de metadatos:\n"
+        info_text += "-" * 60 + "\n"
+        info_text += f"Entradas: {cache['size']}/{cache['max_entries']}  TTL: {cache['ttl']} s\n"
+        info_text += f"Aciertos: {cache['hits']}  Fallos: {cache['misses']}  "
+        info_text += f"Caducadas: {cache['expired']}  Expulsadas: {cache['evicted']}"
+        self.info_label.configure(text=info_text)
 
+    @staticmethod
+    def _replace_task(previous, fn, *args, **kwargs):
+        """Cancela la tarea anterior de un mismo panel y lanza la nueva."""
+        if previous:
+            previous.cancel()
+        return executor.submit(fn, *args, **kwargs)
     
-    def _on_table_selected(self, db, table_name):
-        self._show_table_data(db, table_name)
+    def _on_table_selected(self, db, table_name, schema="public"):
+        self._show_table_data(db, table_name, schema)
     
     def _show_ddl(self,name,ddl):
         info_text= f"ℹ️ {name}"
@@ -222,15 +421,41 @@ class MainWindow:
         info_text += "-" * 60 + "\n"
         info_text += ddl
         self.info_label.configure(text=info_text)
+    
+    def _show_info_error(self, error):
+        self.info_label.configure(text=f"❌ Error: {str(error)}")
         
-    def _show_table_info(self, table_name, db):
+    def _show_table_info(self, table_name, db, schema="public"):
         if not db:
             return
         
-        self.selected_table = table_name
-
-        columns = self._get_columns(db, table_name)
-        count = self._get_table_count(db, table_name)
+        self.selected_table = (db, schema, table_name)
+        if not self._count_task:
+            self.count_button.configure(state="normal")
+        
+        self.info_label.configure(text=f"⏳ Cargando {table_name}...")
+        self._info_task = self._replace_task(
+            self._info_task,
+            self._fetch_table_info,
+            db,
+            schema,
+            table_name,
+            on_success=lambda columns: self._render_table_info(table_name, db, schema, columns),
+            on_error=self._show_info_error,
+            description=f"Cargando información de {table_name}"
+        )
+    
+    @staticmethod
+    def _fetch_table_info(db, schema, table_name):
+        db.row_counts.ensure_estimates(schema)
+        success, result = db.get_table_columns(table_name, schema)
+        if success:
+            return result
+        return []
+    
+    @timed("main.render_table_info", RENDER)
+    def _render_table_info(self, table_name, db, schema, columns):
+        count = db.row_counts.label(schema, table_name) or "?"
      
         ddl = f"CREATE TABLE {table_name} (\n"
         
@@ -241,7 +466,7 @@ class MainWindow:
             
             ddl += f"    {col_name} {col_type}"
             
-            if is_nullable == 'NO':
+            if not is_nullable:
                 ddl += " NOT NULL"
             
             if idx < len(columns) - 1:
@@ -261,59 +486,178 @@ class MainWindow:
         
         self.info_label.configure(text=info_text)
     
-    def _show_table_data(self, db, table_name, limit=100):
-
-        self._clear_data_tab()
+    @timed("main.show_table_data", UI)
+    def _show_table_data(self, db, table_name, schema="public", page_size=100):
+        self._paginator = None
+        self._update_page_controls()
+        self.data_grid.show_message("⏳ Cargando...")
         
-        try:
-            query = f"SELECT * FROM {table_name} LIMIT {limit}"
-            success, data = db.execute_query_dict(query)
-            
-            if not success or not data:
-                self.data_tree.insert("", "end", text="Sin datos")
-                return
-            
-            columns = list(data[0].keys())
-            self.data_tree['columns'] = columns
-            self.data_tree.column("#0", width=0, stretch=False)
-            
-            for col in columns:
-                self.data_tree.column(col, anchor="w", width=120)
-                self.data_tree.heading(col, text=col)
-            
-            for idx, row in enumerate(data):
-                values = [str(row.get(col, "")) for col in columns]
-                self.data_tree.insert("", "end", text=str(idx + 1), values=values)
+        self._data_task = self._replace_task(
+            self._data_task,
+            self._open_paginator,
+            db,
+            schema,
+            table_name,
+            page_size,
+            on_success=self._on_paginator_ready,
+            on_error=lambda e: self.data_grid.show_message(f"Error: {str(e)}"),
+            description=f"Leyendo datos de {table_name}"
+        )
+    
+    @staticmethod
+    def _open_paginator(db, schema, table_name, page_size):
+        """Se ejecuta en un worker: detecta la clave y trae la primera página."""
+        success, key_columns = db.get_table_key(table_name, schema)
+        paginator = TablePaginator(
+            db,
+            schema,
+            table_name,
+            key_columns if success else None,
+            page_size=page_size
+        )
+        paginator.first_page()
+        return paginator
+    
+    def _on_paginator_ready(self, paginator):
+        self._paginator = paginator
+        self._render_page()
+    
+    def _change_page(self, forward):
+        paginator = self._paginator
+        if not paginator or (self._data_task and not self._data_task.done):
+            return
         
-        except Exception as e:
-            self.data_tree.insert("", "end", text=f"Error: {str(e)}")
+        self.prev_page_button.configure(state="disabled")
+        self.next_page_button.configure(state="disabled")
+        self._data_task = executor.submit(
+            paginator.next_page if forward else paginator.prev_page,
+            on_success=lambda rows: self._render_page(),
+            on_error=lambda e: self.data_grid.show_message(f"Error: {str(e)}"),
+            description=f"Leyendo datos de {paginator.table_name}"
+        )
+    
+    @timed("main.render_page", RENDER)
+    def _render_page(self):
+        paginator = self._paginator
+        self._update_page_controls()
+        rows = paginator.rows
+        
+        if not rows:
+            self.data_grid.show_message("Sin datos")
+            return
+        
+        columns = list(rows[0].keys())
+        self.data_grid.set_source(
+            ListRowSource(columns, rows),
+            row_offset=paginator.first_row_number - 1
+        )
+        
+        if paginator.has_next:
+            if self._prefetch_task:
+                self._prefetch_task.cancel()
+            self._prefetch_task = executor.submit(
+                paginator.prefetch_next,
+                on_error=lambda e: None,
+                description=f"Precargando página de {paginator.table_name}"
+            )
+    
+    def _update_page_controls(self):
+        paginator = self._paginator
+        if not paginator:
+            self.prev_page_button.configure(state="disabled")
+            self.next_page_button.configure(state="disabled")
+            self.page_label.configure(text="")
+            return
+        
+        self.prev_page_button.configure(state="normal" if paginator.has_prev else "disabled")
+        self.next_page_button.configure(state="normal" if paginator.has_next else "disabled")
+        first = paginator.first_row_number
+        last = first + len(paginator.rows) - 1
+        mode = f"keyset ({', '.join(paginator.key_columns)})" if paginator.key_columns else "offset"
+        self.page_label.configure(
+            text=f"Página {paginator.page_number} · filas {first}–{last} · {mode}"
+        )
     
     def _clear_data_tab(self):
-        for item in self.data_tree.get_children():
-            self.data_tree.delete(item)
+        self._paginator = None
+        self._update_page_controls()
+        self.data_grid.clear()
+    
+    def _export_table(self, db, table_name, schema="public"):
+        from src.utils.export import export_table, describe_export, EXPORT_FILETYPES
+        path = filedialog.asksaveasfilename(
+            parent=self.root,
+            initialfile=f"{table_name}.csv",
+            defaultextension=".csv",
+            filetypes=EXPORT_FILETYPES
+        )
+        if not path:
+            return
+        executor.submit(
+            export_table,
+            db,
+            schema,
+            table_name,
+            path,
+            on_success=lambda result: messagebox.showinfo("Exportación", describe_export(result)),
+            on_error=lambda e: messagebox.showerror("Error", f"No se pudo exportar {table_name}:\n{e}"),
+            description=f"Exportando {schema}.{table_name}"
+        )
+    
+    def _open_import_dialog(self, db, table_name, schema="public"):
+        from src.ui.dialogs import ImportDialog
+        ImportDialog(
+            self.root, db, schema, table_name,
+            on_success_callback=lambda: self._reload_row_estimates(db, schema)
+        )
+    
+    def _reload_row_estimates(self, db, schema):
+        executor.submit(
+            db.row_counts.load_estimates,
+            schema,
+            on_success=lambda _: self.tree_manager.update_table_counts(db),
+            description=f"Actualizando filas estimadas de {schema}"
+        )
+    
+    def _toggle_exact_count(self):
+        if self._count_task:
+            self._count_task.cancel()
+            self._finish_exact_count()
+            return
+        if not self.selected_table:
+            return
         
-        self.data_tree['columns'] = ()
-
-        for col in list(self.data_tree['columns']):
-            self.data_tree.heading(col, text="")
+        db, schema, table_name = self.selected_table
+        self._count_task = db.row_counts.count_exact(
+            schema,
+            table_name,
+            on_success=lambda count: self._on_exact_count(db, schema, table_name),
+            on_error=self._on_exact_count_error
+        )
+        self.count_button.configure(text="⏹ Cancelar conteo")
     
-    @staticmethod
-    def _get_columns(db, table_name):
-        success, result = db.get_table_columns(table_name)
-        if success:
-            return result
-        return []
+    def _finish_exact_count(self):
+        self._count_task = None
+        self.count_button.configure(
+            text="🔢 Contar filas (exacto)",
+            state="normal" if self.selected_table else "disabled"
+        )
     
-    @staticmethod
-    def _get_table_count(db, table_name):
-        success, count = db.get_table_count(table_name)
-        if success:
-            return count
-        return 0
+    def _on_exact_count(self, db, schema, table_name):
+        self._finish_exact_count()
+        self.tree_manager.update_table_counts(db)
+        if self.selected_table == (db, schema, table_name):
+            self._show_table_info(table_name, db, schema)
+    
+    def _on_exact_count_error(self, error):
+        self._finish_exact_count()
+        messagebox.showerror("Error", f"Error contando filas: {str(error)}")
     
     def _on_close(self):
+        executor.shutdown()
         conn_manager.close_all()
         self.root.destroy()
     
     def run(self):
+        self.root.after_idle(self._on_first_paint)
         self.root.mainloop()
@@ -0,0 +1,123 @@
+"""
+Pestaña "Rendimiento": últimos spans de src.utils.perf y reparto del
+tiempo entre conexión, servidor, lectura de filas y pintado.
+"""
+import time
+import customtkinter as ctk
+from tkinter import ttk, filedialog, messagebox
+from src.utils.perf import perf, CATEGORIES
+
+
+CATEGORY_LABELS = {
+    "connect": "🔌 Conexión",
+    "server": "🖥 Servidor",
+    "fetch": "📥 Lectura",
+    "render": "🎨 Pintado",
+    "ui": "🖱 Interfaz",
+}
+
+
+class PerformancePanel(ctk.CTkFrame):
+
+    MAX_ROWS = 500
+
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        toolbar = ctk.CTkFrame(self)
+        toolbar.pack(fill="x", padx=5, pady=(5, 0))
+        ctk.CTkButton(toolbar, text="🔄 Actualizar", command=self.refresh, width=110).pack(side="left", padx=5)
+        ctk.CTkButton(toolbar, text="🧹 Limpiar", command=self._clear, width=90).pack(side="left", padx=5)
+
+        self.enabled_var = ctk.BooleanVar(value=perf.enabled)
+        ctk.CTkCheckBox(
+            toolbar,
+            text="Registrar",
+            variable=self.enabled_var,
+            command=lambda: setattr(perf, "enabled", self.enabled_var.get())
+        ).pack(side="left", padx=5)
+
+        self.json_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            toolbar,
+            text="{ } JSON",
+            variable=self.json_var,
+            command=self.refresh
+        ).pack(side="left", padx=5)
+        ctk.CTkButton(toolbar, text="💾 Guardar JSON...", command=self._save_json, width=130).pack(side="right", padx=5)
+
+        self.summary = ctk.CTkLabel(self, text="", anchor="w", justify="left", font=("Courier", 11))
+        self.summary.pack(fill="x", padx=10, pady=5)
+
+        self.body = ctk.CTkFrame(self)
+        self.body.pack(fill="both", expand=True, padx=5, pady=5)
+
+        self.tree = ttk.Treeview(
+            self.body,
+            columns=("when", "category", "ms", "thread", "attrs"),
+            selectmode="browse"
+        )
+        self.tree.heading("#0", text="Span")
+        self.tree.column("#0", width=200)
+        for col, title, width, anchor in (
+            ("when", "Hora", 90, "w"),
+            ("category", "Categoría", 110, "w"),
+            ("ms", "ms", 80, "e"),
+            ("thread", "Hilo", 130, "w"),
+            ("attrs", "Detalles", 300, "w"),
+        ):
+            self.tree.heading(col, text=title)
+            self.tree.column(col, width=width, anchor=anchor, stretch=(col == "attrs"))
+        self.json_box = ctk.CTkTextbox(self.body, font=("Courier", 11))
+        self.tree.pack(fill="both", expand=True)
+
+    def refresh(self):
+        spans = perf.recent()
+        breakdown = perf.breakdown(spans)
+        lines = []
+        for category in CATEGORIES:
+            stats = breakdown.get(category)
+            if not stats:
+                continue
+            lines.append(
+                f"{CATEGORY_LABELS[category]:<14} {stats['count']:>6,} spans  "
+                f"total {stats['total_ms']:>10,.1f} ms  media {stats['mean_ms']:>8,.2f} ms  "
+                f"p95 {stats['p95_ms']:>8,.2f} ms"
+            )
+        self.summary.configure(text="\n".join(lines) or "Sin spans registrados")
+
+        if self.json_var.get():
+            self.tree.pack_forget()
+            self.json_box.pack(fill="both", expand=True)
+            self.json_box.delete("1.0", "end")
+            self.json_box.insert("1.0", perf.to_json())
+            return
+
+        self.json_box.pack_forget()
+        self.tree.pack(fill="both", expand=True)
+        self.tree.delete(*self.tree.get_children())
+        for span in spans[:self.MAX_ROWS]:
+            self.tree.insert("", "end", text=span.name, values=(
+                time.strftime("%H:%M:%S", time.localtime(span.started_at)),
+                CATEGORY_LABELS.get(span.category, span.category),
+                f"{span.seconds * 1000:,.2f}",
+                span.thread,
+                ", ".join(f"{key}={value}" for key, value in span.attrs.items()),
+            ))
+
+    def _clear(self):
+        perf.clear()
+        self.refresh()
+
+    def _save_json(self):
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json"), ("Todos los archivos", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            perf.dump_json(path)
+        except OSError as e:
+            messagebox.showerror("Error", f"No se pudo guardar: {e}")
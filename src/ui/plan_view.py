@@ -0,0 +1,104 @@
+"""
+Vista en árbol de un plan de ejecución (src.utils.explain.Plan).
+
+Cada operador muestra tiempo total y propio, filas reales/estimadas,
+bucles y coste; los nodos calientes, con estimaciones muy desviadas o que
+recorren la tabla completa se resaltan con color y un icono.
+"""
+import customtkinter as ctk
+from tkinter import ttk
+
+
+COLUMNS = (
+    ("time", "Tiempo (ms)", 90),
+    ("self", "Propio (ms)", 90),
+    ("rows", "Filas", 90),
+    ("estimated", "Estimadas", 90),
+    ("loops", "Bucles", 60),
+    ("cost", "Coste", 90),
+)
+
+
+def _format_number(value, decimals=0):
+    if value is None:
+        return "—"
+    return f"{value:,.{decimals}f}"
+
+
+class PlanView(ctk.CTkFrame):
+
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.summary = ctk.CTkLabel(self, text="", anchor="w", font=("Arial", 10))
+        self.summary.pack(fill="x", padx=5, pady=(5, 0))
+
+        frame = ctk.CTkFrame(self)
+        frame.pack(fill="both", expand=True, padx=5, pady=5)
+        scrollbar = ttk.Scrollbar(frame, orient="vertical")
+        scrollbar.pack(side="right", fill="y")
+        self.tree = ttk.Treeview(
+            frame,
+            columns=[name for name, _, _ in COLUMNS],
+            yscrollcommand=scrollbar.set
+        )
+        scrollbar.configure(command=self.tree.yview)
+        self.tree.pack(fill="both", expand=True)
+
+        self.tree.heading("#0", text="Operador")
+        self.tree.column("#0", width=420, stretch=True)
+        for name, title, width in COLUMNS:
+            self.tree.heading(name, text=title)
+            self.tree.column(name, width=width, anchor="e", stretch=False)
+
+        self.tree.tag_configure("hot", background="#5c1f1f", foreground="white")
+        self.tree.tag_configure("misestimated", background="#5c4b1f", foreground="white")
+        self.tree.tag_configure("full_scan", foreground="#ff9f43")
+
+    def clear(self):
+        self.tree.delete(*self.tree.get_children())
+        self.summary.configure(text="")
+
+    def show(self, plan):
+        self.clear()
+        self._insert("", plan.root)
+
+        parts = ["EXPLAIN ANALYZE" if plan.analyzed else "EXPLAIN (estimado, sin ejecutar)"]
+        if plan.planning_time is not None:
+            parts.append(f"planificación {plan.planning_time:,.2f} ms")
+        if plan.execution_time is not None:
+            parts.append(f"ejecución {plan.execution_time:,.2f} ms")
+        parts.append("🔥 caliente · ⚠️ estimación desviada · 🐢 recorrido completo")
+        self.summary.configure(text="  |  ".join(parts))
+
+    def _insert(self, parent, node):
+        text = node.operator
+        if node.detail:
+            text += f"  ({node.detail})"
+        if node.flags:
+            text = f"{' '.join(node.flags)} {text}"
+
+        tags = []
+        if node.hot:
+            tags.append("hot")
+        elif node.misestimated:
+            tags.append("misestimated")
+        if node.full_scan:
+            tags.append("full_scan")
+
+        item = self.tree.insert(
+            parent,
+            "end",
+            text=text,
+            open=True,
+            tags=tags,
+            values=(
+                _format_number(node.total_time, 2),
+                _format_number(node.self_time, 2),
+                _format_number(node.actual_rows),
+                _format_number(node.estimated_rows),
+                node.loops,
+                _format_number(node.cost, 2),
+            )
+        )
+        for child in node.children:
+            self._insert(item, child)
@@ -0,0 +1,171 @@
+"""
+Grilla de resultados virtualizada.
+
+Sólo existen en el ttk.Treeview tantas filas como caben en pantalla; al
+desplazarse se reescriben sus valores a partir de la fuente de filas, por
+lo que el coste de pintar y de hacer scroll depende del tamaño de la
+ventana y no del número de filas del resultado.
+"""
+import customtkinter as ctk
+from tkinter import ttk
+
+
+class ListRowSource:
+    """Fuente de filas en memoria que puede ir creciendo (páginas de un stream)."""
+
+    def __init__(self, columns, rows=None):
+        self.columns = list(columns)
+        self._rows = list(rows) if rows else []
+
+    def __len__(self):
+        return len(self._rows)
+
+    def extend(self, rows):
+        self._rows.extend(rows)
+
+    def rows(self, start, stop):
+        result = []
+        for row in self._rows[start:stop]:
+            if isinstance(row, dict):
+                result.append([row.get(col) for col in self.columns])
+            else:
+                result.append(list(row))
+        return result
+
+
+class ResultGrid(ctk.CTkFrame):
+
+    DEFAULT_ROW_HEIGHT = 20
+    HEADER_HEIGHT = 25
+    SCROLL_UNITS = 3
+
+    def __init__(self, parent, on_near_end=None, column_width=100, near_end_margin=50, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.on_near_end = on_near_end
+        self.column_width = column_width
+        self.near_end_margin = near_end_margin
+        self.source = None
+        self.row_offset = 0
+        self.top = 0
+        self._visible = 0
+        self._items = []
+
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree = ttk.Treeview(self, selectmode="browse")
+        self.tree.pack(fill="both", expand=True)
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_by(-self.SCROLL_UNITS))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_by(self.SCROLL_UNITS))
+        self.tree.bind("<Up>", lambda e: self._scroll_by(-1))
+        self.tree.bind("<Down>", lambda e: self._scroll_by(1))
+        self.tree.bind("<Prior>", lambda e: self._scroll_by(-self._visible))
+        self.tree.bind("<Next>", lambda e: self._scroll_by(self._visible))
+
+    def set_source(self, source, row_offset=0):
+        """row_offset desplaza la numeración (p. ej. en la página N de una tabla)."""
+        self.source = source
+        self.row_offset = row_offset
+        self.top = 0
+        self._delete_items()
+        self.tree["columns"] = source.columns
+        self.tree.column("#0", width=60, minwidth=40, stretch=False, anchor="e")
+        self.tree.heading("#0", text="#")
+        for col in source.columns:
+            self.tree.column(col, anchor="w", width=self.column_width, stretch=False)
+            self.tree.heading(col, text=col)
+        self._render()
+
+    def refresh(self):
+        """Vuelve a pintar la ventana visible (p. ej. tras añadir filas a la fuente)."""
+        if self.source is not None:
+            self._render()
+
+    def show_message(self, text):
+        self.source = None
+        self.top = 0
+        self._delete_items()
+        self.tree["columns"] = ()
+        self.tree.column("#0", width=400, stretch=True, anchor="w")
+        self.tree.heading("#0", text="")
+        self.tree.insert("", "end", text=text)
+        self.scrollbar.set(0, 1)
+
+    def clear(self):
+        self.show_message("")
+
+    def _delete_items(self):
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        self._items = []
+
+    def _on_resize(self, event):
+        row_height = self._row_height()
+        visible = max(1, (event.height - self.HEADER_HEIGHT) // row_height)
+        if visible != self._visible:
+            self._visible = visible
+            if self.source is not None:
+                self._render()
+
+    def _row_height(self):
+        try:
+            height = ttk.Style().lookup("Treeview", "rowheight")
+            return int(height) if height else self.DEFAULT_ROW_HEIGHT
+        except (ValueError, TypeError):
+            return self.DEFAULT_ROW_HEIGHT
+
+    def _on_mousewheel(self, event):
+        step = -self.SCROLL_UNITS if event.delta > 0 else self.SCROLL_UNITS
+        self._scroll_by(step)
+        return "break"
+
+    def _on_scrollbar(self, action, *args):
+        if self.source is None:
+            return
+        total = len(self.source)
+        if action == "moveto":
+            self.top = int(float(args[0]) * total)
+        elif action == "scroll":
+            amount = int(args[0])
+            if len(args) > 1 and args[1] == "pages":
+                amount *= max(1, self._visible - 1)
+            self.top += amount
+        self._render()
+
+    def _scroll_by(self, rows):
+        if self.source is None:
+            return "break"
+        self.top += rows
+        self._render()
+        return "break"
+
+    def _render(self):
+        total = len(self.source)
+        visible = self._visible or 1
+        self.top = max(0, min(self.top, total - visible))
+
+        rows = self.source.rows(self.top, self.top + visible)
+        self._sync_items(len(rows))
+        for offset, (item_id, values) in enumerate(zip(self._items, rows)):
+            self.tree.item(
+                item_id,
+                text=str(self.row_offset + self.top + offset + 1),
+                values=["NULL" if value is None else str(value) for value in values]
+            )
+
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + visible) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+        if self.on_near_end and total - (self.top + visible) <= self.near_end_margin:
+            self.on_near_end()
+
+    def _sync_items(self, count):
+        while len(self._items) < count:
+            self._items.append(self.tree.insert("", "end"))
+        while len(self._items) > count:
+            self.tree.delete(self._items.pop())
@@ -0,0 +1,133 @@
+"""
+Caja de búsqueda del navegador sobre el índice de nombres del catálogo
+(src.utils.search_index): tablas, columnas, vistas, índices y funciones de
+todas las conexiones. Filtra mientras se escribe; Intro o doble clic salta
+al objeto en el árbol.
+
+Al entrar en la caja se indexan una vez los catálogos de las conexiones ya
+conectadas que falten; escribir sólo consulta el índice, nunca el servidor.
+"""
+import customtkinter as ctk
+from tkinter import ttk
+from src.utils.search_index import search_index
+
+
+# Espera tras la última tecla antes de buscar (ms).
+DEBOUNCE_MS = 80
+MAX_RESULTS = 200
+
+KIND_ICONS = {
+    "table": "📄",
+    "column": "🔹",
+    "view": "👁️",
+    "index": "🔍",
+    "function": "⚙️",
+}
+
+
+def _location(entry):
+    location = f"{entry.connection}.{entry.schema}"
+    if entry.table:
+        location += f".{entry.table}"
+    return location
+
+
+class SearchPanel(ctk.CTkFrame):
+
+    def __init__(self, parent, tree_manager, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.tree_manager = tree_manager
+        self._entries = {}
+        self._pending = None
+        self._indexing = False
+
+        self.entry = ctk.CTkEntry(self, placeholder_text="🔎 Buscar tablas, columnas...")
+        self.entry.pack(fill="x", padx=5, pady=(0, 5))
+        self.entry.bind("<FocusIn>", lambda e: self._start_indexing())
+        self.entry.bind("<KeyRelease>", self._on_key)
+        self.entry.bind("<Return>", lambda e: self._open(self._first()))
+        self.entry.bind("<Down>", self._focus_results)
+        self.entry.bind("<Escape>", lambda e: self.clear())
+
+        self.results_frame = ctk.CTkFrame(self)
+        self.summary = ctk.CTkLabel(self.results_frame, text="", anchor="w", font=("Arial", 10))
+        self.summary.pack(fill="x", padx=5)
+        self.results = ttk.Treeview(self.results_frame, columns=("location",), height=10)
+        self.results.heading("#0", text="Objeto")
+        self.results.heading("location", text="Ubicación")
+        self.results.column("#0", width=170, stretch=True)
+        self.results.column("location", width=160, stretch=True)
+        self.results.pack(fill="both", expand=True)
+        self.results.bind("<Double-1>", lambda e: self._open(self.results.focus()))
+        self.results.bind("<Return>", lambda e: self._open(self.results.focus()))
+        self.results.bind("<Escape>", lambda e: self.clear())
+
+    def clear(self):
+        self.entry.delete(0, "end")
+        self._show([], "")
+
+    def _on_key(self, event):
+        if event.keysym in ("Return", "Down", "Escape"):
+            return
+        if self._pending:
+            self.after_cancel(self._pending)
+        self._pending = self.after(DEBOUNCE_MS, self._search)
+
+    def _search(self):
+        self._pending = None
+        query = self.entry.get().strip()
+        if not query:
+            self._show([], "")
+            return
+        results = search_index.search(query, limit=MAX_RESULTS)
+        summary = f"{len(results)}{'+' if len(results) == MAX_RESULTS else ''} resultado(s)"
+        if self._indexing:
+            summary += " — indexando catálogos..."
+        self._show(results, summary)
+
+    def _start_indexing(self):
+        if not self._indexing and self.tree_manager.index_catalogs(on_done=self._on_indexed):
+            self._indexing = True
+            if self.entry.get().strip():
+                self._search()
+
+    def _on_indexed(self, summary):
+        self._indexing = False
+        if self.entry.get().strip():
+            self._search()
+
+    def _show(self, results, summary):
+        self.results.delete(*self.results.get_children())
+        self._entries = {}
+        for entry, _ in results:
+            item_id = self.results.insert(
+                "", "end",
+                text=f"{KIND_ICONS[entry.kind]} {entry.name}",
+                values=(_location(entry),)
+            )
+            self._entries[item_id] = entry
+        self.summary.configure(text=summary)
+        if summary:
+            self.results_frame.pack(fill="both", expand=True, padx=5, pady=(0, 5))
+        else:
+            self.results_frame.pack_forget()
+
+    def _first(self):
+        children = self.results.get_children()
+        return children[0] if children else None
+
+    def _focus_results(self, event):
+        first = self._first()
+        if first:
+            self.results.focus_set()
+            self.results.focus(first)
+            self.results.selection_set(first)
+
+    def _open(self, item_id):
+        entry = self._entries.get(item_id)
+        if entry is None:
+            return
+        if self.tree_manager.reveal(entry):
+            self.clear()
+        else:
+            self.summary.configure(text=f"❌ {entry.name} ya no está en el navegador")
@@ -1,118 +1,658 @@
 
+import queue
+import time
+from collections import deque
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from tkinter import ttk
 from src.db.manager import conn_manager
+from src.utils.executor import executor, current_task
+from src.utils.perf import perf, timed, UI, RENDER
+from src.utils.catalog_diff import diff_catalog
+from src.utils.search_index import search_index
+
+
+PLACEHOLDER_TEXT = "⏳ Cargando..."
+
+SCHEMA_FOLDERS = (
+    ("tables_folder", "📋 Tables", "tables"),
+    ("views_folder", "👁️ Views", "views"),
+    ("indexes_folder", "🔍 Indexes", "indexes"),
+    ("functions_folder", "⚙️ Functions", "functions"),
+)
+
+# Tipo de nodo, icono y tipo del catálogo de los objetos sin hijos.
+FOLDER_OBJECTS = {
+    "views_folder": ("view", "👁️", "views"),
+    "indexes_folder": ("index", "🔍", "indexes"),
+    "functions_folder": ("function", "⚙️", "functions"),
+}
+
+# Carpeta del esquema donde está cada tipo de objeto del índice de búsqueda.
+OBJECT_FOLDERS = {
+    "table": "tables_folder",
+    "column": "tables_folder",
+    **{object_type: folder for folder, (object_type, _, _) in FOLDER_OBJECTS.items()},
+}
+
+CONNECTION_STATUS_ICONS = {
+    "pending": "",
+    "connecting": " ⏳",
+    "connected": " 🟢",
+    "error": " 🔴",
+    "closed": " ⚪",
+}
 
 
 class TreeViewManager:
-    def __init__(self, tree_widget, on_select_callback, on_data_request_callback):
+
+    # Máximo de hilos para refrescar catálogos. Cada conexión guardada usa
+    # a la vez como mucho su pool menos una conexión, que queda libre para
+    # las consultas del usuario.
+    REFRESH_WORKERS = 32
+
+    def __init__(self, tree_widget, on_select_callback, on_data_request_callback,
+                 on_export_request=None, on_import_request=None):
         self.tree = tree_widget
         self.on_select = on_select_callback
         self.on_data_request = on_data_request_callback
+        self.on_export_request = on_export_request
+        self.on_import_request = on_import_request
         self.node_map = {}  
+        self.refresh_errors = {}
+        # Conexiones que fallaron al refrescar: index_catalogs no las
+        # reintenta hasta el siguiente refresco completo.
+        self._index_failed = set()
+        self._refresh_task = None
+        self._loaders = {
+            "connection": self._load_connection,
+            "schema": self._load_schema,
+            "tables_folder": self._load_tables,
+            "views_folder": self._load_objects,
+            "indexes_folder": self._load_objects,
+            "functions_folder": self._load_objects,
+            "table": self._load_table,
+        }
+        self._fetchers = {
+            "connection": self._fetch_connection,
+            "schema": self._fetch_schema,
+        }
         
         self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        self.tree.bind("<<TreeviewOpen>>", self._on_tree_open)
+        self.tree.bind("<Button-3>", self._on_context_menu)
     
-    def refresh_tree(self):
-        self.clear()
-        for conn_name, db in conn_manager.connections.items():
-            self.add_connection(conn_name, db)
-
-    def add_connection(self, conn_name, db):
-        try:
-            conn_id = self.tree.insert(
-                "",
-                "end",
-                text=f"📦 {conn_name}",
-                open=True
-            )
-            self.node_map[conn_id] = {"type": "connection", "name": conn_name}
+    def refresh_tree(self, on_done=None, reload=True):
+        """
+        Vuelve a leer el catálogo de todas las conexiones. Las conexiones, y
+        los esquemas de cada una, se consultan a la vez en hilos aparte; cada
+        resultado se incorpora al árbol en cuanto llega, así que el refresco
+        tarda lo que el servidor más lento y no la suma de todos.
+        
+        El árbol no se reconstruye: cada resultado se compara con el catálogo
+        anterior y sólo se insertan, eliminan o renombran los nodos que
+        cambian, conservando qué está expandido y seleccionado.
+        on_done(resumen) se llama al terminar.
+        
+        Con reload=False (index_catalogs) no se invalidan las cachés y sólo
+        se leen las conexiones ya conectadas que aún no están en el índice
+        de búsqueda ni fallaron antes; un refresco completo vuelve a
+        intentar las que fallaron.
+        """
+        if self._refresh_task:
+            self._refresh_task.cancel()
+        self.refresh_errors = {}
+        if reload:
+            self._index_failed.clear()
+        
+        current = {}
+        for item_id in self.tree.get_children(""):
+            node_info = self.node_map.get(item_id)
+            if node_info and node_info.get("type") == "connection":
+                current[node_info["name"]] = item_id
+        connections = conn_manager.connections
+        for conn_name, conn_id in current.items():
+            if connections.get(conn_name) is not self.node_map[conn_id]["db"]:
+                self._delete_item(conn_id)
+                search_index.remove_connection(conn_name)
+        
+        jobs = []
+        for conn_name, db in connections.items():
+            conn_id = current.get(conn_name)
+            if conn_id is None or not self.tree.exists(conn_id):
+                conn_id = self.add_connection(conn_name, db, expand=False)
+            node_info = self.node_map[conn_id]
+            if not reload and (
+                not db.is_connected or conn_name in self._index_failed or self._is_indexed(node_info)
+            ):
+                continue
+            if reload:
+                db.row_counts.reset_estimates()
+                db.metadata.clear()
+            if not node_info["loaded"]:
+                # Sin cargar todavía: que expandirlo no lance otra lectura.
+                node_info["loaded"] = True
+                node_info["expand"] = db.is_connected
+            jobs.append((conn_id, conn_name, db))
+        if not jobs:
+            return None
         
-            schemas = self._get_schemas(db)
+        results = queue.Queue()
+        self._refresh_task = executor.submit(
+            self._fetch_catalogs,
+            jobs,
+            results,
+            on_progress=lambda task: self._merge_refresh(results),
+            on_success=lambda summary: self._finish_refresh(results, summary, on_done),
+            on_error=lambda e: self._finish_refresh(results, None, on_done),
+            description="Refrescando catálogo"
+        )
+        return self._refresh_task
+    
+    def _fetch_catalogs(self, jobs, results):
+        """
+        Se ejecuta en un worker. Conecta y lista los esquemas de cada
+        conexión y, según llegan, lanza la lectura de cada esquema, todo en
+        paralelo. Cada resultado va a results y se publica con task.report.
+        
+        Las lecturas de cada conexión se limitan a su pool (ver
+        REFRESH_WORKERS); las que no caben esperan en una cola sin ocupar
+        hilo.
+        """
+        task = current_task()
+        started = time.perf_counter()
+        total = len(jobs)
+        finished = 0
+        errors = 0
+        limits = {conn_id: max(1, db.pool_max_size - 1) for conn_id, _, db in jobs}
+        running = dict.fromkeys(limits, 0)
+        waiting = {conn_id: deque() for conn_id in limits}
+        pending = set()
+        
+        with ThreadPoolExecutor(
+            max_workers=min(self.REFRESH_WORKERS, sum(limits.values())),
+            thread_name_prefix="catalog-refresh"
+        ) as pool:
             
-            if not schemas:
-                self.tree.insert(conn_id, "end", text="❌ Sin esquemas")
-                return
-            for schema in schemas:
-                self._add_schema(conn_id, schema, db)
+            def drain(conn_id):
+                while waiting[conn_id] and running[conn_id] < limits[conn_id]:
+                    fn, args = waiting[conn_id].popleft()
+                    running[conn_id] += 1
+                    pending.add(pool.submit(fn, conn_id, *args))
+            
+            for conn_id, conn_name, db in jobs:
+                waiting[conn_id].append((self._fetch_connection_catalog, (conn_name, db)))
+                drain(conn_id)
+            while pending:
+                done, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                pending.difference_update(done)
+                if task and task.cancelled:
+                    for future in pending:
+                        future.cancel()
+                    return None
+                for future in done:
+                    result = future.result()
+                    conn_id = result["conn_id"]
+                    running[conn_id] -= 1
+                    if result["error"]:
+                        errors += 1
+                    elif result["kind"] == "connection":
+                        for schema in result["schemas"]:
+                            waiting[conn_id].append((
+                                self._fetch_schema_catalog, (result["connection"], result["db"], schema)
+                            ))
+                            total += 1
+                    # Lo que esperaba de esta conexión ocupa el hueco liberado.
+                    drain(conn_id)
+                    finished += 1
+                    results.put(result)
+                    if task:
+                        task.report(f"{finished}/{total} catálogos", finished / total)
         
+        return {
+            "connections": len(jobs),
+            "catalogs": finished,
+            "errors": errors,
+            "seconds": time.perf_counter() - started,
+        }
+    
+    def _fetch_connection_catalog(self, conn_id, conn_name, db):
+        result = {"kind": "connection", "conn_id": conn_id, "connection": conn_name, "db": db,
+                  "schemas": None, "error": None}
+        try:
+            db.ensure_connected()
+            result["schemas"] = self._get_schemas(db)
         except Exception as e:
-            print(f"Error al agregar conexión: {e}")
-            self.tree.insert(conn_id, "end", text=f"❌ Error: {str(e)}")
+            result["error"] = e
+        return result
     
-    def _add_schema(self, parent_id, schema_name, db):
-        schema_id = self.tree.insert(
-            parent_id,
-            "end",
-            text=f"📁 {schema_name}",
-            open=True
-        )
-        self.node_map[schema_id] = {"type": "schema", "name": schema_name}
-        tables = self._get_tables(db, schema_name)
-        tables_id = self.tree.insert(
-            schema_id,
-            "end",
-            text=f"📋 Tables ({len(tables)})",
-            open=True
-        )
-        self.node_map[tables_id] = {"type": "tables_folder"}
+    def _fetch_schema_catalog(self, conn_id, conn_name, db, schema_name):
+        result = {"kind": "schema", "conn_id": conn_id, "db": db, "schema": schema_name,
+                  "catalog": None, "error": None}
+        try:
+            result["catalog"] = self._get_catalog(db, schema_name)
+            # El índice se actualiza aquí, en el worker, para no parar la interfaz.
+            search_index.update_schema(conn_name, schema_name, result["catalog"])
+            db.row_counts.load_estimates(schema_name)
+        except Exception as e:
+            result["error"] = e
+        return result
+    
+    def _merge_refresh(self, results):
+        """Incorpora al árbol (en el hilo de Tk) los resultados ya recibidos."""
+        while True:
+            try:
+                result = results.get_nowait()
+            except queue.Empty:
+                return
+            conn_id = result["conn_id"]
+            conn_info = self.node_map.get(conn_id)
+            if conn_info is None or not self.tree.exists(conn_id):
+                continue
+            
+            if result["kind"] == "connection":
+                if result["error"]:
+                    self.refresh_errors[conn_info["name"]] = str(result["error"])
+                    self._index_failed.add(conn_info["name"])
+                    self._show_node_error(conn_id, result["error"])
+                    continue
+                self._merge_connection(conn_id, conn_info, result["schemas"])
+                continue
+            
+            schema_id = self._find_child(conn_id, "schema", result["schema"])
+            if schema_id is None:
+                continue
+            schema_info = self.node_map[schema_id]
+            if result["error"]:
+                self.refresh_errors[f"{conn_info['name']}.{result['schema']}"] = str(result["error"])
+                self._index_failed.add(conn_info["name"])
+                self._show_node_error(schema_id, result["error"])
+                continue
+            self._merge_schema(schema_id, schema_info, result["catalog"])
+    
+    @staticmethod
+    def _is_indexed(conn_info):
+        """Todos los esquemas de la conexión están en el índice de búsqueda."""
+        if conn_info.get("schemas") is None:
+            return False
+        indexed = {schema for _, schema in search_index.schemas(conn_info["name"])}
+        return indexed.issuperset(conn_info["schemas"])
+    
+    @staticmethod
+    def _prune_index(conn_name, schemas):
+        """Quita del índice de búsqueda los esquemas que ya no existen."""
+        for _, schema in search_index.schemas(conn_name):
+            if schema not in (schemas or ()):
+                search_index.remove_schema(conn_name, schema)
+    
+    def _is_filled(self, item_id, node_info):
+        """Cargado y mostrando su contenido (no el marcador ni un error)."""
+        if not node_info.get("loaded"):
+            return False
+        return all(child in self.node_map for child in self.tree.get_children(item_id))
+    
+    def _merge_connection(self, conn_id, conn_info, schemas):
+        self._prune_index(conn_info["name"], schemas)
+        if not self._is_filled(conn_id, conn_info) or not schemas:
+            conn_info["schemas"] = schemas
+            self._fill_node(conn_id, conn_info, self._load_connection)
+            if conn_info.pop("expand", False):
+                self.tree.item(conn_id, open=True)
+            return
+        self.update_connection_status()
+        if schemas != conn_info.get("schemas"):
+            db = conn_info["db"]
+            self._sync_children(
+                conn_id, schemas,
+                lambda index, name: self._add_schema(conn_id, name, db, index=index)
+            )
+        conn_info["schemas"] = schemas
+    
+    def _merge_schema(self, schema_id, schema_info, catalog):
+        previous = schema_info.get("catalog")
+        schema_info["catalog"] = catalog
+        if previous is None or not self._is_filled(schema_id, schema_info):
+            schema_info["loaded"] = True
+            self._fill_node(schema_id, schema_info, self._load_schema)
+            return
         
-        for table_name in tables:
-            self._add_table(tables_id, table_name, db)
-
-        views = self._get_views(db, schema_name)
-        views_id = self.tree.insert(
-            schema_id,
-            "end",
-            text=f"👁️ Views ({len(views)})",
-            open=True
-        )
-        self.node_map[views_id] = {"type": "views_folder"}
-
-        for view_name in views:
-            view_id = self.tree.insert(
-                views_id,
-                "end",
-                text=f"👁️ {view_name}",
-                open=False
+        changes = diff_catalog(previous, catalog)
+        for folder_id in self.tree.get_children(schema_id):
+            folder_info = self.node_map[folder_id]
+            folder_info["catalog"] = catalog
+            kind = folder_info["kind"]
+            if kind in changes:
+                self._set_text(folder_id, folder_info, self._folder_text(folder_info))
+            if not self._is_filled(folder_id, folder_info):
+                continue
+            if kind == "tables":
+                self._merge_tables(folder_id, folder_info, changes)
+            elif kind in changes:
+                object_type, icon, _ = FOLDER_OBJECTS[folder_info["type"]]
+                self._sync_children(
+                    folder_id, catalog[kind],
+                    lambda index, name, f=folder_info, t=object_type, i=icon: self._add_object(
+                        folder_id, t, i, name, f["schema"], f["db"], index=index
+                    )
+                )
+    
+    def _merge_tables(self, folder_id, folder_info, changes):
+        tables = folder_info["catalog"]["tables"]
+        schema_name = folder_info["schema"]
+        db = folder_info["db"]
+        if "tables" in changes:
+            self._sync_children(
+                folder_id, list(tables),
+                lambda index, name: self._add_table(folder_id, schema_name, name, db, tables[name], index=index)
             )
-            self.node_map[view_id] = {
-                "type": "view",
-                "name": view_name,
-                "db": db
-            }
-        indexes_id = self.tree.insert(schema_id, "end", text="🔍 Indexes", open=False)
-        self.node_map[indexes_id] = {"type": "indexes_folder"}
-
-        success, indexes = db.get_indexes(schema_name)
-        if success:
-            for idx in indexes:
-                iid = self.tree.insert(indexes_id, "end", text=f"🔍 {idx[0]}")
-                self.node_map[iid] = {"type": "index", "name": idx[0], "db": db}
-
-        functions_id = self.tree.insert(schema_id, "end", text="⚙️ Functions", open=False)
-        self.node_map[functions_id] = {"type": "functions_folder"}
+        changed_columns = set(changes.get("columns", ()))
+        for table_id in self.tree.get_children(folder_id):
+            table_info = self.node_map[table_id]
+            table_info["columns"] = tables[table_info["name"]]
+            # Las filas estimadas se han vuelto a leer: sólo cambia el texto si difieren.
+            self._set_text(table_id, table_info, self._table_text(table_info))
+            if table_info["name"] in changed_columns and self._is_filled(table_id, table_info):
+                self._clear_children(table_id)
+                self._load_table(table_id, table_info)
+    
+    def _sync_children(self, parent_id, names, insert):
+        """
+        Deja bajo parent_id un hijo por nombre, en el orden de names:
+        elimina los que sobran, inserta los que faltan con insert(posición,
+        nombre) y mueve los que cambiaron de sitio. Los que siguen igual no
+        se tocan.
+        """
+        children = list(self.tree.get_children(parent_id))
+        by_name = {self.node_map[child]["name"]: child for child in children}
+        wanted = set(names)
+        current = []
+        for child in children:
+            if self.node_map[child]["name"] in wanted:
+                current.append(child)
+            else:
+                self._delete_item(child)
+        
+        for index, name in enumerate(names):
+            if index < len(current) and self.node_map[current[index]]["name"] == name:
+                continue
+            item_id = by_name.get(name)
+            if item_id in current:
+                current.remove(item_id)
+                self.tree.move(item_id, parent_id, index)
+            else:
+                item_id = insert(index, name)
+            current.insert(index, item_id)
+    
+    def _set_text(self, item_id, node_info, text):
+        if node_info.get("text") != text:
+            node_info["text"] = text
+            self.tree.item(item_id, text=text)
+    
+    def _delete_item(self, item_id):
+        self._forget(item_id)
+        self.tree.delete(item_id)
+    
+    def _forget(self, item_id):
+        """Quita de node_map los descendientes de item_id y el propio nodo."""
+        for child in self.tree.get_children(item_id):
+            self._forget(child)
+        self.node_map.pop(item_id, None)
+    
+    def _finish_refresh(self, results, summary, on_done):
+        self._merge_refresh(results)
+        self._refresh_task = None
+        self.update_connection_status()
+        if summary:
+            perf.add(
+                "tree.refresh", UI, summary["seconds"],
+                connections=summary["connections"], catalogs=summary["catalogs"], errors=summary["errors"]
+            )
+        if on_done:
+            on_done(summary)
+    
+    def _find_child(self, parent_id, node_type, name=None):
+        for child in self.tree.get_children(parent_id):
+            node_info = self.node_map.get(child)
+            if node_info and node_info.get("type") == node_type and (name is None or node_info.get("name") == name):
+                return child
+        return None
+    
+    def index_catalogs(self, on_done=None):
+        """
+        Lee en segundo plano los catálogos de las conexiones ya conectadas
+        que aún no están en el índice de búsqueda (sin expandirlas). No abre
+        conexiones nuevas ni reintenta las que fallaron; no hace nada si ya
+        hay un refresco en marcha o si no falta ninguna.
+        
+        Returns:
+            Task o None
+        """
+        if self._refresh_task:
+            return None
+        return self.refresh_tree(on_done=on_done, reload=False)
+    
+    def reveal(self, entry):
+        """
+        Expande el camino hasta el objeto de una entrada del índice de
+        búsqueda, lo selecciona y lo desplaza a la vista.
+        
+        Returns:
+            bool: False si el objeto ya no está en el árbol
+        """
+        steps = [("schema", entry.schema), (OBJECT_FOLDERS[entry.kind], None)]
+        if entry.kind == "column":
+            steps.append(("table", entry.table))
+        steps.append((entry.kind, entry.name))
+        
+        item_id = self._find_child("", "connection", entry.connection)
+        for node_type, name in steps:
+            if item_id is None:
+                return False
+            # Conexión y esquema ya están cargados si el objeto está indexado;
+            # carpetas y tablas se rellenan sin consultar al servidor.
+            self.open_node(item_id)
+            self.tree.item(item_id, open=True)
+            item_id = self._find_child(item_id, node_type, name)
+        if item_id is None:
+            return False
+        self.tree.see(item_id)
+        self.tree.selection_set(item_id)
+        self.tree.focus(item_id)
+        return True
 
-        success, funcs = db.get_functions(schema_name)
-        if success:
-            for fn in funcs:
-                fid = self.tree.insert(functions_id, "end", text=f"⚙️ {fn[0]}")
-                self.node_map[fid] = {"type": "function", "name": fn[0], "db": db}
+    @timed("tree.add_connection", UI)
+    def add_connection(self, conn_name, db, expand=None):
+        """
+        Añade una conexión al árbol. Sus esquemas se cargan al expandirla,
+        lo que también establece la conexión si aún no lo estaba.
+        """
+        conn_id = self._add_lazy_node(
+            "",
+            self._connection_text(conn_name, db),
+            {"type": "connection", "name": conn_name, "db": db}
+        )
+        if expand is None:
+            expand = db.is_connected
+        if expand:
+            self.tree.item(conn_id, open=True)
+            self.open_node(conn_id)
+        return conn_id
+    
+    def preload_connections(self):
+        """
+        Trae en segundo plano los esquemas de las conexiones ya conectadas,
+        sin expandirlas.
+        """
+        for item_id, node_info in list(self.node_map.items()):
+            if node_info.get("type") == "connection" and node_info["db"].is_connected:
+                self.open_node(item_id)
 
+    @staticmethod
+    def _connection_text(conn_name, db):
+        return f"📦 {conn_name}{CONNECTION_STATUS_ICONS.get(db.status, '')}"
     
-    def _add_table(self, parent_id, table_name, db):
-        count = self._get_table_count(db, table_name)
-        
-        table_id = self.tree.insert(
+    def update_connection_status(self):
+        for item_id in self.tree.get_children(""):
+            node_info = self.node_map.get(item_id)
+            if node_info and node_info.get("type") == "connection":
+                self._set_text(item_id, node_info, self._connection_text(node_info["name"], node_info["db"]))
+    
+    def _fetch_connection(self, node_info):
+        """Se ejecuta en un worker: conecta (si hace falta) y trae los esquemas."""
+        db = node_info["db"]
+        db.ensure_connected()
+        node_info["schemas"] = self._get_schemas(db)
+    
+    def _load_connection(self, conn_id, node_info):
+        schemas = node_info["schemas"]
+        self._prune_index(node_info["name"], schemas)
+        if not schemas:
+            self.tree.insert(conn_id, "end", text="❌ Sin esquemas")
+            return
+        for schema in schemas:
+            self._add_schema(conn_id, schema, node_info["db"])
+    
+    def _show_node_error(self, item_id, error):
+        print(f"Error al cargar nodo: {error}")
+        if not self.tree.exists(item_id):
+            return
+        node_info = self.node_map.get(item_id)
+        if node_info and "loaded" in node_info:
+            node_info["loaded"] = False
+        if node_info and node_info.get("type") == "connection":
+            self.update_connection_status()
+        self._clear_children(item_id)
+        self.tree.insert(item_id, "end", text=f"❌ Error: {str(error)}")
+    
+    def _clear_children(self, item_id):
+        children = self.tree.get_children(item_id)
+        for child in children:
+            self._forget(child)
+        if children:
+            self.tree.delete(*children)
+    
+    def _add_lazy_node(self, parent_id, text, node_info, index="end"):
+        """Inserta un nodo cuyo contenido se carga al expandirlo."""
+        node_id = self.tree.insert(parent_id, index, text=text, open=False)
+        node_info["loaded"] = False
+        node_info["text"] = text
+        self.node_map[node_id] = node_info
+        self.tree.insert(node_id, "end", text=PLACEHOLDER_TEXT)
+        return node_id
+    
+    def _add_schema(self, parent_id, schema_name, db, index="end"):
+        return self._add_lazy_node(
             parent_id,
-            "end",
-            text=f"📄 {table_name} ({count} rows)",
-            open=False
+            f"📁 {schema_name}",
+            {"type": "schema", "name": schema_name, "db": db, "connection": self.node_map[parent_id]["name"]},
+            index=index
+        )
+    
+    def _on_tree_open(self, event):
+        self.open_node(self.tree.focus())
+    
+    def open_node(self, item_id):
+        node_info = self.node_map.get(item_id)
+        if not node_info or node_info.get("loaded", True):
+            return
+        
+        loader = self._loaders.get(node_info["type"])
+        if not loader:
+            return
+        
+        node_info["loaded"] = True
+        fetcher = self._fetchers.get(node_info["type"])
+        if not fetcher:
+            self._fill_node(item_id, node_info, loader)
+            return
+        
+        executor.submit(
+            fetcher,
+            node_info,
+            on_success=lambda result: self._fill_node(item_id, node_info, loader),
+            on_error=lambda e: self._show_node_error(item_id, e),
+            description=f"Cargando {node_info.get('name', '')}"
         )
-        self.node_map[table_id] = {"type": "table", "name": table_name, "db": db}
-        columns = self._get_columns(db, table_name)
-        for col in columns:
+    
+    @timed("tree.fill_node", RENDER)
+    def _fill_node(self, item_id, node_info, loader):
+        if not self.tree.exists(item_id):
+            return
+        if node_info["type"] == "connection":
+            self.update_connection_status()
+        self._clear_children(item_id)
+        try:
+            loader(item_id, node_info)
+        except Exception as e:
+            self._show_node_error(item_id, e)
+    
+    def _fetch_schema(self, node_info):
+        """Se ejecuta en un worker: trae catálogo y estimaciones del esquema."""
+        schema_name = node_info["name"]
+        db = node_info["db"]
+        node_info["catalog"] = self._get_catalog(db, schema_name)
+        search_index.update_schema(node_info["connection"], schema_name, node_info["catalog"])
+        db.row_counts.load_estimates(schema_name)
+    
+    def _load_schema(self, schema_id, node_info):
+        schema_name = node_info["name"]
+        db = node_info["db"]
+        catalog = node_info["catalog"]
+        for folder_type, label, kind in SCHEMA_FOLDERS:
+            folder_info = {
+                "type": folder_type, "label": label, "kind": kind,
+                "schema": schema_name, "catalog": catalog, "db": db
+            }
+            self._add_lazy_node(schema_id, self._folder_text(folder_info), folder_info)
+    
+    @staticmethod
+    def _folder_text(folder_info):
+        return f"{folder_info['label']} ({len(folder_info['catalog'][folder_info['kind']])})"
+    
+    def _load_tables(self, folder_id, node_info):
+        db = node_info["db"]
+        schema_name = node_info["schema"]
+        for table_name, columns in node_info["catalog"]["tables"].items():
+            self._add_table(folder_id, schema_name, table_name, db, columns)
+    
+    def _load_objects(self, folder_id, node_info):
+        """Vistas, índices o funciones de la carpeta."""
+        object_type, icon, kind = FOLDER_OBJECTS[node_info["type"]]
+        for name in node_info["catalog"][kind]:
+            self._add_object(folder_id, object_type, icon, name, node_info["schema"], node_info["db"])
+    
+    def _add_object(self, parent_id, object_type, icon, name, schema_name, db, index="end"):
+        text = f"{icon} {name}"
+        item_id = self.tree.insert(parent_id, index, text=text)
+        self.node_map[item_id] = {"type": object_type, "name": name, "schema": schema_name, "db": db, "text": text}
+        return item_id
+    
+    def _add_table(self, parent_id, schema_name, table_name, db, columns, index="end"):
+        node_info = {
+            "type": "table",
+            "name": table_name,
+            "schema": schema_name,
+            "columns": columns,
+            "db": db
+        }
+        return self._add_lazy_node(parent_id, self._table_text(node_info), node_info, index=index)
+    
+    @staticmethod
+    def _table_text(node_info):
+        count = node_info["db"].row_counts.label(node_info["schema"], node_info["name"])
+        if count is None:
+            return f"📄 {node_info['name']}"
+        return f"📄 {node_info['name']} ({count} rows)"
+    
+    def update_table_counts(self, db):
+        for item_id, node_info in self.node_map.items():
+            if node_info.get("type") == "table" and node_info.get("db") is db:
+                self._set_text(item_id, node_info, self._table_text(node_info))
+    
+    def _load_table(self, table_id, node_info):
+        for col in node_info["columns"]:
             col_type = col['data_type']
-            nullable = "⭕" if col['is_nullable'] == 'YES' else "⚫"
+            nullable = "⭕" if col['is_nullable'] else "⚫"
             col_id = self.tree.insert(
                 table_id,
                 "end",
@@ -129,127 +669,75 @@ class TreeViewManager:
             table_name = node_info.get("name")
             db = node_info.get("db")
             if self.on_select:
-                self.on_select(node_type, table_name, db)
+                self.on_select(node_type, table_name, db, node_info.get("schema"))
             if self.on_data_request:
-                self.on_data_request(db, table_name)
+                self.on_data_request(db, table_name, node_info.get("schema"))
         elif node_type == "view":
             view_name = node_info.get("name")
             db = node_info.get("db")
             if self.on_select:
-                self.on_select("view", view_name, db)
+                self.on_select("view", view_name, db, node_info.get("schema"))
             if self.on_data_request:
-                self.on_data_request(db, view_name)
-        elif node_type in ["connection", "schema", "tables_folder"]:
+                self.on_data_request(db, view_name, node_info.get("schema"))
+        elif node_type == "connection":
+            if self.on_select:
+                self.on_select(node_type, node_info.get("name"), node_info.get("db"))
+        elif node_type in ["schema", "tables_folder"]:
             if self.on_select:
                 self.on_select(node_type, node_info.get("name"), None)
         elif node_type in ["function","index"]:
             info_name = node_info.get("name")
             db = node_info.get("db")
             if self.on_select:
-                self.on_select(node_type, info_name, db)
+                self.on_select(node_type, info_name, db, node_info.get("schema"))
         else:
             if self.on_select:
                 text = self.tree.item(item_id, "text")
                 self.on_select("generic", text, None)
     
+    def _context_actions(self, node_info):
+        """Acciones del menú contextual de un nodo: lista de (texto, callback)."""
+        actions = []
+        if node_info.get("type") in ("table", "view") and self.on_export_request:
+            args = (node_info["db"], node_info["name"], node_info["schema"])
+            actions.append(("📤 Exportar...", lambda: self.on_export_request(*args)))
+        if node_info.get("type") == "table" and self.on_import_request:
+            args = (node_info["db"], node_info["name"], node_info["schema"])
+            actions.append(("📥 Importar CSV...", lambda: self.on_import_request(*args)))
+        return actions
+    
+    def _on_context_menu(self, event):
+        item_id = self.tree.identify_row(event.y)
+        actions = self._context_actions(self.node_map.get(item_id, {}))
+        if not actions:
+            return
+        menu = tk.Menu(self.tree, tearoff=0)
+        for label, command in actions:
+            menu.add_command(label=label, command=command)
+        try:
+            menu.tk_popup(event.x_root, event.y_root)
+        finally:
+            menu.grab_release()
+    
     def clear(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        children = self.tree.get_children("")
+        if children:
+            self.tree.delete(*children)
         self.node_map.clear()
+        search_index.clear()
 
     @staticmethod
     def _get_schemas(db):
-        try:
-            success, result = db.get_schemas()
-            if success and result:
-                schemas = result
-                return schemas if schemas else ["public"]
-            query = """
-                SELECT n.nspname AS schema_name
-                FROM pg_catalog.pg_namespace n
-                WHERE n.nspname NOT LIKE 'pg_%'
-                  AND n.nspname <> 'information_schema'
-                  AND n.nspname <> 'crdb_internal'
-                ORDER BY n.nspname;
-            """
-            success, result = db.execute_query(query)
-            
-            if success and result:
-                schemas = [row[0] for row in result]
-                return schemas if schemas else ["public"]
-            
-            return ["public"]
-            
-        except Exception as e:
-            print(f"Error obteniendo esquemas: {e}")
-            return ["public"]
-    
-    @staticmethod
-    def _get_tables(db, schema="public"):
-        try:
-            query = f"""
-                SELECT tablename FROM pg_tables 
-                WHERE schemaname = '{schema}'
-                ORDER BY tablename
-            """
-            success, result = db.execute_query(query)
-            if success:
-                return [row[0] for row in result] if result else []
-        except:
-            pass
-        return []
+        # Un fallo se propaga: con una lista inventada el refresco borraría
+        # del árbol y del índice de búsqueda los esquemas reales.
+        success, result = db.get_schemas()
+        if not success:
+            raise Exception(result)
+        return result or ["public"]
     
     @staticmethod
-    def _get_columns(db, table_name):
-        success, result = db.get_table_columns(table_name)
-        if success:
-            return result
-        return []
-    
-    @staticmethod
-    def _get_table_count(db, table_name):
-        success, count = db.get_table_count(table_name)
-        if success:
-            return count
-        return 0
-    
-    @staticmethod
-    def _get_views(db, schema="public"):
-        try:
-            success, result = db.get_views(schema)
-            if success:
-                return [row[0] for row in result] if result else []
-        except:
-            pass
-        return []
-    
-    @staticmethod
-    def _get_indexes(db, schema="public"):
-        try:
-            success, result = db.get_indexes(schema)
-            if success:
-                return [row[0] for row in result] if result else []
-        except:
-            pass
-        return []
-    
-    @staticmethod
-    def _get_triggers(db, schema="public"):
-        try:
-            success, result = db.get_triggers(schema)
-            if success:
-                return [row[0] for row in result] if result else []
-        except:
-            pass
-        return []
-    
-    @staticmethod
-    def _get_functions(db, schema="public"):
-        try:
-            success, result = db.get_functions(schema)
-            if success:
-                return [row[0] for row in result] if result else []
-        except:
-            pass
-        return []
-    
+    def _get_catalog(db, schema_name):
+        success, result = db.get_catalog_snapshot(schema_name)
+        if not success:
+            raise Exception(result)
+        return result[schema_name]
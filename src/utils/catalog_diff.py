@@ -0,0 +1,41 @@
+"""
+Diferencias entre dos catálogos de un esquema (los dict de
+DatabaseConnection.get_catalog_snapshot) para refrescar el árbol tocando
+sólo lo que cambió.
+"""
+
+
+CATALOG_KINDS = ("tables", "views", "indexes", "functions", "triggers")
+
+
+def diff_names(old, new):
+    """(añadidos en el orden de new, eliminados en el orden de old)."""
+    old_set = set(old)
+    new_set = set(new)
+    return [name for name in new if name not in old_set], [name for name in old if name not in new_set]
+
+
+def diff_catalog(old, new):
+    """
+    Returns:
+        dict: tipo -> (añadidos, eliminados) sólo para los tipos que
+        cambian, más "columns": tablas presentes en ambos con columnas
+        distintas. Vacío si los catálogos son iguales.
+    """
+    if old == new:
+        return {}
+    changes = {}
+    for kind in CATALOG_KINDS:
+        old_names = list(old.get(kind, ()))
+        new_names = list(new.get(kind, ()))
+        if old_names != new_names:
+            changes[kind] = diff_names(old_names, new_names)
+    old_tables = old.get("tables", {})
+    new_tables = new.get("tables", {})
+    changed_columns = [
+        name for name, columns in new_tables.items()
+        if name in old_tables and old_tables[name] != columns
+    ]
+    if changed_columns:
+        changes["columns"] = changed_columns
+    return changes
@@ -0,0 +1,211 @@
+"""
+Consultas de catálogo de DatabaseConnection como Statement con parámetros
+(ver src/utils/statements.py). Los parámetros que se comparan con columnas
+de pg_catalog son de tipo name; los de information_schema, text.
+"""
+from src.utils.statements import Statement
+
+
+def _catalog_filter(column):
+    """Esquemas de usuario; %(schema)s NULL significa todos."""
+    return (
+        f"(%(schema)s IS NULL OR {column} = %(schema)s) "
+        f"AND {column} NOT LIKE 'pg_%%' "
+        f"AND {column} NOT IN ('information_schema', 'crdb_internal')"
+    )
+
+
+SCHEMAS = Statement("schemas", """
+    SELECT n.nspname AS schema_name
+    FROM pg_catalog.pg_namespace n
+    WHERE n.nspname NOT LIKE 'pg_%%'
+      AND n.nspname <> 'information_schema'
+      AND n.nspname <> 'crdb_internal'
+    ORDER BY n.nspname
+""")
+
+TABLES = Statement("tables", """
+    SELECT tablename FROM pg_tables
+    WHERE schemaname = %(schema)s
+    ORDER BY tablename
+""", schema="name")
+
+VIEWS = Statement("views", """
+    SELECT c.relname AS viewname
+    FROM pg_catalog.pg_class c
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.relkind = 'v'
+      AND n.nspname = %(schema)s
+    ORDER BY c.relname
+""", schema="name")
+
+FUNCTIONS = Statement("functions", """
+    SELECT routine_name
+    FROM information_schema.routines
+    WHERE routine_schema = %(schema)s
+    ORDER BY routine_name
+""", schema="text")
+
+INDEXES = Statement("indexes", """
+    SELECT indexname
+    FROM pg_indexes
+    WHERE schemaname = %(schema)s
+    ORDER BY indexname
+""", schema="name")
+
+TRIGGERS = Statement("triggers", """
+    SELECT trigger_name
+    FROM information_schema.triggers
+    WHERE trigger_schema = %(schema)s
+    ORDER BY trigger_name
+""", schema="text")
+
+MATERIALIZED_VIEWS = Statement("materialized_views", """
+    SELECT matviewname
+    FROM pg_matviews
+    WHERE schemaname = %(schema)s
+    ORDER BY matviewname
+""", schema="name")
+
+SCHEMA_INFO = Statement("schema_info", """
+    SELECT
+        t.tablename,
+        a.attname as column_name,
+        pg_catalog.format_type(a.atttypid, a.atttypmod) as data_type,
+        a.attnotnull as not_null,
+        a.attnum as column_position
+    FROM pg_tables t
+    JOIN pg_namespace n ON n.nspname = t.schemaname
+    JOIN pg_class c ON c.relname = t.tablename AND c.relnamespace = n.oid
+    JOIN pg_attribute a ON a.attrelid = c.oid
+    WHERE t.schemaname = %(schema)s
+    AND a.attnum > 0
+    AND NOT a.attisdropped
+    ORDER BY t.tablename, a.attnum
+""", schema="name")
+
+CATALOG_COLUMNS = Statement("catalog_columns", f"""
+    SELECT
+        n.nspname AS schema_name,
+        c.relname AS table_name,
+        a.attname AS column_name,
+        pg_catalog.format_type(a.atttypid, a.atttypmod) AS data_type,
+        NOT a.attnotnull AS is_nullable
+    FROM pg_catalog.pg_class c
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_catalog.pg_attribute a
+           ON a.attrelid = c.oid
+          AND a.attnum > 0
+          AND NOT a.attisdropped
+    WHERE c.relkind IN ('r', 'p')
+      AND {_catalog_filter("n.nspname")}
+    ORDER BY n.nspname, c.relname, a.attnum
+""", schema="name")
+
+CATALOG_OBJECTS = Statement("catalog_objects", f"""
+    SELECT 'views' AS kind, n.nspname::text AS schema_name, c.relname::text AS name
+    FROM pg_catalog.pg_class c
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.relkind = 'v'
+      AND {_catalog_filter("n.nspname")}
+    UNION ALL
+    SELECT 'indexes', schemaname::text, indexname::text
+    FROM pg_indexes
+    WHERE {_catalog_filter("schemaname")}
+    UNION ALL
+    SELECT 'functions', routine_schema::text, routine_name::text
+    FROM information_schema.routines
+    WHERE {_catalog_filter("routine_schema")}
+    UNION ALL
+    SELECT 'triggers', trigger_schema::text, trigger_name::text
+    FROM information_schema.triggers
+    WHERE {_catalog_filter("trigger_schema")}
+    ORDER BY 1, 2, 3
+""", schema="name")
+
+ROW_ESTIMATES = Statement("row_estimates", f"""
+    SELECT n.nspname AS schema_name, c.relname AS table_name,
+           c.reltuples::bigint AS estimate
+    FROM pg_catalog.pg_class c
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.relkind IN ('r', 'p')
+      AND {_catalog_filter("n.nspname")}
+""", schema="name")
+
+ROW_ESTIMATES_CRDB = Statement("row_estimates_crdb", """
+    SELECT t.schema_name, s.table_name, s.estimated_row_count AS estimate
+    FROM crdb_internal.table_row_statistics s
+    JOIN crdb_internal.tables t ON t.table_id = s.table_id
+    WHERE t.database_name = current_database()
+      AND (%(schema)s IS NULL OR t.schema_name = %(schema)s)
+""", schema="text")
+
+TABLE_COLUMNS = Statement("table_columns", """
+    SELECT
+    a.attname AS column_name,
+    pg_catalog.format_type(a.atttypid, a.atttypmod) AS data_type,
+    NOT a.attnotnull AS is_nullable
+    FROM pg_catalog.pg_attribute a
+    JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.relname = %(table)s
+      AND n.nspname = %(schema)s
+      AND a.attnum > 0
+      AND NOT a.attisdropped
+    ORDER BY a.attnum
+""", schema="name", table="name")
+
+TABLE_KEY = Statement("table_key", """
+    SELECT
+        tc.constraint_type,
+        tc.constraint_name,
+        kcu.column_name,
+        col.is_nullable
+    FROM information_schema.table_constraints tc
+    JOIN information_schema.key_column_usage kcu
+      ON kcu.constraint_schema = tc.constraint_schema
+     AND kcu.constraint_name = tc.constraint_name
+     AND kcu.table_name = tc.table_name
+    LEFT JOIN information_schema.columns col
+      ON col.table_schema = kcu.table_schema
+     AND col.table_name = kcu.table_name
+     AND col.column_name = kcu.column_name
+    WHERE tc.table_schema = %(schema)s
+      AND tc.table_name = %(table)s
+      AND tc.constraint_type IN ('PRIMARY KEY', 'UNIQUE')
+    ORDER BY tc.constraint_type = 'PRIMARY KEY' DESC,
+             tc.constraint_name,
+             kcu.ordinal_position
+""", schema="text", table="text")
+
+FUNCTION_DDL = Statement("function_ddl", """
+    SELECT pg_get_functiondef(p.oid) as ddl
+    FROM pg_proc p
+    JOIN pg_namespace n ON n.oid = p.pronamespace
+    WHERE p.proname = %(object_name)s
+      AND n.nspname = %(schema)s
+""", schema="name", object_name="name")
+
+VIEW_DDL = Statement("view_ddl", """
+    SELECT 'CREATE OR REPLACE VIEW ' || table_schema || '.' || table_name || ' AS ' || view_definition as ddl
+    FROM information_schema.views
+    WHERE table_schema = %(schema)s
+      AND table_name = %(object_name)s
+""", schema="text", object_name="text")
+
+INDEX_DDL = Statement("index_ddl", """
+    SELECT pg_get_indexdef(indexrelid) as ddl
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.relname = %(object_name)s
+      AND n.nspname = %(schema)s
+""", schema="name", object_name="name")
+
+TRIGGER_DDL = Statement("trigger_ddl", """
+    SELECT 'CREATE TRIGGER ' || trigger_name || ' ' || action_timing || ' ' || event_manipulation ||
+           ' ON ' || event_object_table || ' FOR EACH ROW EXECUTE FUNCTION ' || action_statement as ddl
+    FROM information_schema.triggers
+    WHERE trigger_schema = %(schema)s
+      AND trigger_name = %(object_name)s
+""", schema="text", object_name="text")
@@ -1,151 +1,377 @@
+import threading
+import time
+import uuid
 import psycopg2
+from psycopg2 import sql
 from psycopg2.extras import RealDictCursor
+from src.utils import catalog_queries
+from src.utils.executor import cancel_scope
+from src.utils.row_counts import RowCountProvider
+from src.utils.pool import ConnectionPool
+from src.utils.stream import QueryStream
+from src.utils.metadata_cache import MetadataCache, ddl_targets
+from src.utils.statements import StatementCache
+from src.utils.perf import perf, CONNECT, SERVER, FETCH
+from src.utils.query_history import (
+    query_history, STATUS_OK, STATUS_ERROR as HISTORY_STATUS_ERROR, STATUS_CANCELLED, STATUS_TIMEOUT
+)
+from src.utils.result_cache import result_cache, is_read_only
+
+
+STATUS_PENDING = "pending"
+STATUS_CONNECTING = "connecting"
+STATUS_CONNECTED = "connected"
+STATUS_ERROR = "error"
+STATUS_CLOSED = "closed"
+
+
+def timeout_ms(seconds):
+    """Valor de statement_timeout para seconds (> 0)."""
+    return f"{int(float(seconds) * 1000)}ms"
+
+
+def _query_text(query, conn):
+    """Texto de la consulta; las sql.Composed se renderizan con la conexión."""
+    return query if isinstance(query, str) else query.as_string(conn)
+
+
+def _error_message(error, prefix):
+    if isinstance(error, psycopg2.extensions.QueryCanceledError):
+        if "statement timeout" in str(error):
+            return "⏱ La consulta superó el statement_timeout y fue cancelada"
+        return "⏹ Consulta cancelada"
+    return f"{prefix}{str(error)}"
+
+
+def _history_status(error):
+    if isinstance(error, psycopg2.extensions.QueryCanceledError):
+        return STATUS_TIMEOUT if "statement timeout" in str(error) else STATUS_CANCELLED
+    return HISTORY_STATUS_ERROR
 
 
 class DatabaseConnection:
     
-    def __init__(self, dbname, user, password, host, port, sslmode="require"):
+    def __init__(self, dbname, user, password, host, port, sslmode="require",
+                 pool_min_size=1, pool_max_size=4, pool_idle_timeout=300, pool_checkout_timeout=30,
+                 connect_timeout=None, lazy=False, stream_itersize=2000,
+                 metadata_ttl=300, metadata_max_entries=512, statement_timeout=None):
         self.dbname = dbname
         self.user = user
         self.password = password
         self.host = host
         self.port = port
         self.sslmode = sslmode
-        self.conn = None
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.pool_idle_timeout = pool_idle_timeout
+        self.pool_checkout_timeout = pool_checkout_timeout
+        self.connect_timeout = connect_timeout
+        self.stream_itersize = stream_itersize
+        self.metadata_ttl = metadata_ttl
+        self.metadata_max_entries = metadata_max_entries
+        self.statement_timeout = statement_timeout
+        self.pool = None
         self.is_connected = False
+        self.status = STATUS_PENDING
+        self.last_error = None
+        self._connect_lock = threading.Lock()
+        self._is_cockroach = None
+        self.row_counts = RowCountProvider(self)
+        self.metadata = MetadataCache(ttl=metadata_ttl, max_entries=metadata_max_entries)
+        self.statements = StatementCache()
         
-        self._connect()
+        if not lazy:
+            self._connect()
+    
+    def ensure_connected(self):
+        """Conecta en el primer uso; lanza excepción si no es posible."""
+        if self.is_connected:
+            return
+        with self._connect_lock:
+            if self.is_connected:
+                return
+            if self.status == STATUS_CLOSED:
+                raise Exception("No hay conexión activa")
+            self._connect()
     
     def _connect(self):
+        self.status = STATUS_CONNECTING
         try:
-            self.conn = psycopg2.connect(
-                dbname=self.dbname,
-                user=self.user,
-                password=self.password,
-                host=self.host,
-                port=self.port,
-                sslmode=self.sslmode
-            )
+            with perf.span("db.connect", CONNECT, connection=self.history_label):
+                self.pool = ConnectionPool(
+                    self._open_pooled_connection,
+                    min_size=self.pool_min_size,
+                    max_size=self.pool_max_size,
+                    idle_timeout=self.pool_idle_timeout,
+                    checkout_timeout=self.pool_checkout_timeout
+                )
             self.is_connected = True
+            self.status = STATUS_CONNECTED
+            self.last_error = None
         except Exception as e:
             self.is_connected = False
+            self.status = STATUS_ERROR
+            self.last_error = str(e)
             raise Exception(f"Error al conectar: {str(e)}")
     
-    def execute_query(self, query, fetch=True):
-        if not self.is_connected:
-            return False, "No hay conexión activa"
+    def open_raw_connection(self):
+        """Abre una conexión psycopg2 independiente con los mismos parámetros."""
+        params = {
+            "dbname": self.dbname,
+            "user": self.user,
+            "password": self.password,
+            "host": self.host,
+            "port": self.port,
+            "sslmode": self.sslmode,
+            # Nombre único para poder localizar la sesión al cancelar (CANCEL QUERIES).
+            "application_name": f"DBAdmin-{uuid.uuid4().hex[:12]}"
+        }
+        if self.connect_timeout:
+            params["connect_timeout"] = self.connect_timeout
+        return psycopg2.connect(**params)
+    
+    def _open_pooled_connection(self):
+        conn = self.open_raw_connection()
+        if self.statement_timeout:
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SET statement_timeout = %s", (timeout_ms(self.statement_timeout),))
+                cursor.close()
+                conn.commit()
+            except Exception:
+                conn.close()
+                raise
+        return conn
+    
+    def cancel_backend(self, conn):
+        """
+        Cancela la sentencia que está ejecutando conn. Primero con el
+        protocolo de cancelación de libpq (conn.cancel()) y, si falla, desde
+        una conexión aparte con pg_cancel_backend o CANCEL QUERIES en CRDB.
+        La transacción queda abortada; putconn la deshace al devolverla.
+        """
+        try:
+            conn.cancel()
+            return
+        except Exception as e:
+            print(f"conn.cancel() falló, usando conexión auxiliar: {e}")
         
+        side = self.open_raw_connection()
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(query)
-            
-            if cursor.description: 
-                result = cursor.fetchall()
+            side.autocommit = True
+            cursor = side.cursor()
+            cursor.execute("SELECT version()")
+            if "CockroachDB" in cursor.fetchone()[0]:
+                cursor.execute(
+                    "CANCEL QUERIES IF EXISTS (SELECT query_id FROM [SHOW CLUSTER QUERIES] "
+                    "WHERE application_name = %s)",
+                    (conn.get_dsn_parameters().get("application_name"),)
+                )
             else:
-                self.conn.commit()
-                result = f"Filas afectadas: {cursor.rowcount}"
-            
+                cursor.execute("SELECT pg_cancel_backend(%s)", (conn.get_backend_pid(),))
             cursor.close()
+        finally:
+            side.close()
+    
+    def pool_stats(self):
+        if not self.pool:
+            return {}
+        return self.pool.stats()
+    
+    def invalidate_metadata(self, schema=None, name=None):
+        """
+        Descarta el metadato cacheado de un objeto (o de todo un esquema si
+        name es None, o de todo si ambos lo son). Los índices, triggers y
+        vistas del esquema también se descartan, porque su DDL puede
+        depender del objeto modificado.
+        """
+        if name is None:
+            self.metadata.invalidate(schema=schema)
+        else:
+            self.metadata.invalidate(schema=schema, name=name)
+            for kind in ("index", "trigger", "view"):
+                self.metadata.invalidate(schema=schema, kind=kind)
+        self.row_counts.invalidate(schema, name)
+    
+    def _invalidate_results(self, query):
+        """Tras una sentencia que puede cambiar datos, los resultados cacheados ya no valen."""
+        if not is_read_only(query):
+            result_cache.invalidate(self)
+    
+    def invalidate_for_statement(self, query):
+        """Invalida lo que cambia tras ejecutar query (DDL, TRUNCATE...)."""
+        targets = ddl_targets(query)
+        if targets is None:
+            self.invalidate_metadata()
+            return
+        for schema, name in targets:
+            self.invalidate_metadata(schema, name)
+    
+    @property
+    def is_cockroach(self):
+        if self._is_cockroach is None:
+            success, result = self.execute_query("SELECT version()", record=False)
+            self._is_cockroach = bool(success and "CockroachDB" in result[0][0])
+        return self._is_cockroach
+    
+    def execute_query(self, query, fetch=True, params=None, timeout=None, record=True):
+        """
+        timeout (segundos) sustituye al statement_timeout de la conexión
+        sólo para esta sentencia. Si se ejecuta dentro de una tarea del
+        executor, cancelar la tarea cancela la sentencia en el servidor.
+        Con record=False (consultas internas) no se anota en el historial.
+        """
+        try:
+            self.ensure_connected()
+        except Exception as e:
+            return False, str(e)
+        
+        started = time.monotonic()
+        text = query
+        try:
+            with self.pool.connection() as conn, cancel_scope(lambda: self.cancel_backend(conn)):
+                text = _query_text(query, conn)
+                cursor = conn.cursor()
+                if timeout:
+                    cursor.execute("SET LOCAL statement_timeout = %s", (timeout_ms(timeout),))
+                with perf.span("db.execute", SERVER, connection=self.history_label):
+                    cursor.execute(query, params)
+                
+                if cursor.description: 
+                    with perf.span("db.fetchall", FETCH, connection=self.history_label) as attrs:
+                        result = cursor.fetchall()
+                        attrs["rows"] = len(result)
+                    rows = len(result)
+                else:
+                    result = f"Filas afectadas: {cursor.rowcount}"
+                    rows = cursor.rowcount
+                
+                conn.commit()
+                cursor.close()
+                self._invalidate_results(text)
+            if record:
+                self._record(text, time.monotonic() - started, rows)
             return True, result
         
         except Exception as e:
-            try:
-                self.conn.rollback()
-            except:
-                pass
-            return False, f"Error ejecutando query: {str(e)}"
-    
-    def execute_query_dict(self, query):
-        if not self.is_connected:
-            return False, "No hay conexión activa"
+            if record:
+                self._record(text, time.monotonic() - started, error=e)
+            return False, _error_message(e, "Error ejecutando query: ")
+    
+    def execute_query_dict(self, query, params=None, timeout=None, record=True):
+        try:
+            self.ensure_connected()
+        except Exception as e:
+            return False, str(e)
         
+        started = time.monotonic()
+        text = query
         try:
-            cursor = self.conn.cursor(cursor_factory=RealDictCursor)
-            cursor.execute(query)
-            result = cursor.fetchall()
-            cursor.close()
+            with self.pool.connection() as conn, cancel_scope(lambda: self.cancel_backend(conn)):
+                text = _query_text(query, conn)
+                cursor = conn.cursor(cursor_factory=RealDictCursor)
+                if timeout:
+                    cursor.execute("SET LOCAL statement_timeout = %s", (timeout_ms(timeout),))
+                with perf.span("db.execute", SERVER, connection=self.history_label):
+                    cursor.execute(query, params)
+                with perf.span("db.fetchall", FETCH, connection=self.history_label) as attrs:
+                    result = cursor.fetchall()
+                    attrs["rows"] = len(result)
+                conn.commit()
+                cursor.close()
+                self._invalidate_results(text)
+            if record:
+                self._record(text, time.monotonic() - started, len(result))
             return True, result
         
         except Exception as e:
-            try:
-                self.conn.rollback()
-            except:
-                pass
-            return False, f"Error: {str(e)}"
-    
-    def get_tables(self):
-        query = """
-            SELECT tablename FROM pg_tables 
-            WHERE schemaname = 'public'
-            ORDER BY tablename
+            if record:
+                self._record(text, time.monotonic() - started, error=e)
+            return False, _error_message(e, "Error: ")
+    
+    def execute_statement(self, statement, params=None, as_dict=True, record=False):
         """
-        return self.execute_query(query)
+        Ejecuta una sentencia de catálogo (src.utils.catalog_queries) como
+        sentencia preparada en la conexión del pool que toque. Son consultas
+        internas del navegador: sólo se anotan en el historial con record=True.
+        
+        Returns:
+            tuple: (éxito: bool, filas: list de dicts, o de tuplas si as_dict=False)
+        """
+        try:
+            self.ensure_connected()
+        except Exception as e:
+            return False, str(e)
+        
+        params = params or {}
+        started = time.monotonic()
+        try:
+            with self.pool.connection() as conn, cancel_scope(lambda: self.cancel_backend(conn)):
+                cursor = conn.cursor(cursor_factory=RealDictCursor) if as_dict else conn.cursor()
+                with perf.span("db.execute", SERVER, connection=self.history_label, statement=statement.name):
+                    self.statements.execute(conn, cursor, statement, params)
+                with perf.span("db.fetchall", FETCH, connection=self.history_label) as attrs:
+                    result = cursor.fetchall()
+                    attrs["rows"] = len(result)
+                conn.commit()
+                cursor.close()
+            if record:
+                self._record(statement.sql, time.monotonic() - started, len(result))
+            return True, result
+        
+        except Exception as e:
+            if record:
+                self._record(statement.sql, time.monotonic() - started, error=e)
+            return False, _error_message(e, "Error: ")
     
-    def get_views(self, schema_name="public"):
-        query = f"""
-            SELECT c.relname AS viewname
-            FROM pg_catalog.pg_class c
-            JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
-            WHERE c.relkind = 'v'
-              AND n.nspname = '{schema_name}'
-            ORDER BY c.relname
+    @property
+    def history_label(self):
+        """Nombre con el que se anotan las consultas de esta conexión en el historial."""
+        return getattr(self, "name", None) or f"{self.user}@{self.host}/{self.dbname}"
+    
+    def _record(self, query, seconds, rows=None, error=None):
+        query_history.record(
+            self.history_label,
+            query,
+            seconds,
+            rows=rows,
+            status=_history_status(error) if error else STATUS_OK,
+            error=str(error).strip().splitlines()[0] if error and str(error).strip() else None
+        )
+    
+    def open_stream(self, query, params=None, itersize=None, timeout=None):
+        """
+        Ejecuta una consulta de lectura con un cursor de servidor y devuelve
+        un QueryStream para ir trayendo las filas por páginas. Se anota en
+        el historial al agotarse, cerrarse, cancelarse o fallar, con las
+        filas leídas hasta entonces.
         """
-        return self.execute_query(query)
+        self.ensure_connected()
+        return QueryStream(
+            self.pool, query, params, itersize or self.stream_itersize,
+            timeout_ms=timeout_ms(timeout) if timeout else None,
+            cancel=self.cancel_backend,
+            on_finish=lambda seconds, rows, error: self._record(query, seconds, rows, error)
+        )
+    
+    def get_tables(self, schema="public"):
+        return self.execute_statement(catalog_queries.TABLES, {"schema": schema}, as_dict=False)
+    
+    def get_views(self, schema_name="public"):
+        return self.execute_statement(catalog_queries.VIEWS, {"schema": schema_name}, as_dict=False)
     
     def get_functions(self, schema="public"):
-        try:
-            query = f"""
-                SELECT routine_name
-                FROM information_schema.routines
-                WHERE routine_schema = '{schema}'
-                ORDER BY routine_name
-            """
-            return self.execute_query(query)
-        except Exception as e:
-            print(f"Error obteniendo funciones: {e}")
-            return False, []
+        return self.execute_statement(catalog_queries.FUNCTIONS, {"schema": schema}, as_dict=False)
 
     def get_indexes(self, schema="public"):
-        try:
-
-            query = f"""
-                SELECT indexname
-                FROM pg_indexes
-                WHERE schemaname = '{schema}'
-                ORDER BY indexname
-            """
-            return self.execute_query(query)
-        except Exception as e:
-            print(f"Error obteniendo índices: {e}")
-            return False, []
+        return self.execute_statement(catalog_queries.INDEXES, {"schema": schema}, as_dict=False)
 
     def get_triggers(self, schema="public"):
-        try:
-            query = f"""
-                SELECT trigger_name
-                FROM information_schema.triggers
-                WHERE trigger_schema = '{schema}'
-                ORDER BY trigger_name
-            """
-            return self.execute_query(query)
-        except Exception as e:
-            print(f"Error obteniendo triggers: {e}")
-            return False, []
+        return self.execute_statement(catalog_queries.TRIGGERS, {"schema": schema}, as_dict=False)
 
     def get_materialized_views(self, schema="public"):
-        try:
+        return self.execute_statement(catalog_queries.MATERIALIZED_VIEWS, {"schema": schema}, as_dict=False)
     
-            query = f"""
-                SELECT matviewname
-                FROM pg_matviews
-                WHERE schemaname = '{schema}'
-                ORDER BY matviewname
-            """
-            return self.execute_query(query)
-        except Exception as e:
-            print(f"Error obteniendo mat views: {e}")
-            return False, []
-
     def get_schemas(self):
         """
         Obtiene todos los esquemas de la base de datos.
@@ -153,63 +379,138 @@ class DatabaseConnection:
         Returns:
             tuple: (éxito: bool, esquemas: list de strings)
         """
-        query = """
-            SELECT n.nspname AS schema_name
-            FROM pg_catalog.pg_namespace n
-            WHERE n.nspname NOT LIKE 'pg_%'
-              AND n.nspname <> 'information_schema'
-              AND n.nspname <> 'crdb_internal'
-            ORDER BY n.nspname
-        """
-        success, result = self.execute_query_dict(query)
+        success, result = self.execute_statement(catalog_queries.SCHEMAS)
         if success:
             return success, [row['schema_name'] for row in result]
         return success, result
     
     def get_schema_info(self, schema_name="public"):
-        query = f"""
-            SELECT 
-                t.tablename,
-                a.attname as column_name,
-                pg_catalog.format_type(a.atttypid, a.atttypmod) as data_type,
-                a.attnotnull as not_null,
-                a.attnum as column_position
-            FROM pg_tables t
-            JOIN pg_class c ON c.relname = t.tablename
-            JOIN pg_attribute a ON a.attrelid = c.oid
-            WHERE t.schemaname = '{schema_name}'
-            AND a.attnum > 0
-            ORDER BY t.tablename, a.attnum
+        return self.execute_statement(catalog_queries.SCHEMA_INFO, {"schema": schema_name})
+    
+    def get_catalog_snapshot(self, schema_name=None):
+        """
+        Obtiene el catálogo de un esquema (o de toda la base si schema_name
+        es None) con dos consultas: una para tablas y columnas, otra para
+        vistas, índices, funciones y triggers.
+        
+        Returns:
+            tuple: (éxito: bool, catálogo: dict esquema -> {
+                "tables": {tabla: [columnas]}, "views": [...],
+                "indexes": [...], "functions": [...], "triggers": [...]
+            })
+        """
+        params = {"schema": schema_name}
+        success, columns = self.execute_statement(catalog_queries.CATALOG_COLUMNS, params)
+        if not success:
+            return success, columns
+        success, objects = self.execute_statement(catalog_queries.CATALOG_OBJECTS, params)
+        if not success:
+            return success, objects
+        
+        catalog = {}
+        
+        def schema_entry(name):
+            return catalog.setdefault(name, {
+                "tables": {},
+                "views": [],
+                "indexes": [],
+                "functions": [],
+                "triggers": [],
+            })
+        
+        if schema_name:
+            schema_entry(schema_name)
+        
+        for row in columns:
+            table_columns = schema_entry(row['schema_name'])["tables"].setdefault(row['table_name'], [])
+            if row['column_name'] is not None:
+                table_columns.append({
+                    "column_name": row['column_name'],
+                    "data_type": row['data_type'],
+                    "is_nullable": row['is_nullable'],
+                })
+        
+        for row in objects:
+            schema_entry(row['schema_name'])[row['kind']].append(row['name'])
+        
+        return True, catalog
+    
+    def get_row_estimates(self, schema_name=None):
         """
-        return self.execute_query_dict(query)
-    
-    def get_table_columns(self, table_name):
-        query = f"""
-            SELECT
-            a.attname AS column_name,
-            pg_catalog.format_type(a.atttypid, a.atttypmod) AS data_type,
-            NOT a.attnotnull AS is_nullable
-            FROM pg_catalog.pg_attribute a
-            JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
-            JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
-            WHERE c.relname = '{table_name}'
-              AND a.attnum > 0
-              AND NOT a.attisdropped
-            ORDER BY a.attnum
+        Lee el número aproximado de filas de las estadísticas de las tablas
+        (pg_class.reltuples en PostgreSQL, crdb_internal.table_row_statistics
+        en CockroachDB) sin recorrer ninguna tabla.
+        
+        Returns:
+            tuple: (éxito: bool, estimaciones: dict (esquema, tabla) -> int o None)
+        """
+        statement = catalog_queries.ROW_ESTIMATES_CRDB if self.is_cockroach else catalog_queries.ROW_ESTIMATES
+        success, result = self.execute_statement(statement, {"schema": schema_name})
+        if not success:
+            return success, result
+        
+        estimates = {}
+        for row in result:
+            estimate = row['estimate']
+            if estimate is not None and estimate < 0:
+                estimate = None
+            estimates[(row['schema_name'], row['table_name'])] = estimate
+        return True, estimates
+    
+    def get_table_columns(self, table_name, schema="public"):
+        return self.metadata.get_or_load(
+            schema, "columns", table_name,
+            lambda: self.execute_statement(
+                catalog_queries.TABLE_COLUMNS, {"schema": schema, "table": table_name}
+            )
+        )
+    
+    def get_table_key(self, table_name, schema="public"):
         """
-        return self.execute_query_dict(query)
+        Columnas que identifican una fila: la clave primaria o, si no hay,
+        la primera restricción UNIQUE cuyas columnas no admiten nulos.
+        
+        Returns:
+            tuple: (éxito: bool, columnas: list de strings, vacía si no hay clave)
+        """
+        return self.metadata.get_or_load(
+            schema, "key", table_name,
+            lambda: self._load_table_key(schema, table_name)
+        )
     
-    def get_table_count(self, table_name):
-        query = f"SELECT COUNT(*) as count FROM {table_name}"
+    def _load_table_key(self, schema, table_name):
+        success, result = self.execute_statement(
+            catalog_queries.TABLE_KEY, {"schema": schema, "table": table_name}
+        )
+        if not success:
+            return success, result
+        
+        constraints = {}
+        for row in result:
+            constraints.setdefault(
+                (row['constraint_type'], row['constraint_name']), []
+            ).append(row)
+        
+        for (constraint_type, _), rows in constraints.items():
+            if constraint_type == 'PRIMARY KEY' or all(r['is_nullable'] == 'NO' for r in rows):
+                return True, [r['column_name'] for r in rows]
+        return True, []
+    
+    def get_table_count(self, table_name, schema="public"):
+        query = sql.SQL("SELECT COUNT(*) as count FROM {}.{}").format(
+            sql.Identifier(schema),
+            sql.Identifier(table_name)
+        )
         success, result = self.execute_query_dict(query)
         if success:
             return success, result[0]['count']
         return success, result
     
     def close(self):
-        if self.conn:
-            self.conn.close()
-            self.is_connected = False
+        if getattr(self, "pool", None):
+            self.pool.close_all()
+        self.is_connected = False
+        self.status = STATUS_CLOSED
     
     def __del__(self):
         self.close()
@@ -218,14 +519,15 @@ class DatabaseConnection:
         return self
     
     def get_function_ddl(self, function_name, schema="public"):
-        query = f"""
-            SELECT pg_get_functiondef(p.oid) as ddl
-            FROM pg_proc p
-            JOIN pg_namespace n ON n.oid = p.pronamespace
-            WHERE p.proname = '{function_name}'
-              AND n.nspname = '{schema}'
-        """
-        success, result = self.execute_query_dict(query)
+        return self.metadata.get_or_load(
+            schema, "function", function_name,
+            lambda: self._load_function_ddl(function_name, schema)
+        )
+    
+    def _load_function_ddl(self, function_name, schema):
+        success, result = self.execute_statement(
+            catalog_queries.FUNCTION_DDL, {"schema": schema, "object_name": function_name}
+        )
         if success and result:
             ddl = result[0]['ddl'].replace(';', ';\n')
             return True, ddl
@@ -233,13 +535,15 @@ class DatabaseConnection:
     
     
     def get_view_ddl(self, view_name, schema="public"):
-        query = f"""
-            SELECT 'CREATE OR REPLACE VIEW ' || table_schema || '.' || table_name || ' AS ' || view_definition as ddl
-            FROM information_schema.views
-            WHERE table_schema = '{schema}'
-              AND table_name = '{view_name}'
-        """
-        success, result = self.execute_query_dict(query)
+        return self.metadata.get_or_load(
+            schema, "view", view_name,
+            lambda: self._load_view_ddl(view_name, schema)
+        )
+    
+    def _load_view_ddl(self, view_name, schema):
+        success, result = self.execute_statement(
+            catalog_queries.VIEW_DDL, {"schema": schema, "object_name": view_name}
+        )
         if success and result:
             ddl = result[0]['ddl'].replace(';', ';\n')
             return True, ddl
@@ -247,15 +551,15 @@ class DatabaseConnection:
     
     
     def get_index_ddl(self, index_name, schema="public"):
-        query = f"""
-            SELECT pg_get_indexdef(indexrelid) as ddl
-            FROM pg_index i
-            JOIN pg_class c ON c.oid = i.indexrelid
-            JOIN pg_namespace n ON n.oid = c.relnamespace
-            WHERE c.relname = '{index_name}'
-              AND n.nspname = '{schema}'
-        """
-        success, result = self.execute_query_dict(query)
+        return self.metadata.get_or_load(
+            schema, "index", index_name,
+            lambda: self._load_index_ddl(index_name, schema)
+        )
+    
+    def _load_index_ddl(self, index_name, schema):
+        success, result = self.execute_statement(
+            catalog_queries.INDEX_DDL, {"schema": schema, "object_name": index_name}
+        )
         if success and result:
             ddl = result[0]['ddl'].replace(';', ';\n')
             return True, ddl
@@ -263,14 +567,15 @@ class DatabaseConnection:
     
     
     def get_trigger_ddl(self, trigger_name, schema="public"):
-        query = f"""
-            SELECT 'CREATE TRIGGER ' || trigger_name || ' ' || action_timing || ' ' || event_manipulation ||
-                   ' ON ' || event_object_table || ' FOR EACH ROW EXECUTE FUNCTION ' || action_statement as ddl
-            FROM information_schema.triggers
-            WHERE trigger_schema = '{schema}'
-              AND trigger_name = '{trigger_name}'
-        """
-        success, result = self.execute_query_dict(query)
+        return self.metadata.get_or_load(
+            schema, "trigger", trigger_name,
+            lambda: self._load_trigger_ddl(trigger_name, schema)
+        )
+    
+    def _load_trigger_ddl(self, trigger_name, schema):
+        success, result = self.execute_statement(
+            catalog_queries.TRIGGER_DDL, {"schema": schema, "object_name": trigger_name}
+        )
         if success and result:
             ddl = result[0]['ddl'].replace(';', ';\n')
             return True, ddl
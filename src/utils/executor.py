@@ -0,0 +1,224 @@
+"""
+Ejecución de operaciones de base de datos fuera del hilo de Tk.
+
+Las tareas corren en un pool de hilos y sus resultados se entregan al hilo
+de la interfaz sondeando una cola con root.after, de modo que los callbacks
+(on_success, on_error, on_progress) siempre pueden tocar widgets.
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+from contextlib import contextmanager
+
+
+_local = threading.local()
+
+
+def current_task():
+    """Tarea que se está ejecutando en el hilo actual (None fuera del pool)."""
+    return getattr(_local, "task", None)
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+@contextmanager
+def cancel_scope(hook):
+    """
+    Mientras dura el bloque, cancelar la tarea actual ejecuta hook (p. ej.
+    cancelar la sentencia en curso en el servidor). Fuera del pool no hace nada.
+    """
+    task = current_task()
+    if task is None:
+        yield
+        return
+    task.on_cancel(hook)
+    try:
+        task.check_cancelled()
+        yield
+    finally:
+        task.remove_cancel_hook(hook)
+
+
+class Task:
+
+    def __init__(self, executor, description=""):
+        self.executor = executor
+        self.description = description
+        self.message = ""
+        self.fraction = None
+        self.cancelled = False
+        self.future = None
+        self.on_success = None
+        self.on_error = None
+        self.on_progress = None
+        self.on_discard = None
+        self._cancel_hooks = []
+        self._lock = threading.Lock()
+
+    @property
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def report(self, message=None, fraction=None):
+        """Publica el progreso de la tarea; se puede llamar desde el worker."""
+        if message is not None:
+            self.message = message
+        self.fraction = fraction
+        self.executor._events.put(("progress", self))
+
+    def on_cancel(self, hook):
+        """Registra una acción (p. ej. conn.cancel) a ejecutar al cancelar."""
+        with self._lock:
+            if not self.cancelled:
+                self._cancel_hooks.append(hook)
+                return
+        hook()
+
+    def remove_cancel_hook(self, hook):
+        with self._lock:
+            if hook in self._cancel_hooks:
+                self._cancel_hooks.remove(hook)
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise TaskCancelled()
+
+    def cancel(self):
+        with self._lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            hooks = list(self._cancel_hooks)
+            self._cancel_hooks.clear()
+
+        if self.future:
+            self.future.cancel()
+        for hook in hooks:
+            try:
+                hook()
+            except Exception as e:
+                print(f"Error cancelando tarea: {e}")
+
+
+class QueryExecutor:
+
+    def __init__(self, max_workers=4, poll_interval=50):
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-worker")
+        self._events = queue.Queue()
+        self._tasks = []
+        self._tasks_lock = threading.Lock()
+        self._listeners = []
+        self._root = None
+
+    def attach(self, root):
+        """Empieza a entregar resultados en el mainloop de root."""
+        self._root = root
+        self._root.after(self.poll_interval, self._poll)
+
+    def submit(self, fn, *args, on_success=None, on_error=None, on_progress=None,
+               on_discard=None, description="", **kwargs):
+        """
+        on_discard(resultado) se llama si la tarea terminó bien pero fue
+        cancelada antes de entregarse, para liberar recursos (cursores, etc.).
+        """
+        task = Task(self, description)
+        task.on_success = on_success
+        task.on_error = on_error
+        task.on_progress = on_progress
+        task.on_discard = on_discard
+        with self._tasks_lock:
+            self._tasks.append(task)
+        self._events.put(("submitted", task))
+
+        task.future = self._pool.submit(self._run, task, fn, args, kwargs)
+        task.future.add_done_callback(lambda f: self._events.put(("done", task)))
+        return task
+
+    def running_tasks(self):
+        with self._tasks_lock:
+            return list(self._tasks)
+
+    def add_listener(self, callback):
+        """callback(tareas) se llama en el hilo de Tk cuando cambian las tareas activas."""
+        self._listeners.append(callback)
+
+    def cancel_all(self):
+        for task in self.running_tasks():
+            task.cancel()
+
+    def shutdown(self):
+        self.cancel_all()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _run(task, fn, args, kwargs):
+        _local.task = task
+        try:
+            task.check_cancelled()
+            return fn(*args, **kwargs)
+        finally:
+            _local.task = None
+
+    def _poll(self):
+        changed = False
+        while True:
+            try:
+                event, task = self._events.get_nowait()
+            except queue.Empty:
+                break
+
+            changed = True
+            if event == "progress":
+                if task.on_progress and not task.cancelled:
+                    self._call(task.on_progress, task)
+            elif event == "done":
+                with self._tasks_lock:
+                    if task in self._tasks:
+                        self._tasks.remove(task)
+                self._deliver(task)
+
+        if changed:
+            self._notify()
+        if self._root is not None:
+            try:
+                self._root.after(self.poll_interval, self._poll)
+            except Exception:
+                pass
+
+    def _deliver(self, task):
+        try:
+            result = task.future.result()
+        except (CancelledError, TaskCancelled):
+            return
+        except Exception as e:
+            if task.cancelled:
+                return
+            if task.on_error:
+                self._call(task.on_error, e)
+            else:
+                print(f"Error en tarea '{task.description}': {e}")
+            return
+        if task.cancelled:
+            if task.on_discard:
+                self._call(task.on_discard, result)
+            return
+        if task.on_success:
+            self._call(task.on_success, result)
+
+    def _notify(self):
+        for listener in self._listeners:
+            self._call(listener, self.running_tasks())
+
+    @staticmethod
+    def _call(callback, *args):
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"Error en callback de tarea: {e}")
+
+
+executor = QueryExecutor()
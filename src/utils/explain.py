@@ -0,0 +1,238 @@
+"""
+Planes de ejecución: EXPLAIN (FORMAT JSON) en PostgreSQL y EXPLAIN
+(VERBOSE) en CockroachDB, convertidos a un árbol de PlanNode con tiempo,
+filas y coste por operador y marcas para los nodos a revisar.
+"""
+import json
+import re
+from src.utils.executor import cancel_scope
+from src.utils.connection import timeout_ms
+
+
+HOT_SHARE = 0.2
+MISESTIMATE_RATIO = 10
+MISESTIMATE_MIN_ROWS = 100
+
+_FULL_SCAN_TYPES = ("Seq Scan", "Parallel Seq Scan")
+_CRDB_NODE = re.compile(r"^(?P<indent>[\s│├└─]*)•\s*(?P<name>.+)$")
+_CRDB_ATTR = re.compile(r"^[\s│├└─]*(?P<key>[a-zA-Z][\w ()/-]*?):\s*(?P<value>.*)$")
+_NUMBER = re.compile(r"[\d,]+(?:\.\d+)?")
+_DURATION = re.compile(r"([\d.]+)\s*(µs|us|ms|s|m)\b")
+
+
+class PlanNode:
+
+    def __init__(self, operator, detail=""):
+        self.operator = operator
+        self.detail = detail
+        self.children = []
+        self.estimated_rows = None
+        self.actual_rows = None
+        self.loops = 1
+        self.total_time = None
+        self.cost = None
+        self.full_scan = False
+        self.hot = False
+        self.misestimated = False
+        self.self_time = None
+        self.self_cost = None
+
+    def walk(self):
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    @property
+    def estimate_ratio(self):
+        """Filas reales / estimadas (None si falta alguno de los dos)."""
+        if self.actual_rows is None or self.estimated_rows is None:
+            return None
+        return (self.actual_rows + 1) / (self.estimated_rows + 1)
+
+    @property
+    def flags(self):
+        flags = []
+        if self.hot:
+            flags.append("🔥")
+        if self.misestimated:
+            flags.append("⚠️")
+        if self.full_scan:
+            flags.append("🐢")
+        return flags
+
+
+class Plan:
+
+    def __init__(self, root, analyzed, planning_time=None, execution_time=None, raw=None):
+        self.root = root
+        self.analyzed = analyzed
+        self.planning_time = planning_time
+        self.execution_time = execution_time
+        self.raw = raw
+        _annotate(self)
+
+    def nodes(self):
+        return list(self.root.walk()) if self.root else []
+
+
+def _annotate(plan):
+    """Calcula tiempos/costes propios y marca nodos calientes, mal estimados y full scans."""
+    nodes = plan.nodes()
+    for node in nodes:
+        if node.total_time is not None:
+            children = sum(child.total_time or 0 for child in node.children)
+            node.self_time = max(node.total_time - children, 0)
+        if node.cost is not None:
+            children = sum(child.cost or 0 for child in node.children)
+            node.self_cost = max(node.cost - children, 0)
+
+        ratio = node.estimate_ratio
+        if ratio is not None and max(node.actual_rows, node.estimated_rows) >= MISESTIMATE_MIN_ROWS:
+            node.misestimated = ratio >= MISESTIMATE_RATIO or ratio <= 1 / MISESTIMATE_RATIO
+
+    if any(node.self_time is not None for node in nodes):
+        key = "self_time"
+    else:
+        key = "self_cost"
+    total = sum(getattr(node, key) or 0 for node in nodes)
+    if total > 0:
+        for node in nodes:
+            node.hot = (getattr(node, key) or 0) / total >= HOT_SHARE
+
+
+def parse_pg_plan(document, analyzed):
+    """document: resultado de EXPLAIN (FORMAT JSON), como texto o ya decodificado."""
+    if isinstance(document, str):
+        document = json.loads(document)
+    top = document[0]
+
+    def build(data):
+        node_type = data.get("Node Type", "?")
+        detail_parts = []
+        if data.get("Relation Name"):
+            relation = data["Relation Name"]
+            if data.get("Schema"):
+                relation = f"{data['Schema']}.{relation}"
+            detail_parts.append(f"on {relation}")
+        if data.get("Index Name"):
+            detail_parts.append(f"using {data['Index Name']}")
+        for key in ("Join Type", "Strategy", "Hash Cond", "Index Cond", "Filter", "Sort Key"):
+            if data.get(key):
+                value = data[key]
+                if isinstance(value, list):
+                    value = ", ".join(value)
+                detail_parts.append(f"{key}: {value}")
+
+        node = PlanNode(node_type, " · ".join(detail_parts))
+        loops = data.get("Actual Loops") or 1
+        node.loops = loops
+        node.estimated_rows = data.get("Plan Rows", 0) * loops
+        node.cost = data.get("Total Cost")
+        if "Actual Rows" in data:
+            node.actual_rows = data["Actual Rows"] * loops
+            node.total_time = data.get("Actual Total Time", 0) * loops
+        node.full_scan = node_type in _FULL_SCAN_TYPES
+        node.children = [build(child) for child in data.get("Plans", [])]
+        return node
+
+    return Plan(
+        build(top["Plan"]),
+        analyzed,
+        planning_time=top.get("Planning Time"),
+        execution_time=top.get("Execution Time"),
+        raw=json.dumps(document, indent=2)
+    )
+
+
+def _parse_number(text):
+    match = _NUMBER.search(text)
+    return float(match.group().replace(",", "")) if match else None
+
+
+def _parse_duration(text):
+    """Convierte "1.2ms", "350µs" o "2s" a milisegundos."""
+    match = _DURATION.search(text)
+    if not match:
+        return None
+    value, unit = float(match.group(1)), match.group(2)
+    return value * {"µs": 0.001, "us": 0.001, "ms": 1, "s": 1000, "m": 60000}[unit]
+
+
+def parse_crdb_plan(lines, analyzed):
+    """lines: filas de texto de EXPLAIN [ANALYZE] (VERBOSE) de CockroachDB."""
+    root = None
+    stack = []
+    planning_time = execution_time = None
+
+    for line in lines:
+        node_match = _CRDB_NODE.match(line)
+        if node_match:
+            indent = len(node_match.group("indent"))
+            node = PlanNode(node_match.group("name").strip())
+            while stack and stack[-1][0] >= indent:
+                stack.pop()
+            if stack:
+                stack[-1][1].children.append(node)
+            else:
+                root = node
+            stack.append((indent, node))
+            continue
+
+        attr = _CRDB_ATTR.match(line)
+        if not attr:
+            continue
+        key, value = attr.group("key").strip().lower(), attr.group("value").strip()
+        current = stack[-1][1] if stack else None
+
+        if current is None:
+            if key == "planning time":
+                planning_time = _parse_duration(value)
+            elif key == "execution time":
+                execution_time = _parse_duration(value)
+            continue
+
+        if key == "actual row count":
+            current.actual_rows = _parse_number(value)
+        elif key == "estimated row count":
+            current.estimated_rows = _parse_number(value)
+        elif key == "execution time":
+            current.total_time = _parse_duration(value)
+        elif key in ("table", "spans") or key.startswith("equality") or key == "filter":
+            if key == "spans" and "FULL SCAN" in value.upper():
+                current.full_scan = True
+            current.detail = f"{current.detail} · {key}: {value}" if current.detail else f"{key}: {value}"
+
+    if root is None:
+        raise ValueError("No se pudo interpretar el plan de CockroachDB")
+    return Plan(root, analyzed, planning_time, execution_time, raw="\n".join(lines))
+
+
+def explain(db, query, analyze=False, timeout=None):
+    """
+    Ejecuta EXPLAIN sobre query y devuelve un Plan. Con analyze la
+    consulta se ejecuta de verdad, pero dentro de una transacción que
+    siempre se deshace, de modo que un UPDATE/DELETE no deja cambios.
+    """
+    db.ensure_connected()
+    cockroach = db.is_cockroach
+    query = query.strip().rstrip(";")
+    if cockroach:
+        statement = f"EXPLAIN {'ANALYZE ' if analyze else ''}(VERBOSE) {query}"
+    else:
+        options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+        statement = f"EXPLAIN ({options}) {query}"
+
+    with db.pool.connection() as conn, cancel_scope(lambda: db.cancel_backend(conn)):
+        cursor = conn.cursor()
+        try:
+            if timeout:
+                cursor.execute("SET LOCAL statement_timeout = %s", (timeout_ms(timeout),))
+            cursor.execute(statement)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+            conn.rollback()
+
+    if cockroach:
+        return parse_crdb_plan([row[0] for row in rows], analyze)
+    return parse_pg_plan(rows[0][0], analyze)
@@ -0,0 +1,147 @@
+"""
+Exportación de resultados con COPY ... TO STDOUT.
+
+Las filas pasan del servidor al fichero según llegan, sin acumularse en
+memoria, por lo que el tamaño del extracto sólo está limitado por el disco.
+"""
+import gzip
+import os
+import re
+import time
+from psycopg2 import sql
+from src.utils.executor import current_task, cancel_scope
+
+
+EXPORT_FORMATS = {
+    "csv": "CSV",
+    "tsv": "TSV",
+    "jsonl": "JSON lines",
+}
+
+EXPORT_FILETYPES = [
+    ("CSV", "*.csv"),
+    ("TSV", "*.tsv"),
+    ("JSON lines", "*.jsonl"),
+    ("Comprimido (gzip)", "*.gz"),
+    ("Todos los archivos", "*.*"),
+]
+
+_EXTENSIONS = {".csv": "csv", ".tsv": "tsv", ".tab": "tsv", ".jsonl": "jsonl", ".json": "jsonl", ".ndjson": "jsonl"}
+
+_COPY_ESCAPES = {b"b": b"\b", b"f": b"\f", b"n": b"\n", b"r": b"\r", b"t": b"\t", b"v": b"\v"}
+_COPY_ESCAPE = re.compile(rb"\\(.)")
+
+
+def format_for_path(path):
+    """Formato de exportación según la extensión (ignorando un .gz final)."""
+    base = path[:-3] if path.lower().endswith(".gz") else path
+    return _EXTENSIONS.get(os.path.splitext(base)[1].lower(), "csv")
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class _CopySink:
+    """Destino de copy_expert: cuenta filas y bytes, informa del progreso y permite cancelar."""
+
+    REPORT_INTERVAL = 0.25
+
+    def __init__(self, out, unescape=False, header=False):
+        self.out = out
+        self.unescape = unescape
+        self.rows = -1 if header else 0
+        self.bytes = 0
+        self._task = current_task()
+        self._last_report = 0
+
+    def write(self, data):
+        if self._task:
+            self._task.check_cancelled()
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if self.unescape:
+            # El formato texto de COPY escapa las barras; se deshace para que cada línea sea JSON válido.
+            data = _COPY_ESCAPE.sub(lambda m: _COPY_ESCAPES.get(m.group(1), m.group(1)), data)
+        self.out.write(data)
+        self.bytes += len(data)
+        # psycopg2 escribe una fila de COPY por llamada.
+        self.rows += 1
+
+        now = time.monotonic()
+        if self._task and now - self._last_report >= self.REPORT_INTERVAL:
+            self._last_report = now
+            self._task.report(f"{max(self.rows, 0):,} filas · {format_bytes(self.bytes)}")
+
+
+def _copy_statement(source, fmt):
+    if fmt == "jsonl":
+        return sql.SQL("COPY (SELECT row_to_json(q)::text FROM ({}) AS q) TO STDOUT").format(source)
+    if fmt == "tsv":
+        return sql.SQL("COPY ({}) TO STDOUT WITH (FORMAT csv, DELIMITER E'\\t', HEADER true)").format(source)
+    return sql.SQL("COPY ({}) TO STDOUT WITH (FORMAT csv, HEADER true)").format(source)
+
+
+def export_query(db, query, path, fmt=None, compress=None, params=None):
+    """
+    Exporta el resultado de query a path. Pensado para ejecutarse en un
+    worker del executor: informa del progreso con Task.report y al
+    cancelar la tarea se cancela el COPY y se borra el fichero parcial.
+
+    Returns:
+        dict: filas, bytes (sin comprimir), ruta y segundos empleados.
+    """
+    fmt = fmt or format_for_path(path)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportación no soportado: {fmt}")
+    if compress is None:
+        compress = path.lower().endswith(".gz")
+
+    started = time.monotonic()
+    conn = db.open_raw_connection()
+    try:
+        cursor = conn.cursor()
+        if isinstance(query, str):
+            query = query.strip().rstrip(";")
+            if params:
+                query = cursor.mogrify(query, params).decode(conn.encoding)
+            source = sql.SQL(query)
+        else:
+            source = query
+        statement = _copy_statement(source, fmt).as_string(conn)
+
+        opener = gzip.open if compress else open
+        try:
+            with opener(path, "wb") as out, cancel_scope(conn.cancel):
+                sink = _CopySink(out, unescape=(fmt == "jsonl"), header=(fmt != "jsonl"))
+                cursor.copy_expert(statement, sink)
+        except BaseException:
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+        cursor.close()
+    finally:
+        conn.close()
+
+    return {
+        "rows": max(sink.rows, 0),
+        "bytes": sink.bytes,
+        "path": path,
+        "seconds": time.monotonic() - started,
+    }
+
+
+def export_table(db, schema_name, table_name, path, fmt=None, compress=None):
+    source = sql.SQL("SELECT * FROM {}.{}").format(sql.Identifier(schema_name), sql.Identifier(table_name))
+    return export_query(db, source, path, fmt=fmt, compress=compress)
+
+
+def describe_export(result):
+    seconds = max(result["seconds"], 0.001)
+    return (
+        f"{result['rows']:,} filas ({format_bytes(result['bytes'])}) exportadas a "
+        f"{result['path']} en {result['seconds']:.1f} s ({result['rows'] / seconds:,.0f} filas/s)"
+    )
@@ -0,0 +1,293 @@
+"""
+Importación masiva de CSV/TSV con COPY ... FROM STDIN.
+
+El fichero se lee en streaming y se carga por lotes de batch_size filas,
+cada uno en su propia transacción. Si un lote falla por los datos de
+alguna fila (SQLSTATE de las clases 22 y 23) se divide hasta aislar las
+filas erróneas, que van al fichero de rechazos junto con el error;
+cualquier otro error (columna inexistente, permisos, conexión perdida...)
+detiene la importación. Como en COPY, un campo vacío sin comillas es NULL
+y "" es la cadena vacía.
+"""
+import csv
+import io
+import os
+import time
+from psycopg2 import sql
+from src.utils.executor import current_task, cancel_scope
+from src.utils.result_cache import result_cache
+
+
+DEFAULT_BATCH_SIZE = 50000
+DEFAULT_MAX_REJECTS = 1000
+
+# Clases de SQLSTATE que dependen de los datos de una fila: data_exception
+# (valor inválido, fuera de rango...) e integrity_constraint_violation
+# (NOT NULL, UNIQUE, FK, CHECK).
+_ROW_ERROR_CLASSES = ("22", "23")
+
+
+class TooManyRejects(Exception):
+    pass
+
+
+def _is_row_error(error):
+    return (getattr(error, "pgcode", None) or "")[:2] in _ROW_ERROR_CLASSES
+
+
+class _RecordLines:
+    """Iterador de líneas que guarda las que consume csv.reader para cada registro."""
+
+    def __init__(self, lines):
+        self._lines = iter(lines)
+        self.consumed = []
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = next(self._lines)
+        self.consumed.append(line)
+        return line
+
+    def take(self):
+        raw = "".join(self.consumed)
+        self.consumed.clear()
+        return raw
+
+
+def _quoted_fields(raw, delimiter, count):
+    """Para cada campo del registro raw, si empieza entre comillas."""
+    flags = []
+    pos = 0
+    while len(flags) < count:
+        quoted = raw.startswith('"', pos)
+        flags.append(quoted)
+        if quoted:
+            pos += 1
+            while True:
+                pos = raw.find('"', pos)
+                if pos == -1:
+                    return flags + [False] * (count - len(flags))
+                if not raw.startswith('""', pos):
+                    break
+                pos += 2
+        pos = raw.find(delimiter, pos)
+        if pos == -1:
+            break
+        pos += 1
+    return flags + [False] * (count - len(flags))
+
+
+def _with_nulls(row, raw, delimiter):
+    """Sustituye por None los campos vacíos sin comillas."""
+    if "" not in row:
+        return row
+    if '"' not in raw:
+        return [value if value else None for value in row]
+    quoted = _quoted_fields(raw, delimiter, len(row))
+    return [None if value == "" and not quoted[i] else value for i, value in enumerate(row)]
+
+
+def _copy_line(row):
+    """Registro CSV para COPY: todo entre comillas salvo NULL (vacío sin comillas)."""
+    return ",".join(
+        "" if value is None else '"' + value.replace('"', '""') + '"'
+        for value in row
+    ) + "\n"
+
+
+def delimiter_for_path(path):
+    return "\t" if os.path.splitext(path)[1].lower() in (".tsv", ".tab") else ","
+
+
+def read_header(path, delimiter=",", encoding="utf-8"):
+    """Primera fila del fichero (nombres de columna si tiene cabecera)."""
+    with open(path, newline="", encoding=encoding) as f:
+        return next(csv.reader(f, delimiter=delimiter), [])
+
+
+def default_mapping(source_columns, table_columns):
+    """Asocia cada columna de la tabla con la columna del fichero del mismo nombre."""
+    by_name = {name.strip().lower(): index for index, name in enumerate(source_columns)}
+    return {
+        col: by_name[col.lower()]
+        for col in table_columns
+        if col.lower() in by_name
+    }
+
+
+def validate_mapping(mapping, table_columns, source_count):
+    """
+    Comprueba la asociación columna de tabla -> índice en el fichero contra
+    las columnas reales (las de get_table_columns).
+
+    Returns:
+        tuple: (errores: list, columnas NOT NULL sin asociar: list)
+    """
+    names = {col["column_name"] for col in table_columns}
+    errors = []
+    if not mapping:
+        errors.append("No hay ninguna columna asociada")
+    for column, index in mapping.items():
+        if column not in names:
+            errors.append(f"La columna '{column}' no existe en la tabla")
+        if not 0 <= index < source_count:
+            errors.append(f"La columna {index + 1} no existe en el fichero")
+    unmapped_required = [
+        col["column_name"] for col in table_columns
+        if not col["is_nullable"] and col["column_name"] not in mapping
+    ]
+    return errors, unmapped_required
+
+
+class _ImportStats:
+
+    def __init__(self, total_bytes):
+        self.read = 0
+        self.loaded = 0
+        self.rejected = 0
+        self.total_bytes = total_bytes
+        self.started = time.monotonic()
+
+    @property
+    def rows_per_second(self):
+        return self.loaded / max(time.monotonic() - self.started, 0.001)
+
+    def describe(self):
+        return (
+            f"{self.loaded:,} filas cargadas · {self.rejected:,} rechazadas · "
+            f"{self.rows_per_second:,.0f} filas/s"
+        )
+
+
+def import_csv(db, schema_name, table_name, path, mapping, delimiter=",", header=True,
+               batch_size=DEFAULT_BATCH_SIZE, reject_path=None, encoding="utf-8",
+               max_rejects=DEFAULT_MAX_REJECTS):
+    """
+    Carga path en schema_name.table_name. mapping asocia columna de la
+    tabla -> índice de columna en el fichero. Pensado para un worker del
+    executor: informa del progreso y se puede cancelar entre lotes (los
+    lotes ya confirmados se quedan). Con más de max_rejects filas
+    rechazadas (None = sin límite) se detiene con TooManyRejects.
+
+    Returns:
+        dict: filas leídas, cargadas, rechazadas, segundos y fichero de rechazos.
+    """
+    task = current_task()
+    columns = list(mapping)
+    indexes = [mapping[col] for col in columns]
+    copy_statement = sql.SQL("COPY {}.{} ({}) FROM STDIN WITH (FORMAT csv)").format(
+        sql.Identifier(schema_name),
+        sql.Identifier(table_name),
+        sql.SQL(", ").join(sql.Identifier(col) for col in columns)
+    )
+    reject_path = reject_path or f"{path}.rejected.csv"
+    rejects = None
+    stats = _ImportStats(os.path.getsize(path))
+
+    conn = db.open_raw_connection()
+    try:
+        statement = copy_statement.as_string(conn)
+
+        def reject(source_row, error):
+            nonlocal rejects
+            if rejects is None:
+                rejects = open(reject_path, "w", newline="", encoding="utf-8")
+            # Mismo formato que se envía a COPY: conserva la diferencia entre NULL y "".
+            rejects.write(_copy_line(list(source_row) + [error]))
+            stats.rejected += 1
+            if max_rejects is not None and stats.rejected > max_rejects:
+                raise TooManyRejects(
+                    f"Importación detenida: más de {max_rejects:,} filas rechazadas "
+                    f"(ver {reject_path}); {stats.loaded:,} filas ya cargadas"
+                )
+
+        def copy_rows(batch):
+            buffer = io.StringIO("".join(_copy_line(row) for row, _ in batch))
+            cursor = conn.cursor()
+            try:
+                with cancel_scope(conn.cancel):
+                    cursor.copy_expert(statement, buffer)
+                conn.commit()
+            finally:
+                cursor.close()
+
+        def load(batch):
+            """Carga el lote; si falla por los datos, lo parte en dos hasta aislar las filas malas."""
+            try:
+                copy_rows(batch)
+                stats.loaded += len(batch)
+            except Exception as e:
+                conn.rollback()
+                if task:
+                    task.check_cancelled()
+                if not _is_row_error(e):
+                    raise
+                if len(batch) == 1:
+                    reject(batch[0][1], str(e).strip().splitlines()[0])
+                    return
+                middle = len(batch) // 2
+                load(batch[:middle])
+                load(batch[middle:])
+
+        def report(position):
+            if task:
+                task.report(stats.describe(), fraction=position / max(stats.total_bytes, 1))
+
+        with open(path, "rb") as raw:
+            text = io.TextIOWrapper(raw, encoding=encoding, newline="")
+            lines = _RecordLines(text)
+            reader = csv.reader(lines, delimiter=delimiter)
+            if header:
+                source_header = next(reader, [])
+                lines.take()
+                expected = len(source_header)
+            else:
+                expected = None
+
+            batch = []
+            for source_row in reader:
+                source_row = _with_nulls(source_row, lines.take(), delimiter)
+                stats.read += 1
+                if expected is None:
+                    expected = len(source_row)
+                if len(source_row) != expected:
+                    reject(source_row, f"Se esperaban {expected} columnas y hay {len(source_row)}")
+                    continue
+                batch.append(([source_row[i] for i in indexes], source_row))
+                if len(batch) >= batch_size:
+                    if task:
+                        task.check_cancelled()
+                    load(batch)
+                    batch = []
+                    report(raw.tell())
+            if batch:
+                load(batch)
+            report(stats.total_bytes)
+    finally:
+        if rejects is not None:
+            rejects.close()
+        conn.close()
+        db.row_counts.invalidate(schema_name, table_name)
+        if stats.loaded:
+            result_cache.invalidate(db)
+
+    return {
+        "read": stats.read,
+        "loaded": stats.loaded,
+        "rejected": stats.rejected,
+        "seconds": time.monotonic() - stats.started,
+        "rows_per_second": stats.rows_per_second,
+        "reject_path": reject_path if stats.rejected else None,
+    }
+
+
+def describe_import(result):
+    text = (
+        f"{result['loaded']:,} de {result['read']:,} filas cargadas en "
+        f"{result['seconds']:.1f} s ({result['rows_per_second']:,.0f} filas/s)"
+    )
+    if result["rejected"]:
+        text += f"\n{result['rejected']:,} filas rechazadas en {result['reject_path']}"
+    return text
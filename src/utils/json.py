@@ -1,6 +1,19 @@
 import json
 import os
 
+
+CONNECTION_SETTINGS = (
+    "pool_min_size",
+    "pool_max_size",
+    "pool_idle_timeout",
+    "pool_checkout_timeout",
+    "stream_itersize",
+    "metadata_ttl",
+    "metadata_max_entries",
+    "statement_timeout",
+)
+
+
 def export_connection_to_json(connection):
     try:
         PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -15,6 +28,9 @@ def export_connection_to_json(connection):
             "sslmode": connection.sslmode,
             "name": getattr(connection, 'name', f"{connection.user}@{connection.host}")
         }
+        for key in CONNECTION_SETTINGS:
+            if hasattr(connection, key):
+                connection_data[key] = getattr(connection, key)
         if os.path.exists(FILE_PATH):
             with open(FILE_PATH, "r", encoding="utf-8") as f:
                 try:
@@ -0,0 +1,171 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+_MISSING = object()
+
+_IDENT = r'(?:"(?:[^"]|"")+"|[\w$]+)'
+_QUALIFIED = rf'{_IDENT}(?:\s*\.\s*{_IDENT})*'
+_NAME_LIST = rf'{_QUALIFIED}(?:\s*,\s*{_QUALIFIED})*'
+
+_OBJECT_DDL = re.compile(
+    r'^(CREATE|ALTER|DROP)\s+(?:OR\s+REPLACE\s+)?'
+    r'(?:(?:GLOBAL|LOCAL|TEMP|TEMPORARY|UNLOGGED|MATERIALIZED|UNIQUE)\s+)*'
+    r'(TABLE|VIEW|INDEX|FUNCTION|PROCEDURE|TRIGGER|SEQUENCE)\s+'
+    r'(?:CONCURRENTLY\s+)?(?:IF\s+(?:NOT\s+)?EXISTS\s+)?'
+    rf'(?:(?!ON\b)({_NAME_LIST}))?(.*)$',
+    re.IGNORECASE | re.DOTALL
+)
+_SCHEMA_DDL = re.compile(
+    rf'^(?:CREATE|ALTER|DROP)\s+SCHEMA\s+(?:IF\s+(?:NOT\s+)?EXISTS\s+)?({_NAME_LIST})',
+    re.IGNORECASE
+)
+_TRUNCATE = re.compile(rf'^TRUNCATE\s+(?:TABLE\s+)?(?:ONLY\s+)?({_NAME_LIST})', re.IGNORECASE)
+_ON_TABLE = re.compile(rf'\bON\s+(?:ONLY\s+)?({_QUALIFIED})', re.IGNORECASE)
+_RENAME_TO = re.compile(rf'\bRENAME\s+TO\s+({_IDENT})', re.IGNORECASE)
+_NO_METADATA = re.compile(r'^(?:COMMENT|GRANT|REVOKE)\b', re.IGNORECASE)
+_DDL_KEYWORD = re.compile(r'^(?:CREATE|ALTER|DROP)\b', re.IGNORECASE)
+_COMMENTS = re.compile(r'--[^\n]*|/\*.*?\*/', re.DOTALL)
+
+
+def _identifier(text):
+    text = text.strip()
+    if text.startswith('"'):
+        return text[1:-1].replace('""', '"')
+    return text.lower()
+
+
+def _split_qualified(text, default_schema):
+    parts = [_identifier(p) for p in re.findall(_IDENT, text)]
+    if len(parts) == 1:
+        return default_schema, parts[0]
+    return parts[-2], parts[-1]
+
+
+def ddl_targets(query, default_schema="public"):
+    """
+    Objetos cuyo metadato cambia al ejecutar query.
+
+    Returns:
+        list: pares (esquema, nombre); nombre None equivale a todo el esquema.
+        None si hay DDL que no se sabe acotar (hay que invalidarlo todo).
+    """
+    targets = []
+    for statement in _COMMENTS.sub(" ", query).split(";"):
+        statement = statement.strip()
+        if not statement or _NO_METADATA.match(statement):
+            continue
+
+        match = _SCHEMA_DDL.match(statement)
+        if match:
+            for name in re.findall(_QUALIFIED, match.group(1)):
+                targets.append((_identifier(name), None))
+            continue
+
+        match = _TRUNCATE.match(statement)
+        if match:
+            for name in re.findall(_QUALIFIED, match.group(1)):
+                targets.append(_split_qualified(name, default_schema))
+            continue
+
+        match = _OBJECT_DDL.match(statement)
+        if match:
+            action, kind, names, rest = match.groups()
+            names = re.findall(_QUALIFIED, names or "")
+            if action.upper() == "DROP" and re.search(r'\bCASCADE\b', rest, re.IGNORECASE):
+                # Lo dependiente (vistas, índices...) también desaparece.
+                targets.extend((_split_qualified(n, default_schema)[0], None) for n in names)
+                continue
+            for name in names:
+                schema, object_name = _split_qualified(name, default_schema)
+                targets.append((schema, object_name))
+                renamed = _RENAME_TO.search(rest)
+                if renamed:
+                    targets.append((schema, _identifier(renamed.group(1))))
+            on_table = kind.upper() in ("INDEX", "TRIGGER") and _ON_TABLE.search(rest)
+            if on_table:
+                targets.append(_split_qualified(on_table.group(1), default_schema))
+            continue
+
+        if _DDL_KEYWORD.match(statement):
+            return None
+    return targets
+
+
+class MetadataCache:
+    """
+    Caché de metadatos de una conexión (columnas, claves, DDL...).
+
+    Las entradas se indexan por (esquema, tipo, nombre), caducan a los
+    ttl segundos y, superadas max_entries, se expulsan las menos usadas.
+    """
+
+    def __init__(self, ttl=300, max_entries=512):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0, "invalidated": 0}
+
+    def get(self, schema, kind, name, default=None):
+        key = (schema, kind, name)
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self._stats["misses"] += 1
+                return default
+            stored_at, value = entry
+            if self.ttl and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return default
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def put(self, schema, kind, name, value):
+        key = (schema, kind, name)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evicted"] += 1
+
+    def get_or_load(self, schema, kind, name, loader):
+        """
+        Devuelve el valor cacheado o llama a loader(), que sigue la
+        convención (éxito, resultado); sólo se cachean los éxitos.
+        """
+        value = self.get(schema, kind, name, _MISSING)
+        if value is not _MISSING:
+            return True, value
+        success, result = loader()
+        if success:
+            self.put(schema, kind, name, result)
+        return success, result
+
+    def invalidate(self, schema=None, kind=None, name=None):
+        """Elimina las entradas que coinciden; un filtro None coincide con todo."""
+        with self._lock:
+            keys = [
+                key for key in self._entries
+                if (schema is None or key[0] == schema)
+                and (kind is None or key[1] == kind)
+                and (name is None or key[2] == name)
+            ]
+            for key in keys:
+                del self._entries[key]
+            self._stats["invalidated"] += len(keys)
+
+    def clear(self):
+        self.invalidate()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({"size": len(self._entries), "max_entries": self.max_entries, "ttl": self.ttl})
+            return stats
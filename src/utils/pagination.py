@@ -0,0 +1,143 @@
+import threading
+from psycopg2 import sql
+
+
+KEY_PREFIX = "__dbadmin_key_"
+
+
+class TablePaginator:
+    """
+    Navegación por páginas de una tabla.
+
+    Si la tabla tiene clave primaria (o un índice único sin nulos) pagina por
+    keyset: WHERE (clave) > (última clave) ORDER BY clave LIMIT n, de modo
+    que cualquier página cuesta lo mismo que la primera. Sin clave (vistas,
+    tablas sin PK) recurre a LIMIT/OFFSET.
+
+    Los métodos que consultan la BD están pensados para llamarse desde un
+    worker del executor.
+    """
+
+    def __init__(self, db, schema_name, table_name, key_columns=None, page_size=100):
+        self.db = db
+        self.schema_name = schema_name
+        self.table_name = table_name
+        self.key_columns = list(key_columns or [])
+        self.page_size = page_size
+        self.page_number = 0
+        self.rows = []
+        self.has_next = False
+        self.has_prev = False
+        self._first_key = None
+        self._last_key = None
+        self._prefetched = None
+        self._lock = threading.Lock()
+
+    @property
+    def mode(self):
+        return "keyset" if self.key_columns else "offset"
+
+    @property
+    def first_row_number(self):
+        return (self.page_number - 1) * self.page_size + 1
+
+    def first_page(self):
+        rows = self._fetch(None, forward=True)
+        return self._set_page(rows, 1, forward=True)
+
+    def next_page(self):
+        if not self.has_next:
+            return self.rows
+        with self._lock:
+            prefetched = self._prefetched
+        if prefetched and prefetched[0] == self._boundary(forward=True):
+            rows = prefetched[1]
+        else:
+            rows = self._fetch(self._boundary(forward=True), forward=True)
+        return self._set_page(rows, self.page_number + 1, forward=True)
+
+    def prev_page(self):
+        if not self.has_prev:
+            return self.rows
+        rows = self._fetch(self._boundary(forward=False), forward=False)
+        return self._set_page(rows, self.page_number - 1, forward=False)
+
+    def prefetch_next(self):
+        """Trae por adelantado la página siguiente para que "Siguiente" sea inmediato."""
+        if not self.has_next:
+            return
+        boundary = self._boundary(forward=True)
+        rows = self._fetch(boundary, forward=True)
+        with self._lock:
+            self._prefetched = (boundary, rows)
+
+    def _boundary(self, forward):
+        if self.key_columns:
+            return self._last_key if forward else self._first_key
+        if forward:
+            return self.page_number * self.page_size
+        return (self.page_number - 2) * self.page_size
+
+    def _set_page(self, rows, page_number, forward):
+        extra = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if not forward and self.key_columns:
+            # Hacia atrás el keyset lee en orden descendente; OFFSET ya viene ascendente.
+            rows.reverse()
+
+        self.page_number = page_number
+        if forward:
+            self.has_next = extra
+            self.has_prev = page_number > 1
+        else:
+            self.has_next = True
+            self.has_prev = extra if self.key_columns else page_number > 1
+
+        if rows and self.key_columns:
+            self._first_key = self._key_of(rows[0])
+            self._last_key = self._key_of(rows[-1])
+        self.rows = [self._strip_key(row) for row in rows]
+        return self.rows
+
+    def _key_of(self, row):
+        return tuple(row[f"{KEY_PREFIX}{i}"] for i in range(len(self.key_columns)))
+
+    @staticmethod
+    def _strip_key(row):
+        return {k: v for k, v in row.items() if not k.startswith(KEY_PREFIX)}
+
+    def _fetch(self, boundary, forward):
+        table = sql.SQL("{}.{}").format(sql.Identifier(self.schema_name), sql.Identifier(self.table_name))
+        limit = self.page_size + 1
+
+        if not self.key_columns:
+            query = sql.SQL("SELECT * FROM {} LIMIT %s OFFSET %s").format(table)
+            params = [limit, max(0, boundary or 0)]
+        else:
+            key_list = sql.SQL(", ").join(sql.Identifier(col) for col in self.key_columns)
+            key_select = sql.SQL(", ").join(
+                sql.SQL("t.{} AS {}").format(sql.Identifier(col), sql.Identifier(f"{KEY_PREFIX}{i}"))
+                for i, col in enumerate(self.key_columns)
+            )
+            direction = sql.SQL("ASC" if forward else "DESC")
+            order = sql.SQL(", ").join(
+                sql.SQL("{} {}").format(sql.Identifier(col), direction) for col in self.key_columns
+            )
+            where = sql.SQL("")
+            params = []
+            if boundary is not None:
+                where = sql.SQL("WHERE ({}) {} ({})").format(
+                    key_list,
+                    sql.SQL(">" if forward else "<"),
+                    sql.SQL(", ").join(sql.Placeholder() for _ in self.key_columns)
+                )
+                params = list(boundary)
+            query = sql.SQL("SELECT {}, t.* FROM {} AS t {} ORDER BY {} LIMIT %s").format(
+                key_select, table, where, order
+            )
+            params.append(limit)
+
+        success, result = self.db.execute_query_dict(query, params)
+        if not success:
+            raise Exception(result)
+        return list(result)
@@ -0,0 +1,155 @@
+"""
+Instrumentación ligera con spans de tiempo.
+
+Cada span anota nombre, categoría, duración y unos pocos atributos en un
+buffer circular en memoria. Las categorías separan de dónde sale el
+tiempo de una acción:
+
+    connect  establecer conexiones
+    server   cursor.execute (envío, ejecución en el servidor y, con
+             cursores de cliente, la recepción del resultado)
+    fetch    fetchall/fetchmany (lectura y conversión de las filas)
+    render   volcado de resultados a los widgets de Tk
+    ui       acciones de la interfaz completas
+"""
+import functools
+import json
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+CONNECT = "connect"
+SERVER = "server"
+FETCH = "fetch"
+RENDER = "render"
+UI = "ui"
+
+CATEGORIES = (CONNECT, SERVER, FETCH, RENDER, UI)
+
+
+class Span:
+
+    __slots__ = ("name", "category", "started_at", "seconds", "thread", "attrs")
+
+    def __init__(self, name, category, started_at, seconds, thread, attrs):
+        self.name = name
+        self.category = category
+        self.started_at = started_at
+        self.seconds = seconds
+        self.thread = thread
+        self.attrs = attrs
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "category": self.category,
+            "started_at": self.started_at,
+            "ms": round(self.seconds * 1000, 3),
+            "thread": self.thread,
+            "attrs": self.attrs,
+        }
+
+
+class PerfRecorder:
+
+    def __init__(self, max_spans=5000):
+        self.enabled = True
+        self._spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, category=UI, **attrs):
+        """
+        with perf.span("tree.add_connection", UI, connection=name) as attrs:
+            ...
+            attrs["rows"] = n   # se pueden añadir atributos durante el span
+        """
+        if not self.enabled:
+            yield attrs
+            return
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            yield attrs
+        finally:
+            self.add(name, category, time.perf_counter() - start, started_at=started_at, **attrs)
+
+    def add(self, name, category, seconds, started_at=None, **attrs):
+        if not self.enabled:
+            return
+        span = Span(
+            name,
+            category,
+            started_at if started_at is not None else time.time() - seconds,
+            seconds,
+            threading.current_thread().name,
+            attrs
+        )
+        with self._lock:
+            self._spans.append(span)
+
+    def recent(self, limit=None):
+        """Spans más recientes primero."""
+        with self._lock:
+            spans = list(self._spans)
+        spans.reverse()
+        return spans[:limit] if limit else spans
+
+    def breakdown(self, spans=None):
+        """
+        Returns:
+            dict: por categoría, número de spans, total, media y p95 en ms.
+        """
+        spans = self.recent() if spans is None else spans
+        grouped = {}
+        for span in spans:
+            grouped.setdefault(span.category, []).append(span.seconds)
+        result = {}
+        for category, values in grouped.items():
+            values.sort()
+            total = sum(values)
+            result[category] = {
+                "count": len(values),
+                "total_ms": total * 1000,
+                "mean_ms": total * 1000 / len(values),
+                "p95_ms": values[max(math.ceil(len(values) * 0.95) - 1, 0)] * 1000,
+            }
+        return result
+
+    def to_json(self):
+        spans = self.recent()
+        return json.dumps(
+            {
+                "generated_at": time.time(),
+                "breakdown": self.breakdown(spans),
+                "spans": [span.to_dict() for span in spans],
+            },
+            indent=2,
+            ensure_ascii=False,
+            default=str
+        )
+
+    def dump_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+
+perf = PerfRecorder()
+
+
+def timed(name, category=UI):
+    """Decorador: registra cada llamada a la función como un span."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with perf.span(name, category):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
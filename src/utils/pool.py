@@ -0,0 +1,168 @@
+import threading
+import time
+from contextlib import contextmanager
+from psycopg2 import extensions
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    Pool acotado de conexiones psycopg2 para una conexión guardada.
+
+    Mantiene al menos min_size conexiones abiertas y nunca más de max_size.
+    Un checkout espera hasta checkout_timeout segundos a que se libere una
+    conexión; las conexiones ociosas más de idle_timeout segundos se cierran
+    (respetando min_size) cada vez que se pide o devuelve una conexión.
+    """
+
+    def __init__(self, connect, min_size=1, max_size=4, idle_timeout=300, checkout_timeout=30):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError("Tamaño de pool inválido")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+
+        self._idle = []
+        self._in_use = set()
+        self._opening = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {
+            "created": 0,
+            "closed": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "evicted": 0,
+        }
+
+        for _ in range(min_size):
+            conn = self._open()
+            self._idle.append((conn, time.monotonic()))
+
+    def _open(self):
+        conn = self._connect()
+        with self._cond:
+            self._stats["created"] += 1
+        return conn
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self._stats["closed"] += 1
+
+    def getconn(self, timeout=None):
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeout("El pool está cerrado")
+                self._evict_idle()
+
+                while self._idle:
+                    conn, _ = self._idle.pop()
+                    if conn.closed:
+                        self._stats["closed"] += 1
+                        continue
+                    self._in_use.add(conn)
+                    self._stats["checkouts"] += 1
+                    return conn
+
+                if len(self._in_use) + self._opening < self.max_size:
+                    self._opening += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"No hay conexiones libres tras {timeout} s "
+                        f"({len(self._in_use)}/{self.max_size} en uso)"
+                    )
+                self._stats["waits"] += 1
+                self._cond.wait(remaining)
+
+        try:
+            conn = self._open()
+        except Exception:
+            with self._cond:
+                self._opening -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._opening -= 1
+            self._in_use.add(conn)
+            self._stats["checkouts"] += 1
+        return conn
+
+    def putconn(self, conn):
+        """Devuelve una conexión, deshaciendo cualquier transacción abierta."""
+        if not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                conn.close()
+
+        with self._cond:
+            self._in_use.discard(conn)
+            if conn.closed or self._closed:
+                self._discard(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._evict_idle()
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def _evict_idle(self):
+        if not self.idle_timeout:
+            return
+        now = time.monotonic()
+        keep = []
+        total = len(self._idle) + len(self._in_use)
+        # Los más antiguos están al principio de la lista.
+        for conn, since in self._idle:
+            if now - since > self.idle_timeout and total > self.min_size:
+                self._discard(conn)
+                self._stats["evicted"] += 1
+                total -= 1
+            else:
+                keep.append((conn, since))
+        self._idle = keep
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "size": len(self._idle) + len(self._in_use),
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+            })
+            return stats
+
+    def close_all(self):
+        with self._cond:
+            self._closed = True
+            for conn, _ in self._idle:
+                self._discard(conn)
+            self._idle = []
+            self._cond.notify_all()
@@ -0,0 +1,262 @@
+"""
+Historial persistente de consultas en SQLite.
+
+Cada sentencia que pasa por DatabaseConnection.execute_query(_dict) o
+open_stream (al terminar de leerla) se anota con su conexión, duración,
+filas y estado; las consultas internas de catálogo no. Las sentencias se
+agrupan por huella (SQL normalizado sin literales), de modo que
+"WHERE id = 1" y "WHERE id = 2" cuentan como la misma consulta y se
+pueden comparar sus latencias p50/p95/máx a lo largo del tiempo.
+
+La escritura la hace un hilo propio por lotes: registrar una ejecución
+sólo encola una tupla y no añade E/S de disco al worker que consulta.
+"""
+import hashlib
+import math
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from src.utils.result_cache import normalize_sql
+
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+STATUS_CANCELLED = "cancelled"
+STATUS_TIMEOUT = "timeout"
+
+_LITERALS = re.compile(
+    r"""'(?:[^']|'')*'|"(?:[^"]|"")*"|\$\d+|\b\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b|%\(\w+\)s|%s"""
+)
+_VALUE_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS query_history (
+        id INTEGER PRIMARY KEY,
+        executed_at REAL NOT NULL,
+        connection TEXT NOT NULL,
+        fingerprint TEXT NOT NULL,
+        fingerprint_sql TEXT NOT NULL,
+        sql TEXT NOT NULL,
+        seconds REAL NOT NULL,
+        rows INTEGER,
+        status TEXT NOT NULL,
+        error TEXT
+    );
+    CREATE INDEX IF NOT EXISTS query_history_fingerprint ON query_history (fingerprint, seconds);
+    CREATE INDEX IF NOT EXISTS query_history_executed_at ON query_history (executed_at);
+"""
+
+
+def fingerprint_sql(query):
+    """SQL normalizado con literales y parámetros sustituidos por '?'."""
+    def replace(match):
+        token = match.group()
+        # Los identificadores entre comillas dobles sí forman parte de la consulta.
+        return token if token.startswith('"') else "?"
+
+    text = _LITERALS.sub(replace, normalize_sql(query))
+    text = _VALUE_LISTS.sub("(?...)", text)
+    return text
+
+
+def fingerprint(query):
+    """Devuelve (huella, texto de la huella)."""
+    text = fingerprint_sql(query)
+    digest = hashlib.sha1(text.lower().encode("utf-8")).hexdigest()[:16]
+    return digest, text
+
+
+def _percentile(values, fraction):
+    """Percentil por el método del rango más cercano; values debe estar ordenada."""
+    if not values:
+        return None
+    index = max(math.ceil(fraction * len(values)) - 1, 0)
+    return values[index]
+
+
+class QueryHistory:
+
+    FLUSH_INTERVAL = 1.0
+    MAX_SQL_LENGTH = 10000
+
+    def __init__(self, path, max_entries=200000):
+        self.path = path
+        self.max_entries = max_entries
+        self.enabled = True
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._writer = None
+        self._written = 0
+
+    def _connection(self):
+        """Abre (y crea) la base de datos en el primer uso, no al importar."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def record(self, connection, query, seconds, rows=None, status=STATUS_OK, error=None):
+        if not self.enabled or not isinstance(query, str):
+            return
+        self._queue.put((time.time(), connection, query, seconds, rows, status, error))
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="query-history", daemon=True)
+                    self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.FLUSH_INTERVAL
+            while time.monotonic() < deadline:
+                try:
+                    batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except sqlite3.Error:
+                pass
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch):
+        rows = []
+        for executed_at, connection, query, seconds, count, status, error in batch:
+            digest, text = fingerprint(query)
+            rows.append((
+                executed_at, connection, digest, text[:self.MAX_SQL_LENGTH],
+                query[:self.MAX_SQL_LENGTH], seconds, count, status, error
+            ))
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT INTO query_history (executed_at, connection, fingerprint, fingerprint_sql, "
+                "sql, seconds, rows, status, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._written += len(rows)
+            if self._written >= 1000:
+                self._written = 0
+                conn.execute(
+                    "DELETE FROM query_history WHERE id <= (SELECT MAX(id) FROM query_history) - ?",
+                    (self.max_entries,)
+                )
+            conn.commit()
+
+    def flush(self):
+        """
+        Escribe lo pendiente de inmediato (antes de consultar el historial)
+        y espera al lote que el hilo escritor tenga ya en curso.
+        """
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            if batch:
+                self._write(batch)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+        self._queue.join()
+
+    def stats(self, connection=None, since=None, limit=500):
+        """
+        Latencias por huella, de la más costosa (recuento x p50) a la menos.
+
+        Returns:
+            list[dict]: huella, sql, count, errors, p50, p95, max y last_run.
+        """
+        self.flush()
+        where, params = self._filters(connection, since)
+        with self._lock:
+            conn = self._connection()
+            rows = conn.execute(
+                f"SELECT fingerprint, seconds, status, executed_at, fingerprint_sql "
+                f"FROM query_history {where} ORDER BY fingerprint, seconds",
+                params
+            ).fetchall()
+
+        groups = {}
+        for digest, seconds, status, executed_at, text in rows:
+            group = groups.setdefault(digest, {
+                "fingerprint": digest, "sql": text, "count": 0, "errors": 0,
+                "last_run": executed_at, "_seconds": []
+            })
+            group["count"] += 1
+            group["last_run"] = max(group["last_run"], executed_at)
+            if status == STATUS_OK:
+                group["_seconds"].append(seconds)
+            else:
+                group["errors"] += 1
+
+        result = []
+        for group in groups.values():
+            seconds = group.pop("_seconds")
+            group["p50"] = _percentile(seconds, 0.5)
+            group["p95"] = _percentile(seconds, 0.95)
+            group["max"] = seconds[-1] if seconds else None
+            result.append(group)
+        result.sort(key=lambda g: g["count"] * (g["p50"] or 0), reverse=True)
+        return result[:limit]
+
+    def recent(self, fingerprint=None, connection=None, limit=200):
+        """Últimas ejecuciones, opcionalmente de una huella concreta."""
+        self.flush()
+        where, params = self._filters(connection, None)
+        if fingerprint:
+            where += " AND fingerprint = ?" if where else "WHERE fingerprint = ?"
+            params.append(fingerprint)
+        params.append(limit)
+        with self._lock:
+            cursor = self._connection().execute(
+                f"SELECT executed_at, connection, sql, seconds, rows, status, error "
+                f"FROM query_history {where} ORDER BY id DESC LIMIT ?",
+                params
+            )
+            columns = [col[0] for col in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def connections(self):
+        self.flush()
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT DISTINCT connection FROM query_history ORDER BY connection"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def clear(self):
+        self.flush()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM query_history")
+            conn.commit()
+
+    @staticmethod
+    def _filters(connection, since):
+        clauses, params = [], []
+        if connection:
+            clauses.append("connection = ?")
+            params.append(connection)
+        if since:
+            clauses.append("executed_at >= ?")
+            params.append(since)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def _default_path():
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return os.environ.get("DBADMIN_HISTORY_PATH") or os.path.join(project_root, "query_history.sqlite3")
+
+
+query_history = QueryHistory(_default_path())
+query_history.enabled = os.environ.get("DBADMIN_HISTORY", "1") != "0"
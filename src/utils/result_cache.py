@@ -0,0 +1,149 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+VOLATILE_PATTERN = re.compile(
+    r'\b(?:now|random|clock_timestamp|statement_timestamp|transaction_timestamp|timeofday'
+    r'|nextval|currval|setval|lastval|gen_random_uuid|uuid_generate_v\d\w*|txid_current\w*'
+    r'|pg_sleep\w*|pg_backend_pid|pg_cancel_backend|pg_terminate_backend|unique_rowid'
+    r'|current_timestamp|current_date|current_time|localtime|localtimestamp)\b'
+    r'|\bFOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE)\b'
+    r'|\b(?:INSERT|UPDATE|DELETE|MERGE|UPSERT)\b'
+    r'|\bINTO\b',
+    re.IGNORECASE
+)
+_TOKENS = re.compile(r"""'(?:[^']|'')*'|"(?:[^"]|"")*"|--[^\n]*|/\*.*?\*/|\s+|[^'"\s/-]+|.""", re.DOTALL)
+
+
+def normalize_sql(query):
+    """Colapsa espacios y quita comentarios fuera de literales, y el ';' final."""
+    parts = []
+    for token in _TOKENS.findall(query):
+        if token.startswith("--") or token.startswith("/*") or token.isspace():
+            if parts and parts[-1] != " ":
+                parts.append(" ")
+            continue
+        parts.append(token)
+    return "".join(parts).strip().rstrip(";").strip()
+
+
+def is_cacheable(query):
+    """Sólo lecturas deterministas: SELECT/WITH sin funciones volátiles, DML ni bloqueos."""
+    normalized = normalize_sql(query)
+    literals_removed = re.sub(r"'(?:[^']|'')*'", "''", normalized)
+    if not re.match(r'(?:SELECT|WITH|VALUES|TABLE)\b', literals_removed, re.IGNORECASE):
+        return False
+    if ";" in literals_removed:
+        return False
+    return not VOLATILE_PATTERN.search(literals_removed)
+
+
+def is_read_only(query):
+    """Lecturas (SELECT, SHOW, EXPLAIN sin ANALYZE...) que no cambian datos."""
+    literals_removed = re.sub(r"'(?:[^']|'')*'", "''", normalize_sql(query))
+    if not re.match(r'(?:SELECT|WITH|VALUES|TABLE|SHOW|EXPLAIN)\b', literals_removed, re.IGNORECASE):
+        return False
+    if ";" in literals_removed or re.search(r'\bANALY[SZ]E\b', literals_removed, re.IGNORECASE):
+        return False
+    return not re.search(r'\b(?:INSERT|UPDATE|DELETE|MERGE|UPSERT|INTO)\b', literals_removed, re.IGNORECASE)
+
+
+def _estimate_size(columns, rows):
+    size = sys.getsizeof(rows) + sum(sys.getsizeof(col) for col in columns)
+    for row in rows:
+        size += sys.getsizeof(row)
+        for value in row:
+            size += sys.getsizeof(value)
+    return size
+
+
+class CachedResult:
+
+    def __init__(self, columns, rows, size):
+        self.columns = columns
+        self.rows = rows
+        self.size = size
+        self.stored_at = time.monotonic()
+
+    @property
+    def age(self):
+        return time.monotonic() - self.stored_at
+
+
+class ResultCache:
+    """
+    Caché opcional de resultados del editor SQL.
+
+    Se indexa por conexión, SQL normalizado y parámetros. Las entradas se
+    expulsan por LRU cuando el tamaño estimado supera max_bytes; un
+    resultado mayor que el presupuesto completo no se guarda.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.enabled = False
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evicted": 0, "rejected": 0}
+
+    @staticmethod
+    def key(db, query, params=None):
+        connection = (db.host, db.port, db.dbname, db.user)
+        if isinstance(params, dict):
+            params = tuple(sorted(params.items()))
+        elif params is not None:
+            params = tuple(params)
+        return connection, normalize_sql(query), params
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry
+
+    def put(self, key, columns, rows):
+        size = _estimate_size(columns, rows)
+        with self._lock:
+            if size > self.max_bytes:
+                self._stats["rejected"] += 1
+                return None
+            old = self._entries.pop(key, None)
+            if old:
+                self._bytes -= old.size
+            entry = CachedResult(list(columns), rows, size)
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._stats["evicted"] += 1
+            return entry
+
+    def invalidate(self, db=None):
+        """Descarta los resultados de una conexión (o todos)."""
+        with self._lock:
+            if db is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            connection = (db.host, db.port, db.dbname, db.user)
+            for key in [k for k in self._entries if k[0] == connection]:
+                self._bytes -= self._entries.pop(key).size
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes})
+            return stats
+
+
+result_cache = ResultCache(int(os.environ.get("DBADMIN_RESULT_CACHE_MB", "64")) * 1024 * 1024)
@@ -0,0 +1,107 @@
+import threading
+from psycopg2 import sql
+from src.utils.executor import executor, current_task
+
+
+class RowCountProvider:
+    """
+    Número de filas por tabla para una conexión.
+
+    Por defecto usa las estimaciones de las estadísticas del motor, que se
+    muestran como "~N". El conteo exacto es una acción explícita que corre
+    en segundo plano, se puede cancelar y queda cacheado por tabla.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._estimates = {}
+        self._loaded_schemas = set()
+        self._exact = {}
+        self._running = {}
+        self._lock = threading.Lock()
+
+    def load_estimates(self, schema_name):
+        success, estimates = self.db.get_row_estimates(schema_name)
+        if not success:
+            print(f"Error obteniendo estimaciones de filas: {estimates}")
+            return
+        with self._lock:
+            self._estimates.update(estimates)
+            self._loaded_schemas.add(schema_name)
+
+    def ensure_estimates(self, schema_name):
+        if schema_name not in self._loaded_schemas:
+            self.load_estimates(schema_name)
+
+    def label(self, schema_name, table_name):
+        """Texto a mostrar: "N" si hay conteo exacto, "~N" si es estimado."""
+        key = (schema_name, table_name)
+        if key in self._exact:
+            return str(self._exact[key])
+        estimate = self._estimates.get(key)
+        if estimate is None:
+            return None
+        return f"~{estimate}"
+
+    def get_exact(self, schema_name, table_name):
+        return self._exact.get((schema_name, table_name))
+
+    def count_exact(self, schema_name, table_name, on_success=None, on_error=None):
+        """
+        Lanza un COUNT(*) en segundo plano sobre una conexión propia, para
+        poder cancelarlo sin afectar al resto de operaciones.
+        """
+        key = (schema_name, table_name)
+        task = self._running.get(key)
+        if task and not task.done:
+            return task
+        task = executor.submit(
+            self._count_exact,
+            schema_name,
+            table_name,
+            on_success=on_success,
+            on_error=on_error,
+            description=f"Contando filas de {schema_name}.{table_name}"
+        )
+        self._running[key] = task
+        return task
+
+    def _count_exact(self, schema_name, table_name):
+        task = current_task()
+        conn = self.db.open_raw_connection()
+        task.on_cancel(conn.cancel)
+        try:
+            task.check_cancelled()
+            query = sql.SQL("SELECT COUNT(*) FROM {}.{}").format(
+                sql.Identifier(schema_name),
+                sql.Identifier(table_name)
+            )
+            cursor = conn.cursor()
+            cursor.execute(query)
+            count = cursor.fetchone()[0]
+            cursor.close()
+        finally:
+            task.remove_cancel_hook(conn.cancel)
+            conn.close()
+
+        with self._lock:
+            self._exact[(schema_name, table_name)] = count
+        return count
+
+    def reset_estimates(self):
+        with self._lock:
+            self._estimates.clear()
+            self._loaded_schemas.clear()
+
+    def invalidate(self, schema_name=None, table_name=None):
+        with self._lock:
+            if schema_name is None:
+                self._estimates.clear()
+                self._loaded_schemas.clear()
+                self._exact.clear()
+                return
+            if table_name is None:
+                self._loaded_schemas.discard(schema_name)
+            for cache in (self._estimates, self._exact):
+                for key in [k for k in cache if k[0] == schema_name and table_name in (None, k[1])]:
+                    del cache[key]
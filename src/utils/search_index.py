@@ -0,0 +1,265 @@
+"""
+Índice en memoria de los nombres del catálogo para buscar en el navegador.
+
+Cada objeto es una tupla Entry (conexión, esquema, tipo, nombre, tabla)
+—tabla sólo para columnas—. Los nombres se indexan una vez por nombre
+distinto en minúsculas (miles de columnas "id" comparten entrada):
+
+    trie        prefijos del nombre y de cada palabra ("lin" -> "order_lines"),
+                recorrido por niveles para dar antes los nombres cortos
+    trigramas   subcadenas de 3 o más caracteres (intersección + comprobación)
+    caracteres  candidatos para la búsqueda difusa (subsecuencia, "ordln" ->
+                "order_lines")
+
+update_schema() sustituye el contenido de un esquema comparándolo con el
+que había, de modo que un refresco sólo toca lo que cambió.
+"""
+import re
+import threading
+from collections import deque, namedtuple
+from src.utils.perf import perf, UI
+
+
+Entry = namedtuple("Entry", "connection schema kind name table")
+
+KINDS = ("table", "column", "view", "index", "function")
+
+# Puntuación: menor es mejor.
+EXACT, PREFIX, WORD_PREFIX, SUBSTRING, FUZZY = range(5)
+
+_END = "\0"
+_SEPARATORS = "_.- "
+_KIND_ORDER = {kind: i for i, kind in enumerate(KINDS)}
+
+
+def catalog_entries(connection, schema, catalog):
+    """Entradas de un catálogo de esquema (formato de get_catalog_snapshot)."""
+    entries = set()
+    for table, columns in catalog.get("tables", {}).items():
+        entries.add(Entry(connection, schema, "table", table, None))
+        for column in columns:
+            entries.add(Entry(connection, schema, "column", column["column_name"], table))
+    for kind, key in (("view", "views"), ("index", "indexes"), ("function", "functions")):
+        for name in catalog.get(key, ()):
+            entries.add(Entry(connection, schema, kind, name, None))
+    return entries
+
+
+def _word_keys(name):
+    """El nombre y lo que queda desde el inicio de cada palabra."""
+    keys = {name}
+    for i, char in enumerate(name[:-1]):
+        if char in _SEPARATORS and name[i + 1] not in _SEPARATORS:
+            keys.add(name[i + 1:])
+    return keys
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+
+    def __init__(self):
+        self._scopes = {}      # (conexión, esquema) -> set de Entry
+        self._catalogs = {}    # (conexión, esquema) -> último catálogo indexado
+        self._names = {}       # nombre en minúsculas -> set de Entry
+        self._trie = {}        # ... nodo[_END] -> set de nombres
+        self._trigrams = {}    # trigrama -> set de nombres
+        self._chars = {}       # carácter -> set de nombres
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._scopes.values())
+
+    @property
+    def name_count(self):
+        return len(self._names)
+
+    def schemas(self, connection=None):
+        """Esquemas indexados: lista de (conexión, esquema)."""
+        with self._lock:
+            return [scope for scope in self._scopes if connection is None or scope[0] == connection]
+
+    # --- actualización ---------------------------------------------------
+
+    def update_schema(self, connection, schema, catalog):
+        """
+        Sustituye lo indexado de connection.schema por catalog.
+
+        Returns:
+            tuple: (entradas añadidas, entradas eliminadas)
+        """
+        scope = (connection, schema)
+        if scope in self._scopes and self._catalogs.get(scope) == catalog:
+            return 0, 0
+        entries = catalog_entries(connection, schema, catalog)
+        with self._lock:
+            previous = self._scopes.get(scope, set())
+            added = entries - previous
+            removed = previous - entries
+            for entry in removed:
+                self._remove(entry)
+            for entry in added:
+                self._add(entry)
+            self._scopes[scope] = entries
+            self._catalogs[scope] = catalog
+        return len(added), len(removed)
+
+    def remove_schema(self, connection, schema):
+        with self._lock:
+            self._catalogs.pop((connection, schema), None)
+            for entry in self._scopes.pop((connection, schema), ()):
+                self._remove(entry)
+
+    def remove_connection(self, connection):
+        with self._lock:
+            for scope in [scope for scope in self._scopes if scope[0] == connection]:
+                self._catalogs.pop(scope, None)
+                for entry in self._scopes.pop(scope):
+                    self._remove(entry)
+
+    def clear(self):
+        with self._lock:
+            self._scopes.clear()
+            self._catalogs.clear()
+            self._names.clear()
+            self._trie.clear()
+            self._trigrams.clear()
+            self._chars.clear()
+
+    def _add(self, entry):
+        name = entry.name.lower()
+        holders = self._names.get(name)
+        if holders is not None:
+            holders.add(entry)
+            return
+        self._names[name] = {entry}
+        for key in _word_keys(name):
+            node = self._trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node.setdefault(_END, set()).add(name)
+        for trigram in _trigrams(name):
+            self._trigrams.setdefault(trigram, set()).add(name)
+        for char in set(name):
+            self._chars.setdefault(char, set()).add(name)
+
+    def _remove(self, entry):
+        name = entry.name.lower()
+        holders = self._names.get(name)
+        if holders is None:
+            return
+        holders.discard(entry)
+        if holders:
+            return
+        del self._names[name]
+        for key in _word_keys(name):
+            path = [self._trie]
+            for char in key:
+                path.append(path[-1][char])
+            names = path[-1][_END]
+            names.discard(name)
+            if names:
+                continue
+            del path[-1][_END]
+            for depth in range(len(key), 0, -1):
+                if path[depth]:
+                    break
+                del path[depth - 1][key[depth - 1]]
+        for trigram in _trigrams(name):
+            names = self._trigrams[trigram]
+            names.discard(name)
+            if not names:
+                del self._trigrams[trigram]
+        for char in set(name):
+            names = self._chars[char]
+            names.discard(name)
+            if not names:
+                del self._chars[char]
+
+    # --- búsqueda --------------------------------------------------------
+
+    def search(self, query, limit=200):
+        """
+        Objetos cuyo nombre (o una de sus palabras) empieza por query, lo
+        contiene o, si faltan resultados, contiene en orden sus caracteres.
+        No distingue mayúsculas.
+
+        Returns:
+            list: (Entry, puntuación) ordenados por puntuación, longitud
+            del nombre y tipo; como mucho limit
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+        with perf.span("search.query", UI, query=query) as attrs, self._lock:
+            scored = {}
+            for name in self._prefix_names(query, limit):
+                if name == query:
+                    scored[name] = EXACT
+                else:
+                    scored[name] = PREFIX if name.startswith(query) else WORD_PREFIX
+            if len(scored) < limit and len(query) >= 3:
+                for name in self._substring_names(query):
+                    scored.setdefault(name, SUBSTRING)
+                if len(scored) < limit:
+                    for name in self._fuzzy_names(query, limit - len(scored), scored):
+                        scored[name] = FUZZY
+
+            # Un nombre puede estar en miles de sitios ("id"): se ordenan los
+            # nombres y sólo se expanden las entradas hasta llegar a limit.
+            results = []
+            for name in sorted(scored, key=lambda name: (scored[name], len(name), name)):
+                entries = sorted(self._names[name], key=lambda entry: (
+                    _KIND_ORDER[entry.kind], entry.connection, entry.schema, entry.table or "", entry.name
+                ))
+                results.extend((entry, scored[name]) for entry in entries[:limit - len(results)])
+                if len(results) >= limit:
+                    break
+            attrs["results"] = len(results)
+            return results
+
+    def _prefix_names(self, query, limit):
+        """Nombres con una clave que empieza por query, las más cortas primero."""
+        node = self._trie
+        for char in query:
+            node = node.get(char)
+            if node is None:
+                return []
+        names = {}
+        level = deque([node])
+        while level and len(names) < limit:
+            current = level.popleft()
+            for char, child in current.items():
+                if char == _END:
+                    names.update(dict.fromkeys(child))
+                else:
+                    level.append(child)
+        return list(names)
+
+    def _substring_names(self, query):
+        candidates = None
+        for trigram in sorted(_trigrams(query), key=lambda t: len(self._trigrams.get(t, ()))):
+            names = self._trigrams.get(trigram)
+            if not names:
+                return []
+            candidates = set(names) if candidates is None else candidates & names
+            if len(candidates) < 64:
+                break
+        return [name for name in candidates if query in name]
+
+    def _fuzzy_names(self, query, limit, exclude):
+        candidates = None
+        for char in sorted(set(query), key=lambda c: len(self._chars.get(c, ()))):
+            names = self._chars.get(char)
+            if not names:
+                return []
+            candidates = set(names) if candidates is None else candidates & names
+        pattern = re.compile(".*?".join(re.escape(char) for char in query))
+        matches = [name for name in candidates if name not in exclude and pattern.search(name)]
+        matches.sort(key=len)
+        return matches[:limit]
+
+
+search_index = SearchIndex()
@@ -0,0 +1,376 @@
+"""
+Ejecución de scripts .sql grandes sin cargarlos en memoria.
+
+StatementSplitter recibe el fichero línea a línea y devuelve sentencias
+completas respetando literales, identificadores entre comillas,
+comentarios (anidados) y bloques $tag$...$tag$. También entiende los
+bloques COPY ... FROM stdin de pg_dump, cuyos datos acaban en "\\.".
+"""
+import heapq
+import io
+import os
+import re
+import tempfile
+import time
+from src.utils.executor import current_task, cancel_scope
+from src.utils.connection import timeout_ms
+from src.utils.result_cache import result_cache, is_read_only
+
+
+_NORMAL_TOKEN = re.compile(r"""--|/\*|[Ee]'|'|"|\$(?:[A-Za-z_][A-Za-z0-9_]*)?\$|;""")
+_IDENT_CHAR = re.compile(r"[A-Za-z0-9_$]")
+_SINGLE_END = re.compile(r"(?:[^']|'')*'")
+_ESCAPE_END = re.compile(r"(?:[^'\\]|\\.|'')*'", re.DOTALL)
+_DOUBLE_END = re.compile(r'(?:[^"]|"")*"')
+_COMMENT_TOKEN = re.compile(r"/\*|\*/")
+_COPY_FROM_STDIN = re.compile(r"^\s*COPY\b.*\bFROM\s+STDIN\b", re.IGNORECASE | re.DOTALL)
+_NO_TRANSACTION = re.compile(
+    r"^\s*(?:VACUUM|CREATE\s+DATABASE|DROP\s+DATABASE|ALTER\s+SYSTEM|"
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY|DROP\s+INDEX\s+CONCURRENTLY|REINDEX\b.*\bCONCURRENTLY)",
+    re.IGNORECASE | re.DOTALL
+)
+_BEGIN = re.compile(r"^\s*(?:BEGIN|START\s+TRANSACTION)\b", re.IGNORECASE)
+_COMMIT = re.compile(r"^\s*(?:COMMIT|END)\b", re.IGNORECASE)
+_ROLLBACK = re.compile(r"^\s*ROLLBACK\s*$", re.IGNORECASE)
+
+COPY_SPOOL_SIZE = 8 * 1024 * 1024
+
+
+class ScriptStatement:
+
+    def __init__(self, sql, line, copy_data=None, meta=False):
+        self.sql = sql
+        self.line = line
+        self.copy_data = copy_data
+        self.meta = meta
+
+    @property
+    def preview(self):
+        text = " ".join(self.sql.split())
+        return text if len(text) <= 80 else text[:77] + "..."
+
+
+class StatementSplitter:
+
+    def __init__(self):
+        self.line_number = 0
+        self._parts = []
+        self._has_code = False
+        self._start_line = None
+        self._state = None
+        self._depth = 0
+        self._tag = None
+        self._copy = None
+        self._copy_statement = None
+
+    def feed(self, line):
+        """Procesa una línea (con su salto de línea) y devuelve las sentencias que completa."""
+        self.line_number += 1
+        if self._copy is not None:
+            return self._feed_copy_data(line)
+
+        if self._state is None and not self._has_code and line.startswith("\\"):
+            # Metacomando de psql (\connect, \set...): no es SQL.
+            return [ScriptStatement(line.strip(), self.line_number, meta=True)]
+
+        statements = []
+        pos = 0
+        length = len(line)
+        while pos < length:
+            if self._state is None:
+                match = _NORMAL_TOKEN.search(line, pos)
+                if not match:
+                    self._append(line[pos:], code=True)
+                    break
+                token = match.group()
+                start = match.start()
+                self._append(line[pos:start], code=True)
+                prev = line[start - 1] if start > 0 else ""
+
+                if token == ";":
+                    statement = self._emit()
+                    pos = match.end()
+                    if statement is not None:
+                        statements.append(statement)
+                    continue
+                if token == "--":
+                    self._append(line[start:], code=False)
+                    break
+                if token == "/*":
+                    self._state, self._depth = "/*", 1
+                elif token in ("E'", "e'") and not _IDENT_CHAR.match(prev):
+                    self._state = "E'"
+                elif token in ("E'", "e'"):
+                    # Identificador acabado en "e" seguido de un literal normal.
+                    self._append(token[0], code=True)
+                    self._state = "'"
+                elif token.startswith("$"):
+                    if _IDENT_CHAR.match(prev):
+                        self._append(token[:-1], code=True)
+                        pos = match.end() - 1
+                        continue
+                    self._state, self._tag = "$", token
+                else:
+                    self._state = token
+                self._append(token, code=token != "/*")
+                pos = match.end()
+            else:
+                pos = self._consume_quoted(line, pos)
+
+        if self._copy is not None and statements:
+            # El COPY ... FROM stdin queda pendiente hasta leer sus datos.
+            pending = statements.pop()
+            self._copy_statement = pending
+        return statements
+
+    def finish(self):
+        """Devuelve la última sentencia si el fichero no acaba en ';'."""
+        if self._copy is not None:
+            statement = self._copy_statement
+            self._copy.seek(0)
+            statement.copy_data = self._copy
+            self._copy = None
+            return [statement]
+        statement = self._emit()
+        return [statement] if statement is not None else []
+
+    def _consume_quoted(self, line, pos):
+        state = self._state
+        if state == "/*":
+            while True:
+                match = _COMMENT_TOKEN.search(line, pos)
+                if not match:
+                    self._append(line[pos:], code=False)
+                    return len(line)
+                self._depth += 1 if match.group() == "/*" else -1
+                self._append(line[pos:match.end()], code=False)
+                pos = match.end()
+                if self._depth == 0:
+                    self._state = None
+                    return pos
+        if state == "$":
+            end = line.find(self._tag, pos)
+            if end < 0:
+                self._append(line[pos:], code=True)
+                return len(line)
+            end += len(self._tag)
+        else:
+            pattern = {"'": _SINGLE_END, "E'": _ESCAPE_END, '"': _DOUBLE_END}[state]
+            match = pattern.match(line, pos)
+            if not match:
+                self._append(line[pos:], code=True)
+                return len(line)
+            end = match.end()
+        self._append(line[pos:end], code=True)
+        self._state = None
+        self._tag = None
+        return end
+
+    def _append(self, text, code):
+        if not text or (not code and not self._has_code):
+            # Los comentarios previos a la sentencia no forman parte de ella.
+            return
+        if code and not self._has_code and text.strip():
+            self._has_code = True
+            self._start_line = self.line_number
+        self._parts.append(text)
+
+    def _emit(self):
+        sql = "".join(self._parts).strip()
+        has_code = self._has_code
+        line = self._start_line
+        self._parts = []
+        self._has_code = False
+        self._start_line = None
+        if not has_code:
+            return None
+        statement = ScriptStatement(sql, line)
+        if _COPY_FROM_STDIN.match(sql):
+            self._copy = tempfile.SpooledTemporaryFile(max_size=COPY_SPOOL_SIZE, mode="w+b")
+        return statement
+
+    def _feed_copy_data(self, line):
+        if line.rstrip("\r\n") == "\\.":
+            statement = self._copy_statement
+            self._copy.seek(0)
+            statement.copy_data = self._copy
+            self._copy = None
+            self._copy_statement = None
+            return [statement]
+        self._copy.write(line.encode("utf-8"))
+        return []
+
+
+def run_script(db, path, batch_size=100, stop_on_error=True, timeout=None,
+               encoding="utf-8", on_statement=None):
+    """
+    Ejecuta el script path sentencia a sentencia en una conexión propia.
+
+    batch_size sentencias por transacción (0 = todo el script en una).
+    Con stop_on_error=False cada sentencia va dentro de un SAVEPOINT, de
+    modo que un error sólo deshace esa sentencia. on_statement(entrada)
+    se llama desde el worker tras cada sentencia con línea, texto,
+    segundos y error.
+
+    Returns:
+        dict: resumen con sentencias ejecutadas, fallidas, omitidas,
+        segundos, si se detuvo, errores y las sentencias más lentas.
+    """
+    task = current_task()
+    total_bytes = max(os.path.getsize(path), 1)
+    summary = {
+        "executed": 0,
+        "failed": 0,
+        "skipped": 0,
+        "seconds": 0.0,
+        "stopped": False,
+        "errors": [],
+        "slowest": [],
+    }
+    slowest = []
+    started = time.monotonic()
+    last_report = 0
+    in_batch = 0
+    wrote = False
+
+    conn = db.open_raw_connection()
+    cursor = conn.cursor()
+    try:
+        if timeout:
+            cursor.execute("SET statement_timeout = %s", (timeout_ms(timeout),))
+            conn.commit()
+
+        def record(statement, seconds, error=None, skipped=False):
+            entry = {
+                "line": statement.line,
+                "sql": statement.preview,
+                "seconds": seconds,
+                "error": error,
+                "skipped": skipped,
+            }
+            if skipped:
+                summary["skipped"] += 1
+            elif error:
+                summary["failed"] += 1
+                if len(summary["errors"]) < 100:
+                    summary["errors"].append((statement.line, error))
+            else:
+                summary["executed"] += 1
+                heapq.heappush(slowest, (seconds, statement.line, statement.preview))
+                if len(slowest) > 10:
+                    heapq.heappop(slowest)
+            if on_statement:
+                on_statement(entry)
+
+        def execute(statement):
+            nonlocal in_batch, wrote
+            if task:
+                task.check_cancelled()
+            if statement.meta or _BEGIN.match(statement.sql):
+                record(statement, 0, skipped=True)
+                return True
+            if _COMMIT.match(statement.sql) or _ROLLBACK.match(statement.sql):
+                if _ROLLBACK.match(statement.sql):
+                    conn.rollback()
+                else:
+                    conn.commit()
+                in_batch = 0
+                record(statement, 0)
+                return True
+
+            autocommit = bool(_NO_TRANSACTION.match(statement.sql))
+            savepoint = not stop_on_error and not autocommit
+            if autocommit:
+                conn.commit()
+                in_batch = 0
+                conn.autocommit = True
+            statement_started = time.monotonic()
+            try:
+                with cancel_scope(conn.cancel):
+                    if savepoint:
+                        cursor.execute("SAVEPOINT dbadmin_script")
+                    if statement.copy_data is not None:
+                        cursor.copy_expert(statement.sql, statement.copy_data)
+                    else:
+                        cursor.execute(statement.sql)
+                    if savepoint:
+                        cursor.execute("RELEASE SAVEPOINT dbadmin_script")
+            except Exception as e:
+                seconds = time.monotonic() - statement_started
+                if task and task.cancelled:
+                    raise
+                error = str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+                if savepoint:
+                    cursor.execute("ROLLBACK TO SAVEPOINT dbadmin_script")
+                elif not autocommit:
+                    conn.rollback()
+                    in_batch = 0
+                record(statement, seconds, error=error)
+                return not stop_on_error
+            finally:
+                if autocommit:
+                    conn.autocommit = False
+                if statement.copy_data is not None:
+                    statement.copy_data.close()
+
+            record(statement, time.monotonic() - statement_started)
+            db.invalidate_for_statement(statement.sql)
+            wrote = wrote or not is_read_only(statement.sql)
+            in_batch += 1
+            if batch_size and in_batch >= batch_size:
+                conn.commit()
+                in_batch = 0
+            return True
+
+        splitter = StatementSplitter()
+        with open(path, "rb") as raw:
+            text = io.TextIOWrapper(raw, encoding=encoding, newline="")
+            for line in text:
+                for statement in splitter.feed(line):
+                    if not execute(statement):
+                        summary["stopped"] = True
+                        break
+                if summary["stopped"]:
+                    break
+
+                now = time.monotonic()
+                if task and now - last_report >= 0.25:
+                    last_report = now
+                    task.report(
+                        f"{summary['executed']:,} sentencias · {summary['failed']:,} errores · "
+                        f"línea {splitter.line_number:,}",
+                        fraction=raw.tell() / total_bytes
+                    )
+            else:
+                for statement in splitter.finish():
+                    if not execute(statement):
+                        summary["stopped"] = True
+        if not summary["stopped"]:
+            conn.commit()
+    finally:
+        try:
+            cursor.close()
+        finally:
+            conn.close()
+            # Aunque el script se detenga, los lotes ya confirmados cambiaron datos.
+            if wrote:
+                result_cache.invalidate(db)
+
+    summary["seconds"] = time.monotonic() - started
+    summary["slowest"] = sorted(slowest, reverse=True)
+    return summary
+
+
+def describe_script(summary):
+    text = (
+        f"{summary['executed']:,} sentencias ejecutadas, {summary['failed']:,} con error, "
+        f"{summary['skipped']:,} omitidas en {summary['seconds']:.1f} s"
+    )
+    if summary["stopped"]:
+        line, error = summary["errors"][-1]
+        text += f"\nDetenido en la línea {line}: {error} (se deshizo el lote en curso)"
+    if summary["slowest"]:
+        text += "\n\nSentencias más lentas:"
+        for seconds, line, preview in summary["slowest"][:5]:
+            text += f"\n  {seconds:8.3f} s  línea {line}: {preview}"
+    return text
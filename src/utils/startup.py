@@ -0,0 +1,67 @@
+"""
+Fases del arranque de la interfaz gráfica.
+
+    startup.mark("importar customtkinter")
+    ...
+    startup.finish()
+
+Cada mark() anota el tiempo transcurrido desde la fase anterior (el reloj
+empieza al importar este módulo, que main.py importa lo primero). finish()
+pasa las fases a src.utils.perf como spans "startup.*" y, con
+DBADMIN_STARTUP_REPORT=1, imprime en stderr una tabla al estilo de
+`python -X importtime`:
+
+    startup |   delta ms |   acumulado | fase
+    startup |      181.2 |       181.2 | importar customtkinter
+"""
+import os
+import sys
+import time
+
+
+BUDGET_SECONDS = 1.0
+
+_T0 = time.perf_counter()
+_phases = []
+_finished = False
+
+
+def mark(name):
+    """Cierra la fase `name` en este instante."""
+    now = time.perf_counter()
+    previous = _phases[-1][2] if _phases else _T0
+    _phases.append((name, now - previous, now))
+
+
+def phases():
+    """Lista de (fase, segundos de la fase, segundos desde el inicio)."""
+    return [(name, delta, at - _T0) for name, delta, at in _phases]
+
+
+def elapsed():
+    return time.perf_counter() - _T0
+
+
+def report():
+    lines = ["startup |   delta ms |   acumulado | fase"]
+    for name, delta, total in phases():
+        lines.append(f"startup | {delta * 1000:10.1f} | {total * 1000:11.1f} | {name}")
+    total = phases()[-1][2] if _phases else 0.0
+    if total > BUDGET_SECONDS:
+        lines.append(f"startup | ⚠️ arranque de {total:.2f} s (objetivo < {BUDGET_SECONDS:.0f} s)")
+    return "\n".join(lines)
+
+
+def finish():
+    """Registra las fases en perf y, si se pidió, imprime el informe. Sólo la primera vez."""
+    global _finished
+    if _finished:
+        return
+    _finished = True
+    from src.utils.perf import perf, UI
+
+    started_at = time.time() - elapsed()
+    for name, delta, total in phases():
+        perf.add(f"startup.{name}", UI, delta, started_at=started_at + total - delta)
+    if os.environ.get("DBADMIN_STARTUP_REPORT", "0") != "0":
+        print(report(), file=sys.stderr)
@@ -0,0 +1,139 @@
+"""
+Sentencias de catálogo con parámetros, preparadas en el servidor.
+
+Cada Statement se escribe con marcadores de psycopg2 (%(schema)s). En
+cada conexión física del pool, las primeras PREPARE_THRESHOLD - 1
+ejecuciones van como consulta normal; a partir de ahí la sentencia se
+prepara con PREPARE una vez y se ejecuta con EXECUTE (acierto), de modo
+que el servidor no vuelve a analizar ni planificar las consultas
+frecuentes y las que sólo se usan una vez no pagan la ida y vuelta del
+PREPARE. Los nombres viajan siempre como parámetros, nunca dentro del
+texto SQL.
+
+Si el servidor no admite PREPARE (o DBADMIN_PREPARED_STATEMENTS=0), la
+sentencia se ejecuta como una consulta normal con los mismos parámetros.
+Cualquier otro error del PREPARE (cancelación, statement_timeout,
+conexión perdida, bloqueos...) se propaga sin reintentar la consulta.
+"""
+import os
+import re
+import threading
+import weakref
+
+
+PREPARED_STATEMENTS = os.environ.get("DBADMIN_PREPARED_STATEMENTS", "1") != "0"
+PREPARE_THRESHOLD = 2
+
+# SQLSTATE de psycopg2.Error.pgcode
+_DUPLICATE_PREPARED = "42P05"
+_UNKNOWN_PREPARED = "26000"
+# feature_not_supported y syntax_error: el servidor no entiende PREPARE.
+_PREPARE_UNSUPPORTED = ("0A000", "42601")
+
+_PLACEHOLDER = re.compile(r"%\((\w+)\)s")
+
+
+class Statement:
+    """
+    Consulta con nombre y parámetros tipados:
+
+        Statement("views", "SELECT ... WHERE n.nspname = %(schema)s", schema="name")
+
+    Los tipos se declaran en el PREPARE; "name" para comparar con columnas
+    de pg_catalog sin perder sus índices.
+    """
+
+    def __init__(self, name, sql, **types):
+        self.name = name
+        self.sql = sql
+        self.types = types
+        self.server_name = f"dbadmin_{name}"
+        order = list(types)
+        missing = set(_PLACEHOLDER.findall(sql)) - set(order)
+        if missing:
+            raise ValueError(f"{name}: parámetros sin tipo: {', '.join(sorted(missing))}")
+        body = _PLACEHOLDER.sub(lambda m: f"${order.index(m.group(1)) + 1}", sql).replace("%%", "%")
+        types_sql = f" ({', '.join(types.values())})" if types else ""
+        self.prepare_sql = f"PREPARE {self.server_name}{types_sql} AS {body}"
+        self.execute_sql = f"EXECUTE {self.server_name}"
+        if types:
+            self.execute_sql += f" ({', '.join(['%s'] * len(types))})"
+
+    def args(self, params):
+        return tuple(params[name] for name in self.types)
+
+
+class StatementCache:
+    """
+    Registro, por conexión física, de los usos de cada sentencia y de las
+    ya preparadas, con contadores de aciertos y fallos por sentencia.
+    """
+
+    def __init__(self, enabled=PREPARED_STATEMENTS, threshold=PREPARE_THRESHOLD):
+        self.enabled = enabled
+        self.threshold = threshold
+        self._sessions = weakref.WeakKeyDictionary()
+        self._unsupported = False
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _count(self, statement, key):
+        with self._lock:
+            stats = self._stats.setdefault(statement.name, {"hits": 0, "misses": 0, "plain": 0})
+            stats[key] += 1
+
+    def execute(self, conn, cursor, statement, params):
+        """Ejecuta statement en cursor (de la conexión conn)."""
+        if not self.enabled or self._unsupported:
+            self._count(statement, "plain")
+            cursor.execute(statement.sql, params)
+            return
+
+        with self._lock:
+            uses, prepared = self._sessions.setdefault(conn, ({}, set()))
+        args = statement.args(params)
+        if statement.name in prepared:
+            try:
+                cursor.execute(statement.execute_sql, args)
+                self._count(statement, "hits")
+                return
+            except Exception as e:
+                # La sesión perdió la sentencia (DISCARD ALL, un pooler...):
+                # se vuelve a preparar.
+                if getattr(e, "pgcode", None) != _UNKNOWN_PREPARED:
+                    raise
+                conn.rollback()
+                prepared.discard(statement.name)
+
+        self._count(statement, "misses")
+        uses[statement.name] = uses.get(statement.name, 0) + 1
+        if uses[statement.name] < self.threshold:
+            cursor.execute(statement.sql, params)
+            return
+        try:
+            cursor.execute(statement.prepare_sql)
+        except Exception as e:
+            pgcode = getattr(e, "pgcode", None)
+            if pgcode != _DUPLICATE_PREPARED and pgcode not in _PREPARE_UNSUPPORTED:
+                raise
+            conn.rollback()
+            if pgcode in _PREPARE_UNSUPPORTED:
+                print(f"PREPARE no disponible, se usan consultas normales: {e}")
+                self._unsupported = True
+                cursor.execute(statement.sql, params)
+                return
+        prepared.add(statement.name)
+        cursor.execute(statement.execute_sql, args)
+
+    def stats(self):
+        """
+        Por sentencia: aciertos (EXECUTE de la sentencia preparada), fallos
+        (aún sin preparar en esa conexión) y ejecuciones con la preparación
+        desactivada o no soportada.
+        """
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._stats.items()}
+
+    def clear(self):
+        with self._lock:
+            self._stats.clear()
@@ -0,0 +1,114 @@
+import re
+import time
+import uuid
+from psycopg2.extras import RealDictCursor
+from src.utils.executor import cancel_scope
+from src.utils.perf import perf, SERVER, FETCH
+
+
+_READ_QUERY = re.compile(r"^\s*(?:SELECT|WITH|VALUES|TABLE)\b", re.IGNORECASE)
+
+
+def is_streamable(query):
+    """Consultas de lectura que pueden abrirse con un cursor de servidor (QueryStream)."""
+    return bool(_READ_QUERY.match(query))
+
+
+class QueryStream:
+    """
+    Resultado de una consulta leído por páginas con un cursor de servidor
+    (named cursor), para no traer millones de filas a memoria.
+
+    Mantiene una conexión del pool ocupada hasta que se agota o se cierra.
+    Si se pasa cancel(conn), cancelar la tarea del executor que está
+    abriendo el cursor o leyendo una página cancela la sentencia.
+    
+    on_finish(segundos, filas, error) se llama una vez, cuando el cursor
+    se agota, se cierra o falla; segundos es el tiempo pasado ejecutando y
+    leyendo, sin contar las esperas entre páginas.
+    """
+    
+    def __init__(self, pool, query, params=None, itersize=2000, timeout_ms=None, cancel=None,
+                 on_finish=None):
+        self.itersize = itersize
+        self.columns = None
+        self.fetched = 0
+        self.exhausted = False
+        self.elapsed = 0.0
+        self._pool = pool
+        self._cursor = None
+        self._cancel = cancel
+        self._on_finish = on_finish
+        self._conn = pool.getconn()
+        started = time.monotonic()
+        try:
+            with self._cancel_scope():
+                if timeout_ms:
+                    cursor = self._conn.cursor()
+                    cursor.execute("SET LOCAL statement_timeout = %s", (timeout_ms,))
+                    cursor.close()
+                self._cursor = self._conn.cursor(
+                    name=f"dbadmin_{uuid.uuid4().hex[:16]}",
+                    cursor_factory=RealDictCursor
+                )
+                self._cursor.itersize = itersize
+                with perf.span("stream.execute", SERVER):
+                    self._cursor.execute(query, params)
+        except Exception as e:
+            self.elapsed += time.monotonic() - started
+            self._close(e)
+            raise
+        self.elapsed += time.monotonic() - started
+    
+    def _cancel_scope(self):
+        conn = self._conn
+        return cancel_scope(lambda: self._cancel(conn) if self._cancel else None)
+    
+    @property
+    def total(self):
+        """Número total de filas, sólo conocido cuando el cursor se agotó."""
+        return self.fetched if self.exhausted else None
+    
+    @property
+    def closed(self):
+        return self._conn is None
+    
+    def fetch_page(self, size=None):
+        if self.exhausted or self.closed:
+            return []
+        size = size or self.itersize
+        started = time.monotonic()
+        try:
+            with self._cancel_scope(), perf.span("stream.fetchmany", FETCH) as attrs:
+                rows = self._cursor.fetchmany(size)
+                attrs["rows"] = len(rows)
+        except Exception as e:
+            self.elapsed += time.monotonic() - started
+            self._close(e)
+            raise
+        self.elapsed += time.monotonic() - started
+        
+        if self.columns is None and self._cursor.description:
+            self.columns = [col[0] for col in self._cursor.description]
+        self.fetched += len(rows)
+        if len(rows) < size:
+            self.exhausted = True
+            self.close()
+        return rows
+    
+    def close(self):
+        self._close()
+    
+    def _close(self, error=None):
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        on_finish, self._on_finish = self._on_finish, None
+        try:
+            if self._cursor is not None and not conn.closed:
+                self._cursor.close()
+        except Exception:
+            pass
+        self._pool.putconn(conn)
+        if on_finish:
+            on_finish(self.elapsed, self.fetched, error)